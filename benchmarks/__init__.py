@@ -0,0 +1,27 @@
+"""
+Benchmarks do Sistema de Locadora de Veículos
+
+Scripts de medição de desempenho executados a partir da raiz do projeto:
+
+    python -m benchmarks.validacao
+    python -m benchmarks.banco --tamanhos 1000,10000,100000 --saida resultados.json
+    python -m benchmarks.inicializacao
+    python -m benchmarks.carga --clientes 16 --duracao 10
+    python -m benchmarks.concorrencia --processos 8 --duracao 10
+    python -m benchmarks.busca_clientes --clientes 100000
+    python -m benchmarks.exportacao --tamanhos 10000,100000,500000
+    python -m benchmarks.periodos --alugueis 500000
+    python -m benchmarks.reservas --veiculos 5000 --reservas 200000
+
+benchmarks.gerador cria bases sintéticas determinísticas (mesma semente,
+mesmos dados) usadas por benchmarks.banco.
+"""
+
+import os
+import sys
+
+# Adiciona o diretório src ao path para importar o pacote locadora
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_path = os.path.join(project_root, 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
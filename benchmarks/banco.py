@@ -0,0 +1,187 @@
+"""
+Benchmark das operações de locadora.database em vários tamanhos de base.
+
+Para cada tamanho, gera uma base sintética em um diretório temporário
+(benchmarks.gerador), mede a latência de cada operação e reporta os
+percentis p50/p95/p99, operações por segundo e linhas por segundo. Os
+resultados são gravados em JSON para comparação entre versões.
+
+Uso:
+    python -m benchmarks.banco --tamanhos 10000,100000 --saida resultados.json
+    python -m benchmarks.banco --comparar resultados_anteriores.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from locadora import __version__, database as db
+from . import gerador
+
+# Proporção de veículos e clientes em relação à quantidade de aluguéis
+PROPORCAO_VEICULOS = 0.02
+PROPORCAO_CLIENTES = 0.1
+
+
+def percentil(valores_ordenados, fracao):
+    """Percentil por interpolação linear sobre uma lista já ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    posicao = (len(valores_ordenados) - 1) * fracao
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    peso = posicao - inferior
+    return valores_ordenados[inferior] * (1 - peso) + valores_ordenados[superior] * peso
+
+
+def medir(funcao, repeticoes, contar_linhas=None):
+    """Executa 'funcao' várias vezes e resume latências (ms) e vazão."""
+    latencias = []
+    linhas = 0
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(i)
+        latencias.append(time.perf_counter() - inicio)
+        if contar_linhas:
+            linhas += contar_linhas(resultado)
+    total = sum(latencias)
+    latencias.sort()
+    resumo = {
+        "repeticoes": repeticoes,
+        "p50_ms": round(percentil(latencias, 0.50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 0.95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+        "media_ms": round(total / repeticoes * 1000, 3),
+        "operacoes_por_s": round(repeticoes / total, 1) if total else None,
+    }
+    if contar_linhas:
+        resumo["linhas_por_s"] = round(linhas / total, 1) if total else None
+    return resumo
+
+
+def operacoes(quantidades, aleatorio):
+    """Monta a lista (nome, função, repetições, contador de linhas) a medir."""
+    n_veiculos, n_clientes = quantidades["veiculos"], quantidades["clientes"]
+    cpfs = [gerador.gerar_cpf(aleatorio.randrange(n_clientes)) for _ in range(200)]
+    placas = [gerador.gerar_placa(i) for i in aleatorio.sample(range(n_veiculos), min(100, n_veiculos))]
+    periodos = []
+    for _ in range(50):
+        inicio = datetime(2020, 1, 1).toordinal() + aleatorio.randrange(365 * 3)
+        periodos.append((datetime.fromordinal(inicio).strftime('%Y-%m-%d'),
+                         datetime.fromordinal(inicio + aleatorio.randint(7, 365)).strftime('%Y-%m-%d')))
+
+    def alugar_e_devolver(i):
+        placa, cpf = placas[i % len(placas)], cpfs[i % len(cpfs)]
+        db.realizar_aluguel(placa, cpf)
+        return db.realizar_devolucao(placa)
+
+    def alugar_e_devolver_lote(i):
+        # Os mesmos 100 pares de alugar_e_devolver, em duas transações
+        db.realizar_alugueis_em_lote([(placa, cpfs[j % len(cpfs)]) for j, placa in enumerate(placas)])
+        return db.realizar_devolucoes_em_lote(placas)[1]
+
+    return [
+        ("listar_veiculos", lambda i: db.listar_veiculos(), 20, len),
+        ("listar_veiculos_paginado", lambda i: db.listar_veiculos_paginado(200)[0], 200, len),
+        ("buscar_historico", lambda i: db.buscar_historico(), 5, len),
+        ("buscar_historico_paginado", lambda i: db.buscar_historico_paginado(None, 200)[0], 200, len),
+        ("buscar_historico_cpf", lambda i: db.buscar_historico(cpfs[i % len(cpfs)]), 200, len),
+        ("realizar_aluguel", lambda i: db.realizar_aluguel(placas[i % len(placas)], cpfs[i % len(cpfs)]), len(placas), None),
+        ("realizar_devolucao", lambda i: db.realizar_devolucao(placas[i % len(placas)]), len(placas), None),
+        ("alugar_e_devolver", alugar_e_devolver, 100, None),
+        ("alugar_e_devolver_lote", alugar_e_devolver_lote, 10, len),
+        ("calcular_faturamento_periodo", lambda i: db.calcular_faturamento_periodo(*periodos[i % len(periodos)]), 200, None),
+        ("faturamento_detalhado", lambda i: db.faturamento_detalhado(
+            *periodos[i % len(periodos)], ("mes", "marca", "modelo"), True)[1], 20, len),
+        ("relatorio_utilizacao_frota", lambda i: db.relatorio_utilizacao_frota(*periodos[i % len(periodos)])[1], 20, len),
+    ]
+
+
+def executar(tamanhos, semente=42, apenas=None):
+    """Gera uma base para cada tamanho e mede todas as operações."""
+    resultados = []
+    for tamanho in tamanhos:
+        with tempfile.TemporaryDirectory(prefix="locadora-bench-") as diretorio:
+            caminho = os.path.join(diretorio, "bench.db")
+            inicio = time.perf_counter()
+            quantidades = gerador.gerar_base(
+                caminho,
+                veiculos=max(10, int(tamanho * PROPORCAO_VEICULOS)),
+                clientes=max(10, int(tamanho * PROPORCAO_CLIENTES)),
+                alugueis=tamanho,
+                semente=semente,
+            )
+            geracao = time.perf_counter() - inicio
+            print(f"\n📦 Base com {tamanho} aluguéis gerada em {geracao:.1f}s {quantidades}")
+
+            aleatorio = random.Random(semente)
+            medidas = {}
+            for nome, funcao, repeticoes, contar in operacoes(quantidades, aleatorio):
+                if apenas and nome not in apenas:
+                    continue
+                medidas[nome] = medir(funcao, repeticoes, contar)
+                m = medidas[nome]
+                print(f"  {nome:<30} p50 {m['p50_ms']:>9.3f} ms  p95 {m['p95_ms']:>9.3f} ms  "
+                      f"p99 {m['p99_ms']:>9.3f} ms  {m['operacoes_por_s'] or 0:>10.1f} op/s")
+            db.fechar_conexoes()
+            resultados.append({"tamanho": tamanho, "quantidades": quantidades,
+                               "geracao_s": round(geracao, 3), "operacoes": medidas})
+    db.configurar_banco()
+    return resultados
+
+
+def comparar(atual, anterior):
+    """Imprime a razão de p50 entre duas execuções (valores > 1 indicam regressão)."""
+    anteriores = {r["tamanho"]: r["operacoes"] for r in anterior["resultados"]}
+    print(f"\n📊 Comparação com a versão {anterior.get('versao', '?')} (p50 atual / p50 anterior)")
+    for resultado in atual["resultados"]:
+        base = anteriores.get(resultado["tamanho"])
+        if not base:
+            continue
+        for nome, medida in resultado["operacoes"].items():
+            if nome in base and base[nome]["p50_ms"]:
+                razao = medida["p50_ms"] / base[nome]["p50_ms"]
+                alerta = "  ⚠️" if razao > 1.2 else ""
+                print(f"  {resultado['tamanho']:>9} {nome:<30} {razao:>6.2f}x{alerta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das operações do módulo database.")
+    parser.add_argument("--tamanhos", default="1000,10000,100000",
+                        help="quantidades de aluguéis separadas por vírgula")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--operacoes", help="medir apenas estas operações (separadas por vírgula)")
+    parser.add_argument("--saida", default="bench_resultados.json", help="arquivo JSON de saída")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t.strip()]
+    apenas = set(args.operacoes.split(",")) if args.operacoes else None
+    relatorio = {
+        "versao": __version__,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "semente": args.semente,
+        "resultados": executar(tamanhos, args.semente, apenas),
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(relatorio, json.load(arquivo))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Compara a busca textual de clientes (FTS5) com a varredura por LIKE.
+
+Gera uma base sintética com N clientes e mede, para um conjunto fixo de
+termos (nomes, partes de nomes, e-mails e telefones), a latência de
+database.buscar_clientes (sem cache) e da consulta equivalente com
+LIKE '%termo%' sobre nome, e-mail e telefone.
+
+Uso:
+    python -m benchmarks.busca_clientes --clientes 100000
+"""
+
+import argparse
+import inspect
+import os
+import re
+import sys
+import tempfile
+
+from locadora import database as db
+from . import gerador
+from .banco import medir
+
+TERMOS = ["ana", "joão silva", "conceição", "fern", "patricia rocha", "maria.alves", "mateus lima",
+          "1190001", "exemplo", "araujo melo", "gab", "sandra barbosa ribeiro"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FTS5 x LIKE na busca de clientes.")
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=5, help="execuções de cada termo")
+    parser.add_argument("--limite", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    buscar_sem_cache = inspect.unwrap(db.buscar_clientes)
+
+    def buscar_like(termo):
+        with db.conexao() as conn:
+            return conn.execute(*db._consulta_like(re.findall(r"\w+", termo), args.limite)).fetchall()
+
+    with tempfile.TemporaryDirectory(prefix="locadora-busca-") as diretorio:
+        gerador.gerar_base(os.path.join(diretorio, "busca.db"), veiculos=10, clientes=args.clientes, alugueis=0)
+        with db.conexao() as conn:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'clientes_fts'").fetchone():
+                print("❌ Este SQLite não tem FTS5; nada a comparar.")
+                return 1
+
+        repeticoes = len(TERMOS) * args.repeticoes
+        fts = medir(lambda i: buscar_sem_cache(TERMOS[i % len(TERMOS)], args.limite), repeticoes, len)
+        like = medir(lambda i: buscar_like(TERMOS[i % len(TERMOS)]), repeticoes, len)
+
+        print(f"\n🔎 {args.clientes} clientes, {len(TERMOS)} termos, limite {args.limite}")
+        print(f"  {'termo':<26}{'FTS5':>8}{'LIKE':>8}")
+        for termo in TERMOS:
+            print(f"  {termo:<26}{len(buscar_sem_cache(termo, args.limite)):>8}{len(buscar_like(termo)):>8}")
+        for nome, m in (("FTS5", fts), ("LIKE", like)):
+            print(f"  {nome:<6} p50 {m['p50_ms']:>8.3f} ms  p95 {m['p95_ms']:>8.3f} ms  "
+                  f"p99 {m['p99_ms']:>8.3f} ms  {m['operacoes_por_s']:>8.1f} op/s")
+        print(f"  FTS5 é {like['p50_ms'] / fts['p50_ms']:.1f}x mais rápida na mediana")
+        db.fechar_conexoes()
+    db.configurar_banco()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Teste de carga do servidor HTTP da locadora (locadora.servidor).
+
+Sem --url, gera uma base sintética temporária e sobe o servidor no próprio
+processo. Cada cliente simulado mantém uma conexão keep-alive e executa uma
+mistura de consultas e pares aluguel/devolução durante o tempo pedido. Ao
+final são reportados requisições por segundo, percentis de latência e a
+contagem de respostas por status.
+
+Uso:
+    python -m benchmarks.carga --clientes 16 --duracao 10
+    python -m benchmarks.carga --url http://127.0.0.1:8080 --clientes 32
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from locadora import database as db
+from locadora.servidor import criar_servidor
+from . import gerador
+from .banco import percentil
+
+
+def _consultas(aleatorio, quantidades):
+    cpf = gerador.gerar_cpf(aleatorio.randrange(quantidades["clientes"]))
+    inicio = 2020 + aleatorio.randrange(3)
+    return aleatorio.choice([
+        ("GET", "/veiculos?tamanho=50", None),
+        ("GET", "/clientes?tamanho=50", None),
+        ("GET", f"/historico?cpf={cpf}&tamanho=20", None),
+        ("GET", "/historico?tamanho=50", None),
+        ("GET", "/alugueis/ativos", None),
+        ("GET", f"/faturamento?inicio={inicio}-01-01&fim={inicio}-12-31", None),
+    ])
+
+
+def cliente(host, porta, fim, indice, quantidades, proporcao_escrita, latencias, status):
+    """Executa requisições em uma conexão keep-alive até o instante 'fim'."""
+    aleatorio = random.Random(indice)
+    conexao = http.client.HTTPConnection(host, porta, timeout=30)
+    # Cada cliente usa placas próprias para que aluguel e devolução não disputem o mesmo veículo
+    placas = [gerador.gerar_placa(i) for i in range(indice, quantidades["veiculos"], 64)]
+    while time.perf_counter() < fim:
+        if placas and aleatorio.random() < proporcao_escrita:
+            placa = aleatorio.choice(placas)
+            cpf = gerador.gerar_cpf(aleatorio.randrange(quantidades["clientes"]))
+            requisicoes = [("POST", "/alugueis", {"placa": placa, "cpf": cpf}),
+                           ("POST", "/devolucoes", {"placa": placa})]
+        else:
+            requisicoes = [_consultas(aleatorio, quantidades)]
+        for metodo, caminho, corpo in requisicoes:
+            dados = json.dumps(corpo).encode("utf-8") if corpo is not None else None
+            cabecalhos = {"Content-Type": "application/json"} if dados else {}
+            inicio = time.perf_counter()
+            try:
+                conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                status[resposta.status] += 1
+            except (OSError, http.client.HTTPException):
+                status["erro de conexão"] += 1
+                conexao.close()
+                conexao = http.client.HTTPConnection(host, porta, timeout=30)
+                continue
+            latencias.append(time.perf_counter() - inicio)
+    conexao.close()
+
+
+def executar(host, porta, quantidades, clientes, duracao, proporcao_escrita):
+    latencias, status = [], Counter()
+    fim = time.perf_counter() + duracao
+    threads = [
+        threading.Thread(target=cliente, args=(host, porta, fim, i, quantidades, proporcao_escrita, latencias, status))
+        for i in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    print(f"\n📈 {len(latencias)} requisições em {decorrido:.1f}s com {clientes} cliente(s): "
+          f"{len(latencias) / decorrido:.0f} req/s")
+    print(f"   latência p50 {percentil(latencias, 0.50) * 1000:.1f} ms | "
+          f"p95 {percentil(latencias, 0.95) * 1000:.1f} ms | p99 {percentil(latencias, 0.99) * 1000:.1f} ms")
+    print(f"   respostas por status: {dict(status)}")
+    return 0 if not status.get("erro de conexão") and not status.get(500) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga da API HTTP da locadora.")
+    parser.add_argument("--url", help="servidor já em execução (padrão: sobe um servidor local temporário)")
+    parser.add_argument("--clientes", type=int, default=16, help="conexões simultâneas")
+    parser.add_argument("--duracao", type=float, default=10, help="duração do teste em segundos")
+    parser.add_argument("--escrita", type=float, default=0.1, help="proporção de pares aluguel/devolução")
+    parser.add_argument("--alugueis", type=int, default=20000, help="tamanho da base sintética local")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        partes = urlsplit(args.url)
+        # Contra um servidor externo, supõe a base gerada por benchmarks.gerador com os tamanhos padrão
+        quantidades = {"veiculos": 1000, "clientes": 5000}
+        return executar(partes.hostname, partes.port or 80, quantidades, args.clientes, args.duracao, args.escrita)
+
+    with tempfile.TemporaryDirectory(prefix="locadora-carga-") as diretorio:
+        quantidades = gerador.gerar_base(
+            os.path.join(diretorio, "carga.db"),
+            veiculos=max(64, args.alugueis // 50), clientes=max(10, args.alugueis // 10), alugueis=args.alugueis,
+        )
+        servidor = criar_servidor("127.0.0.1", 0)
+        host, porta = servidor.server_address[:2]
+        thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+        thread.start()
+        print(f"🚀 Servidor temporário em http://{host}:{porta} com {quantidades}")
+        try:
+            return executar(host, porta, quantidades, args.clientes, args.duracao, args.escrita)
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+            db.fechar_conexoes()
+            db.configurar_banco()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
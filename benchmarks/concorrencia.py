@@ -0,0 +1,129 @@
+"""
+Teste de estresse com vários processos disputando os mesmos veículos.
+
+Cada processo tenta alugar e devolver, repetidamente, carros sorteados de um
+conjunto pequeno (alta disputa) no mesmo arquivo de banco. Ao final, o
+histórico é conferido: nenhum carro pode ter dois aluguéis ativos nem
+aluguéis sobrepostos, o status dos veículos deve bater com os aluguéis
+ativos e cada aluguel bem-sucedido deve corresponder a exatamente uma linha.
+
+Uso:
+    python -m benchmarks.concorrencia --processos 8 --duracao 10 --veiculos 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from locadora import database as db
+from . import gerador
+
+
+def trabalhador(caminho, indice, duracao, veiculos, clientes):
+    """Aluga e devolve carros sorteados até o fim do tempo; retorna as contagens."""
+    db.configurar_banco(caminho)
+    aleatorio = random.Random(indice)
+    placas = [gerador.gerar_placa(i) for i in range(veiculos)]
+    contagem = Counter()
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        placa = aleatorio.choice(placas)
+        if aleatorio.random() < 0.5:
+            sucesso, mensagens = db.realizar_aluguel(placa, gerador.gerar_cpf(aleatorio.randrange(clientes)))
+            operacao = "aluguel"
+        else:
+            sucesso, mensagens, _ = db.realizar_devolucao(placa)
+            operacao = "devolucao"
+        if sucesso:
+            contagem[f"{operacao}_ok"] += 1
+        elif "Erro" in mensagens[0]:
+            contagem[f"{operacao}_erro"] += 1
+            contagem[mensagens[0]] += 1
+        else:
+            contagem[f"{operacao}_recusado"] += 1
+    db.fechar_conexoes()
+    return contagem
+
+
+def verificar(caminho):
+    """Confere a consistência do histórico; retorna (problemas, linhas de aluguel)."""
+    db.configurar_banco(caminho)
+    problemas = []
+    with db.conexao() as conn:
+        for row in conn.execute("""
+            SELECT placa_carro, COUNT(*) FROM alugueis
+            WHERE status = 'Ativo' GROUP BY placa_carro HAVING COUNT(*) > 1
+        """):
+            problemas.append(f"{row[0]}: {row[1]} aluguéis ativos ao mesmo tempo")
+        for row in conn.execute("""
+            SELECT placa_carro, id, proxima_retirada, data_devolucao FROM (
+                SELECT placa_carro, id, data_devolucao,
+                       LEAD(data_retirada) OVER (PARTITION BY placa_carro ORDER BY id) AS proxima_retirada,
+                       LEAD(id) OVER (PARTITION BY placa_carro ORDER BY id) AS proximo_id
+                FROM alugueis
+            )
+            WHERE proximo_id IS NOT NULL
+              AND (data_devolucao IS NULL OR data_devolucao > proxima_retirada)
+        """):
+            problemas.append(f"{row[0]}: aluguel {row[1]} sobreposto ao seguinte")
+        for row in conn.execute("""
+            SELECT v.placa, v.status FROM veiculos v
+            WHERE (v.status = 'Alugado') != EXISTS (
+                SELECT 1 FROM alugueis a WHERE a.placa_carro = v.placa AND a.status = 'Ativo')
+        """):
+            problemas.append(f"{row[0]}: status '{row[1]}' não corresponde aos aluguéis ativos")
+        novos = conn.execute("SELECT COUNT(*) FROM alugueis").fetchone()[0]
+    db.fechar_conexoes()
+    return problemas, novos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estresse de aluguéis e devoluções concorrentes.")
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10, help="segundos de execução")
+    parser.add_argument("--veiculos", type=int, default=5, help="veículos disputados (quanto menos, mais disputa)")
+    parser.add_argument("--clientes", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="locadora-concorrencia-") as diretorio:
+        caminho = os.path.join(diretorio, "concorrencia.db")
+        # Base sem histórico: todas as linhas de aluguel virão do teste
+        gerador.gerar_base(caminho, veiculos=args.veiculos, clientes=args.clientes, alugueis=0)
+        db.fechar_conexoes()
+
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(args.processos) as pool:
+            contagens = pool.starmap(trabalhador, [
+                (caminho, i, args.duracao, args.veiculos, args.clientes) for i in range(args.processos)
+            ])
+        decorrido = time.perf_counter() - inicio
+        total = sum(contagens, Counter())
+
+        problemas, novos = verificar(caminho)
+        db.configurar_banco()
+
+    operacoes = sum(v for k, v in total.items() if k.endswith(("_ok", "_recusado", "_erro")))
+    escritas = total["aluguel_ok"] + total["devolucao_ok"]
+    print(f"⚙️  {args.processos} processos, {args.veiculos} veículos, {decorrido:.1f}s")
+    print(f"   {operacoes} operações ({operacoes / decorrido:.0f}/s), {escritas} escritas efetivadas ({escritas / decorrido:.0f}/s)")
+    print(f"   aluguéis: {total['aluguel_ok']} ok, {total['aluguel_recusado']} recusados, {total['aluguel_erro']} erros")
+    print(f"   devoluções: {total['devolucao_ok']} ok, {total['devolucao_recusado']} recusadas, {total['devolucao_erro']} erros")
+    for mensagem, quantidade in total.items():
+        if mensagem.startswith("Erro"):
+            print(f"   ⚠️  {quantidade}x {mensagem}")
+    if novos != total["aluguel_ok"]:
+        problemas.append(f"{total['aluguel_ok']} aluguéis bem-sucedidos, mas {novos} linhas inseridas")
+    for problema in problemas:
+        print(f"   ❌ {problema}")
+    if not problemas:
+        print("   ✅ Nenhum aluguel duplicado ou sobreposto")
+    return 1 if problemas or total["aluguel_erro"] or total["devolucao_erro"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Mede memória e tempo da exportação do histórico de aluguéis.
+
+Para cada tamanho de base, compara o pico de memória (tracemalloc) e o tempo
+de duas formas de gravar o histórico completo em CSV:
+
+- lista: database.buscar_historico() monta todos os registros antes de escrever;
+- fluxo: exportacao.exportar_historico() lê em lotes e escreve registro a registro.
+
+Uso:
+    python -m benchmarks.exportacao --tamanhos 10000,100000,500000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from locadora import database as db, exportacao
+from . import gerador
+
+
+def _medir(funcao):
+    """Executa 'funcao()' e retorna (segundos, pico de memória em MiB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duracao, pico / (1024 * 1024)
+
+
+def _exportar_lista(destino):
+    historico = db.buscar_historico()
+    with open(destino, "w", encoding="utf-8", newline="") as arquivo:
+        exportacao.escrever_csv(historico, arquivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória e tempo da exportação do histórico.")
+    parser.add_argument("--tamanhos", default="10000,100000,500000", help="quantidades de aluguéis, separadas por vírgula")
+    args = parser.parse_args(argv)
+
+    print("\n📤 Exportação do histórico em CSV")
+    print(f"  {'aluguéis':>10}  {'lista (s)':>10}  {'lista (MiB)':>12}  {'fluxo (s)':>10}  {'fluxo (MiB)':>12}")
+    for tamanho in (int(t) for t in args.tamanhos.split(",")):
+        with tempfile.TemporaryDirectory(prefix="locadora-exportacao-") as diretorio:
+            gerador.gerar_base(os.path.join(diretorio, "exportacao.db"), veiculos=max(10, tamanho // 50),
+                               clientes=max(10, tamanho // 10), alugueis=tamanho)
+            destino = os.path.join(diretorio, "historico.csv")
+            tempo_lista, memoria_lista = _medir(lambda: _exportar_lista(destino))
+            tempo_fluxo, memoria_fluxo = _medir(lambda: exportacao.exportar_historico(destino))
+            with open(destino, encoding="utf-8", newline="") as arquivo:
+                linhas = sum(1 for _ in csv.reader(arquivo)) - 1
+            assert linhas == tamanho, f"exportados {linhas} de {tamanho}"
+            print(f"  {tamanho:>10}  {tempo_lista:>10.2f}  {memoria_lista:>12.1f}  {tempo_fluxo:>10.2f}  {memoria_fluxo:>12.1f}")
+            db.fechar_conexoes()
+    db.configurar_banco()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
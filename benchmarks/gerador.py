@@ -0,0 +1,126 @@
+"""
+Gerador determinístico de dados sintéticos para os benchmarks.
+
+Cria N veículos, clientes e aluguéis com placas e CPFs válidos em um banco
+SQLite (normalmente temporário), usando o esquema e as migrações do módulo
+locadora.database. A mesma semente sempre produz os mesmos dados.
+"""
+
+import random
+import string
+import unicodedata
+from datetime import datetime, timedelta
+
+from locadora import database as db
+from locadora.validacao import PESOS_D1, PESOS_D2
+
+MARCAS_MODELOS = [
+    ("Toyota", "Corolla"), ("Volkswagen", "Gol"), ("Fiat", "Uno"), ("Chevrolet", "Onix"),
+    ("Hyundai", "HB20"), ("Honda", "Civic"), ("Renault", "Kwid"), ("Jeep", "Renegade"),
+]
+CORES = ["Prata", "Preto", "Branco", "Vermelho", "Azul", "Cinza"]
+NOMES = ["Ana", "João", "Maria", "José", "Francisca", "Antônio", "Adriana", "Carlos", "Juliana", "Paulo",
+         "Márcia", "Lucas", "Fernanda", "Pedro", "Patrícia", "Rafael", "Aline", "Gabriel", "Sandra", "Mateus"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+              "Gomes", "Ribeiro", "Carvalho", "Araújo", "Almeida", "Conceição", "Barbosa", "Melo", "Rocha"]
+DATA_BASE = datetime(2020, 1, 1, 8, 0, 0)
+TAMANHO_LOTE = 10_000
+
+
+def gerar_placa(indice):
+    """Gera uma placa Mercosul única para o índice (até 26³·10·26·100 placas)."""
+    letras = string.ascii_uppercase
+    indice, final = divmod(indice, 100)
+    indice, letra_meio = divmod(indice, 26)
+    indice, digito = divmod(indice, 10)
+    prefixo = ""
+    for _ in range(3):
+        indice, resto = divmod(indice, 26)
+        prefixo = letras[resto] + prefixo
+    return f"{prefixo}{digito}{letras[letra_meio]}{final:02d}"
+
+
+def gerar_cpf(indice):
+    """Gera um CPF válido e único a partir dos 9 dígitos do índice."""
+    base = [int(d) for d in f"{100_000_000 + indice:09d}"[-9:]]
+    for pesos in (PESOS_D1, PESOS_D2):
+        base.append(sum(d * p for d, p in zip(base, pesos)) * 10 % 11 % 10)
+    return "".join(map(str, base))
+
+
+def _em_lotes(iteravel, tamanho=TAMANHO_LOTE):
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _veiculos(quantidade, aleatorio):
+    for i in range(quantidade):
+        marca, modelo = aleatorio.choice(MARCAS_MODELOS)
+        yield (gerar_placa(i), marca, modelo, aleatorio.randint(2010, 2025),
+               aleatorio.choice(CORES), float(aleatorio.randrange(80, 400, 10)))
+
+
+def gerar_nome(indice):
+    """Gera um nome completo determinístico (nome e dois sobrenomes) para o índice."""
+    nome = NOMES[indice % len(NOMES)]
+    meio = SOBRENOMES[(indice // len(NOMES)) % len(SOBRENOMES)]
+    fim = SOBRENOMES[(indice * 7 + 3) % len(SOBRENOMES)]
+    return f"{nome} {meio} {fim}"
+
+
+def _sem_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+def _clientes(quantidade):
+    for i in range(quantidade):
+        nome = gerar_nome(i)
+        usuario = _sem_acentos(".".join(nome.lower().split()[::2]))
+        yield (gerar_cpf(i), nome, f"119{i % 100_000_000:08d}", f"{usuario}{i}@exemplo.com")
+
+
+def _alugueis(quantidade, veiculos, clientes, diarias, aleatorio):
+    """Distribui os aluguéis entre os veículos, sem sobreposição por placa."""
+    proxima_saida = [DATA_BASE] * veiculos
+    for _ in range(quantidade):
+        v = aleatorio.randrange(veiculos)
+        retirada = proxima_saida[v] + timedelta(hours=aleatorio.randint(1, 72))
+        dias = aleatorio.randint(1, 10)
+        devolucao = retirada + timedelta(days=dias, hours=-aleatorio.randint(0, 20))
+        proxima_saida[v] = devolucao
+        yield (gerar_placa(v), gerar_cpf(aleatorio.randrange(clientes)),
+               retirada.strftime('%Y-%m-%d %H:%M:%S'), devolucao.strftime('%Y-%m-%d %H:%M:%S'),
+               dias * diarias[v], 'Finalizado')
+
+
+def gerar_base(caminho, veiculos=1_000, clientes=5_000, alugueis=50_000, semente=42):
+    """Cria e popula o banco em 'caminho' e retorna as quantidades geradas."""
+    aleatorio = random.Random(semente)
+    db.configurar_banco(caminho)
+    db.criar_tabelas()
+
+    diarias = []
+    for lote in _em_lotes(_veiculos(veiculos, aleatorio)):
+        diarias.extend(linha[5] for linha in lote)
+        with db.transacao() as cursor:
+            cursor.executemany(
+                "INSERT INTO veiculos (placa, marca, modelo, ano, cor, valor_diaria) VALUES (?, ?, ?, ?, ?, ?)", lote)
+    for lote in _em_lotes(_clientes(clientes)):
+        with db.transacao() as cursor:
+            cursor.executemany("INSERT INTO clientes (cpf, nome, telefone, email) VALUES (?, ?, ?, ?)", lote)
+    for lote in _em_lotes(_alugueis(alugueis, veiculos, clientes, diarias, aleatorio)):
+        with db.transacao() as cursor:
+            cursor.executemany(
+                "INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, data_devolucao, valor_total, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)", lote)
+
+    db.reconstruir_faturamento_diario()
+    with db.conexao() as conn:
+        conn.execute("ANALYZE")
+    return {"veiculos": veiculos, "clientes": clientes, "alugueis": alugueis}
@@ -0,0 +1,75 @@
+"""
+Mede o tempo de inicialização a frio da linha de comando (locadora.cli).
+
+Cada medição executa uma operação completa em um novo processo Python
+(importação, abertura do banco e consulta), comparando com o custo de um
+interpretador vazio. Também verifica que o tkinter não é importado.
+
+Uso:
+    python -m benchmarks.inicializacao --repeticoes 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import src_path
+
+LIMITE_MS = 100
+
+
+def _executar(argumentos, ambiente):
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, *argumentos], env=ambiente, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def medir(argumentos, ambiente, repeticoes):
+    tempos = sorted(_executar(argumentos, ambiente) for _ in range(repeticoes))
+    return statistics.median(tempos), tempos[int(0.95 * (len(tempos) - 1))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de inicialização da linha de comando.")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    ambiente = dict(os.environ, PYTHONPATH=src_path)
+    verificacao = subprocess.run(
+        [sys.executable, "-c", "import sys, locadora.cli; print('tkinter' in sys.modules)"],
+        env=ambiente, capture_output=True, text=True, check=True,
+    )
+    tkinter_importado = verificacao.stdout.strip() == "True"
+    print(f"tkinter importado pela CLI: {'sim ⚠️' if tkinter_importado else 'não'}")
+
+    with tempfile.TemporaryDirectory(prefix="locadora-inicio-") as diretorio:
+        banco = os.path.join(diretorio, "inicio.db")
+        # Primeira execução cria o esquema; as medidas usam um banco já existente
+        _executar(["-m", "locadora.cli", "--banco", banco, "veiculos"], ambiente)
+
+        cenarios = [
+            ("python vazio", ["-c", "pass"]),
+            ("import locadora", ["-c", "import locadora"]),
+            ("cli veiculos", ["-m", "locadora.cli", "--banco", banco, "veiculos"]),
+            ("cli faturamento", ["-m", "locadora.cli", "--banco", banco, "faturamento", "2025-01-01", "2025-12-31"]),
+        ]
+        resultados = {}
+        for nome, argumentos in cenarios:
+            resultados[nome] = medir(argumentos, ambiente, args.repeticoes)
+            mediana, p95 = resultados[nome]
+            print(f"  {nome:<18} mediana {mediana:7.1f} ms  p95 {p95:7.1f} ms")
+
+    acima = [nome for nome, (mediana, _) in resultados.items() if nome.startswith("cli") and mediana > LIMITE_MS]
+    if tkinter_importado or acima:
+        print(f"❌ Inicialização acima do esperado ({LIMITE_MS} ms) ou com tkinter: {', '.join(acima)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Compara as consultas de período sobre datas em texto e sobre datas em segundos.
+
+Gera uma base com histórico longo e mede, para períodos no começo, no meio e
+no fim do histórico, o relatório de utilização da frota em duas versões:
+
+- texto: a consulta anterior à migração 6, com julianday() em cada linha e o
+  filtro pelo índice de data_retirada (texto);
+- segundos: database.relatorio_utilizacao_frota(), que compara retirada_ts e
+  devolucao_ts e percorre o índice do lado mais seletivo do período.
+
+Os dois resultados são conferidos antes de reportar os tempos.
+
+Uso:
+    python -m benchmarks.periodos --alugueis 500000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from locadora import database as db
+from . import gerador
+
+# Relatório de utilização como era calculado sobre as datas em texto
+CONSULTA_TEXTO = """
+    WITH periodo AS (
+        SELECT julianday(:inicio) AS ini,
+               julianday(:fim, '+1 day') AS fim,
+               julianday(:fim, '+1 day') - julianday(:inicio) AS dias
+    ),
+    intervalos AS (
+        SELECT a.placa_carro AS placa,
+               MAX(julianday(a.data_retirada), p.ini) AS ini,
+               MIN(COALESCE(julianday(a.data_devolucao), julianday('now', 'localtime')), p.fim) AS fim,
+               CASE WHEN a.status = 'Finalizado'
+                     AND a.data_devolucao >= :inicio
+                     AND a.data_devolucao < date(:fim, '+1 day')
+                    THEN a.valor_total ELSE 0 END AS receita
+        FROM historico_alugueis a, periodo p
+        WHERE a.data_retirada < date(:fim, '+1 day')
+          AND (a.data_devolucao IS NULL OR a.data_devolucao >= :inicio)
+    ),
+    ordenados AS (
+        SELECT placa, ini, fim, receita,
+               ini - LAG(fim) OVER (PARTITION BY placa ORDER BY ini) AS intervalo
+        FROM intervalos
+        WHERE fim > ini
+    ),
+    por_placa AS (
+        SELECT placa,
+               COUNT(*) AS alugueis,
+               SUM(fim - ini) AS dias_alugados,
+               MAX(COALESCE(MAX(intervalo), 0),
+                   MIN(ini) - (SELECT ini FROM periodo),
+                   (SELECT fim FROM periodo) - MAX(fim)) AS maior_ociosidade,
+               SUM(receita) AS receita
+        FROM ordenados
+        GROUP BY placa
+    )
+    SELECT v.placa,
+           COALESCE(u.alugueis, 0) AS alugueis,
+           ROUND(COALESCE(u.dias_alugados, 0), 2) AS dias_alugados,
+           COALESCE(u.receita, 0) AS receita
+    FROM veiculos v
+    CROSS JOIN periodo p
+    LEFT JOIN por_placa u ON u.placa = v.placa
+"""
+
+
+def _melhor_tempo(funcao, repeticoes):
+    """Menor tempo (ms) entre as repetições e o último resultado."""
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000, resultado
+
+
+def _periodos(primeira, ultima):
+    """Um mês no começo, um ano no meio e um mês no fim do histórico."""
+    meio = primeira + (ultima - primeira) / 2
+    return [
+        ("começo (1 mês)", primeira, primeira + timedelta(days=29)),
+        ("meio (1 ano)", meio, meio + timedelta(days=364)),
+        ("fim (1 mês)", ultima - timedelta(days=29), ultima),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas de período: datas em texto x datas em segundos.")
+    parser.add_argument("--alugueis", type=int, default=500_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="locadora-periodos-") as diretorio:
+        gerador.gerar_base(os.path.join(diretorio, "periodos.db"), veiculos=max(10, args.alugueis // 400),
+                           clientes=max(10, args.alugueis // 10), alugueis=args.alugueis)
+        with db.conexao() as conn:
+            primeira, ultima = conn.execute(
+                "SELECT MIN(data_retirada), MAX(data_devolucao) FROM alugueis").fetchone()
+        primeira = datetime.strptime(primeira[:10], "%Y-%m-%d")
+        ultima = datetime.strptime(ultima[:10], "%Y-%m-%d")
+
+        print(f"\n📅 Utilização da frota com {args.alugueis} aluguéis ({primeira:%Y-%m-%d} a {ultima:%Y-%m-%d})")
+        print(f"  {'período':<16}  {'texto (ms)':>11}  {'segundos (ms)':>14}  {'ganho':>8}")
+        for nome, inicio, fim in _periodos(primeira, ultima):
+            parametros = {"inicio": inicio.strftime("%Y-%m-%d"), "fim": fim.strftime("%Y-%m-%d")}
+
+            def texto():
+                with db.conexao() as conn:
+                    return conn.execute(CONSULTA_TEXTO, parametros).fetchall()
+
+            tempo_texto, linhas_texto = _melhor_tempo(texto, args.repeticoes)
+            tempo_segundos, (sucesso, linhas) = _melhor_tempo(
+                lambda: db.relatorio_utilizacao_frota(parametros["inicio"], parametros["fim"]), args.repeticoes)
+            assert sucesso, linhas
+            esperado = {row["placa"]: (row["alugueis"], row["receita"]) for row in linhas_texto}
+            obtido = {row["placa"]: (row["alugueis"], row["receita"]) for row in linhas}
+            assert esperado == obtido, f"resultados diferentes em {nome}"
+            print(f"  {nome:<16}  {tempo_texto:>11.1f}  {tempo_segundos:>14.1f}  {tempo_texto / tempo_segundos:>7.1f}x")
+        db.fechar_conexoes()
+    db.configurar_banco()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
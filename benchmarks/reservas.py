@@ -0,0 +1,146 @@
+"""
+Compara as formas de encontrar os veículos livres em um período.
+
+Gera uma frota com reservas sequenciais por veículo, de um ano atrás até
+'--horizonte' dias à frente (as passadas, na maioria, já utilizadas), e
+mede, para períodos próximos e distantes, a consulta de disponibilidade
+com três buscas das reservas sobrepostas:
+
+- varredura: percorre todas as reservas conferindo status e datas;
+- índice por fim: índice comum em fim_ts (o usado quando o SQLite não tem
+  R*Tree), que descarta as reservas encerradas mas visita todas as futuras;
+- R*Tree: o índice de intervalos, que visita só as reservas que tocam o
+  período.
+
+O custo do índice por fim cresce com o horizonte das reservas; o da R*Tree,
+só com as reservas do período. Os três resultados (e o de
+database.listar_veiculos_disponiveis) são conferidos antes de reportar os
+tempos.
+
+Uso:
+    python -m benchmarks.reservas --veiculos 5000 --reservas 200000 --horizonte 365
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from locadora import database as db
+from . import gerador
+
+CONSULTA = """
+    SELECT v.placa FROM veiculos v
+    WHERE v.placa NOT IN ({sobrepostas})
+      AND v.placa NOT IN ({alugueis})
+    ORDER BY v.placa
+"""
+
+SOBREPOSTAS = {
+    "varredura": """SELECT placa_carro FROM reservas NOT INDEXED
+                    WHERE status = 'Ativa' AND fim_ts > :ini_ts AND inicio_ts < :fim_ts""",
+    "fim": """SELECT placa_carro FROM reservas INDEXED BY idx_reservas_ativas_fim
+              WHERE status = 'Ativa' AND fim_ts > :ini_ts AND inicio_ts < :fim_ts""",
+    "rtree": "SELECT placa_carro FROM reservas_intervalos WHERE inicio < :fim_dia AND fim > :ini_dia",
+}
+
+
+def _melhor_tempo(funcao, repeticoes):
+    """Menor tempo (ms) entre as repetições e o último resultado."""
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000, resultado
+
+
+def _gerar_reservas(placas, cpfs, quantidade, horizonte, aleatorio):
+    """Reservas de 1 a 7 dias em sequência por veículo, de um ano atrás a 'horizonte' dias à frente."""
+    hoje = date.today()
+    por_veiculo = max(1, quantidade // len(placas))
+    passo = max(2, (365 + horizonte) // por_veiculo)
+    criada_em = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for placa in placas:
+        dia = hoje - timedelta(days=365 + aleatorio.randrange(passo))
+        for _ in range(por_veiculo):
+            duracao = aleatorio.randint(1, min(7, passo - 1))
+            fim = dia + timedelta(days=duracao - 1)
+            status = "Ativa" if fim >= hoje or aleatorio.random() < 0.1 else "Utilizada"
+            inicio_ts = db.em_segundos(datetime(dia.year, dia.month, dia.day))
+            yield (placa, aleatorio.choice(cpfs), dia.isoformat(), fim.isoformat(),
+                   inicio_ts, inicio_ts + duracao * db.SEGUNDOS_POR_DIA, status, criada_em)
+            dia += timedelta(days=passo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Disponibilidade da frota: varredura x índice por fim x R*Tree.")
+    parser.add_argument("--veiculos", type=int, default=5_000)
+    parser.add_argument("--reservas", type=int, default=200_000)
+    parser.add_argument("--horizonte", type=int, default=365, help="dias à frente com reservas")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="locadora-reservas-") as diretorio:
+        gerador.gerar_base(os.path.join(diretorio, "reservas.db"), veiculos=args.veiculos,
+                           clientes=1_000, alugueis=args.veiculos, semente=args.semente)
+        aleatorio = random.Random(args.semente)
+        with db.conexao() as conn:
+            placas = [row[0] for row in conn.execute("SELECT placa FROM veiculos")]
+            cpfs = [row[0] for row in conn.execute("SELECT cpf FROM clientes")]
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'reservas_intervalos'").fetchone():
+                print("❌ O SQLite em uso não tem o módulo R*Tree.")
+                return 1
+        inicio = time.perf_counter()
+        with db.transacao() as cursor:
+            cursor.executemany(
+                "INSERT INTO reservas (placa_carro, cpf_cliente, inicio, fim, inicio_ts, fim_ts, status, criada_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _gerar_reservas(placas, cpfs, args.reservas, args.horizonte, aleatorio))
+            cursor.execute("""CREATE INDEX idx_reservas_ativas_fim
+                              ON reservas (fim_ts, inicio_ts, placa_carro) WHERE status = 'Ativa'""")
+            cursor.execute("ANALYZE")
+            total, ativas = cursor.execute(
+                "SELECT COUNT(*), SUM(status = 'Ativa') FROM reservas").fetchone()
+        print(f"\n📅 {total} reservas ({ativas} ativas) para {len(placas)} veículos "
+              f"geradas em {time.perf_counter() - inicio:.1f}s")
+
+        hoje = date.today()
+        periodos = [
+            ("próxima semana", hoje + timedelta(days=7), hoje + timedelta(days=13)),
+            ("daqui a 1 mês", hoje + timedelta(days=30), hoje + timedelta(days=32)),
+            ("daqui a 6 meses", hoje + timedelta(days=180), hoje + timedelta(days=180)),
+        ]
+        print(f"  {'período':<16}  {'livres':>6}  {'varredura (ms)':>14}  {'fim (ms)':>9}  {'R*Tree (ms)':>11}")
+        for nome, data_inicio, data_fim in periodos:
+            ini_ts = db.em_segundos(datetime(data_inicio.year, data_inicio.month, data_inicio.day))
+            fim_ts = db.em_segundos(datetime(data_fim.year, data_fim.month, data_fim.day)) + db.SEGUNDOS_POR_DIA
+            parametros = {"ini_ts": ini_ts, "fim_ts": fim_ts,
+                          "ini_dia": ini_ts // db.SEGUNDOS_POR_DIA, "fim_dia": fim_ts // db.SEGUNDOS_POR_DIA,
+                          "amanha": db._inicio_do_dia(datetime.now()) + db.SEGUNDOS_POR_DIA}
+
+            def consultar(busca):
+                with db.conexao() as conn:
+                    consulta = CONSULTA.format(sobrepostas=SOBREPOSTAS[busca], alugueis=db.FILTRO_ALUGUEIS_SOBREPOSTOS)
+                    return [row[0] for row in conn.execute(consulta, parametros)]
+
+            tempos, livres = {}, {}
+            for busca in SOBREPOSTAS:
+                tempos[busca], livres[busca] = _melhor_tempo(lambda: consultar(busca), args.repeticoes)
+            sucesso, veiculos = db.listar_veiculos_disponiveis(data_inicio.isoformat(), data_fim.isoformat())
+            assert sucesso, veiculos
+            esperado = [v["placa"] for v in veiculos]
+            assert all(placas_livres == esperado for placas_livres in livres.values()), \
+                f"resultados diferentes em {nome}"
+            print(f"  {nome:<16}  {len(esperado):>6}  {tempos['varredura']:>14.2f}  {tempos['fim']:>9.2f}  "
+                  f"{tempos['rtree']:>11.2f}")
+        db.fechar_conexoes()
+    db.configurar_banco()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark das regras de validação de placa e CPF.
+
+Compara, por registro, a implementação anterior (regex recompilada a cada
+chamada e somas com geradores) com o módulo locadora.validacao, tanto na
+validação individual quanto nas funções de lote.
+
+Uso:
+    python -m benchmarks.validacao [--registros 100000]
+"""
+
+import argparse
+import random
+import re
+import timeit
+
+from locadora import validacao
+
+
+# =============================================================================
+# IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA)
+# =============================================================================
+
+def placa_legada(placa):
+    if not isinstance(placa, str) or not placa.strip():
+        return False
+    placa = placa.upper().strip()
+    padrao_mercosul = re.compile(r'^[A-Z]{3}\d[A-Z]\d{2}$')
+    padrao_antigo = re.compile(r'^[A-Z]{3}-\d{4}$')
+    return bool(padrao_mercosul.match(placa) or padrao_antigo.match(placa.replace("-", "")))
+
+def cpf_legado(cpf):
+    if not cpf:
+        return False
+    cpf_numerico = ''.join(filter(str.isdigit, str(cpf)))
+    if len(cpf_numerico) != 11 or len(set(cpf_numerico)) == 1:
+        return False
+    soma = sum(int(cpf_numerico[i]) * (10 - i) for i in range(9))
+    d1 = (soma * 10) % 11
+    if d1 == 10: d1 = 0
+    if d1 != int(cpf_numerico[9]):
+        return False
+    soma = sum(int(cpf_numerico[i]) * (11 - i) for i in range(10))
+    d2 = (soma * 10) % 11
+    if d2 == 10: d2 = 0
+    return d2 == int(cpf_numerico[10])
+
+# =============================================================================
+# DADOS E MEDIÇÃO
+# =============================================================================
+
+def gerar_cpf(aleatorio, formatado=False):
+    base = [aleatorio.randrange(10) for _ in range(9)]
+    for pesos in (validacao.PESOS_D1, validacao.PESOS_D2):
+        base.append(sum(d * p for d, p in zip(base, pesos)) * 10 % 11 % 10)
+    cpf = ''.join(map(str, base))
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}" if formatado else cpf
+
+def gerar_placa(aleatorio):
+    letras = ''.join(aleatorio.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+    return f"{letras}{aleatorio.randrange(10)}{aleatorio.choice('ABCDEFGHIJ')}{aleatorio.randrange(100):02d}"
+
+def medir(funcao, repeticoes=3):
+    """Retorna o melhor tempo (em segundos) entre as repetições."""
+    return min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark de validação de placa e CPF.")
+    parser.add_argument("--registros", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    aleatorio = random.Random(42)
+    cpfs = [gerar_cpf(aleatorio, formatado=i % 2 == 0) for i in range(args.registros)]
+    placas = [gerar_placa(aleatorio) for _ in range(args.registros)]
+
+    assert [cpf_legado(c) for c in cpfs] == validacao.validar_cpfs(cpfs)
+    assert [placa_legada(p) for p in placas] == validacao.validar_placas(placas)
+
+    casos = [
+        ("CPF", "anterior", lambda: [cpf_legado(c) for c in cpfs]),
+        ("CPF", "individual", lambda: [validacao.cpf_valido(c) for c in cpfs]),
+        ("CPF", "lote" + (" (NumPy)" if validacao.np is not None else ""), lambda: validacao.validar_cpfs(cpfs)),
+        ("Placa", "anterior", lambda: [placa_legada(p) for p in placas]),
+        ("Placa", "individual", lambda: [validacao.placa_valida(p) for p in placas]),
+        ("Placa", "lote", lambda: validacao.validar_placas(placas)),
+    ]
+
+    print(f"{args.registros} registros por caso\n")
+    print(f"{'Regra':<6} {'Implementação':<16} {'ns/registro':>12} {'Ganho':>8}")
+    referencia = {}
+    for regra, nome, funcao in casos:
+        por_registro = medir(funcao) / args.registros * 1e9
+        referencia.setdefault(regra, por_registro)
+        print(f"{regra:<6} {nome:<16} {por_registro:>12.0f} {referencia[regra] / por_registro:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
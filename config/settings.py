@@ -22,6 +22,48 @@ DB_NAME = 'locadora.db'
 # Caminho completo do banco de dados
 DB_PATH = os.path.join(DADOS_DIR, DB_NAME)
 
+# Quantidade máxima de conexões mantidas abertas pelo pool
+DB_POOL_SIZE = 4
+
+# Tempo máximo de espera por um banco bloqueado (em milissegundos)
+DB_BUSY_TIMEOUT = 5000
+
+# Quantidade de comandos SQL preparados mantidos em cache por conexão
+DB_CACHED_STATEMENTS = 256
+
+# Tentativas de uma escrita (aluguel/devolução) quando o banco continua
+# ocupado após o busy_timeout, e espera antes da 2ª tentativa (em
+# milissegundos; dobra a cada nova tentativa)
+DB_TENTATIVAS_ESCRITA = 5
+DB_ESPERA_INICIAL_MS = 20
+
+# Quantidade de resultados de listagens mantidos em cache (0 desativa o cache)
+DB_CACHE_LEITURAS = 128
+
+# Mede as operações do módulo database (também ligado por DEBUG); chamadas
+# acima do limite (em milissegundos) vão para o log de consultas lentas
+# (None = dados/consultas_lentas.log)
+DB_INSTRUMENTACAO = False
+DB_LIMITE_LENTO_MS = 100
+DB_LOG_LENTAS = None
+
+# Aluguéis finalizados há mais dias que isto são movidos para o banco de
+# arquivo (dados/locadora_arquivo.db) por 'locadora.cli arquivar', em lotes
+# de até ARQUIVAMENTO_LOTE aluguéis
+ARQUIVAR_APOS_DIAS = 365
+ARQUIVAMENTO_LOTE = 1000
+
+# =============================================================================
+# CONFIGURAÇÕES DO SERVIDOR HTTP
+# =============================================================================
+
+# Endereço e porta de escuta da API (python -m locadora.servidor)
+API_HOST = '127.0.0.1'
+API_PORTA = 8080
+
+# Tempo máximo (em segundos) que uma conexão keep-alive pode ficar ociosa
+API_TIMEOUT_OCIOSO = 30
+
 # =============================================================================
 # CONFIGURAÇÕES DA INTERFACE
 # =============================================================================
@@ -75,3 +117,12 @@ AUTO_BACKUP = True
 
 # Intervalo de backup automático (em minutos)
 BACKUP_INTERVAL = 30
+
+# Diretório dos backups (None = dados/backups) e quantos backups manter
+BACKUP_DIR = None
+BACKUP_MANTER = 10
+
+# Páginas copiadas por passo do backup online e pausa entre os passos (em
+# milissegundos); passos menores seguram o banco por menos tempo
+BACKUP_PAGINAS_POR_PASSO = 256
+BACKUP_PAUSA_MS = 10
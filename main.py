@@ -31,6 +31,11 @@ def verificar_dependencias():
 
 def main():
     """Função principal do programa."""
+    # Com argumentos, executa a linha de comando sem carregar a interface gráfica
+    if len(sys.argv) > 1:
+        from locadora.cli import main as executar_cli
+        sys.exit(executar_cli(sys.argv[1:]))
+
     print("🚗 Sistema de Locadora de Veículos")
     print("=" * 40)
     print("🔄 Inicializando sistema...")
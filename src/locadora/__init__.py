@@ -6,6 +6,13 @@ de veículos, incluindo cadastro de veículos, clientes e controle de aluguéis.
 
 Módulos:
     - database: Módulo para operações de banco de dados
+    - conexao: Pool de conexões SQLite usado pelo módulo database
+    - cache: Cache das listagens, invalidado quando o banco muda
+    - executor: Execução de operações de banco em segundo plano para a interface
+    - importacao: Importação em lote de veículos e clientes (CSV/JSONL)
+    - cli: Operações pela linha de comando, sem interface gráfica
+    - servidor: API HTTP/JSON sobre as operações do módulo database
+    - validacao: Regras de placa e CPF, individuais e em lote
     - interface: Módulo da interface gráfica do usuário
     - models: Modelos de dados (futuro)
     - utils: Funções utilitárias (futuro)
@@ -19,9 +26,17 @@ __version__ = "1.0.0"
 __author__ = "João Milanezi"
 __email__ = "joao@exemplo.com"
 
-# Importações principais do pacote
+# Importações principais do pacote. A interface (e o tkinter) só é importada
+# quando LocadoraApp é acessada, para que scripts e a linha de comando
+# funcionem em servidores sem display e iniciem rapidamente.
 from .database import *
-from .interface import LocadoraApp
+
+
+def __getattr__(nome):
+    if nome == 'LocadoraApp':
+        from .interface import LocadoraApp
+        return LocadoraApp
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 __all__ = [
     'LocadoraApp',
@@ -31,5 +46,6 @@ __all__ = [
     'adicionar_cliente',
     'listar_clientes',
     'realizar_aluguel',
-    'realizar_devolucao'
+    'realizar_devolucao',
+    'transacao'
 ]
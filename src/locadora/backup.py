@@ -0,0 +1,202 @@
+"""
+Módulo de backup do Sistema de Locadora
+
+Copia o banco em uso com a API de backup online do SQLite, em passos de
+algumas páginas com uma pausa entre eles, para que a cópia nunca segure o
+banco por muito tempo. Durante toda a cópia a conexão de origem mantém uma
+transação de leitura aberta: no modo WAL isso fixa um instantâneo consistente
+sem bloquear quem escreve, e a cópia não precisa recomeçar a cada escrita.
+
+Cada cópia é gravada primeiro em um arquivo temporário, verificada com
+PRAGMA integrity_check e só então recebe o nome definitivo
+(locadora_AAAAMMDD_HHMMSS.db, e arquivo_AAAAMMDD_HHMMSS.db para o banco de
+aluguéis arquivados). As cópias mais antigas além do limite configurado são
+apagadas.
+
+Uso:
+    python -m locadora.cli backup
+"""
+
+import os
+import sqlite3
+import threading
+
+from . import database as db
+from .utils import obter_configuracao, obter_timestamp
+
+# Prefixos (banco principal e banco de arquivo) e extensão dos arquivos de backup
+PREFIXO_BACKUP = "locadora_"
+PREFIXO_BACKUP_ARQUIVO = "arquivo_"
+EXTENSAO_BACKUP = ".db"
+
+# =============================================================================
+# CÓPIA E VERIFICAÇÃO
+# =============================================================================
+
+def diretorio_padrao():
+    """Retorna o diretório de backups configurado (padrão: dados/backups)."""
+    return obter_configuracao('BACKUP_DIR') or os.path.join(db.DADOS_DIR, 'backups')
+
+def copiar_banco(origem, destino, paginas_por_passo=None, pausa_ms=None, progresso=None):
+    """Copia o banco 'origem' para 'destino' em passos, sem bloquear as escritas.
+
+    'progresso(restantes, total)' é chamado após cada passo, se informado.
+    """
+    paginas_por_passo = paginas_por_passo or obter_configuracao('BACKUP_PAGINAS_POR_PASSO', 256)
+    pausa_ms = obter_configuracao('BACKUP_PAUSA_MS', 10) if pausa_ms is None else pausa_ms
+    conn_origem = sqlite3.connect(origem, timeout=obter_configuracao('DB_BUSY_TIMEOUT', 5000) / 1000,
+                                  isolation_level=None)
+    conn_destino = sqlite3.connect(destino, isolation_level=None)
+    try:
+        # Transação de leitura aberta durante toda a cópia: todos os passos
+        # leem o mesmo instantâneo e escritas de outras conexões não reiniciam
+        # o backup.
+        conn_origem.execute("BEGIN")
+        conn_origem.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        conn_origem.backup(
+            conn_destino, pages=paginas_por_passo, sleep=pausa_ms / 1000,
+            progress=(lambda status, restantes, total: progresso(restantes, total)) if progresso else None)
+        conn_origem.execute("COMMIT")
+        # A cópia herda o modo WAL da origem; volta ao journal comum para que
+        # o backup seja um único arquivo autossuficiente.
+        conn_destino.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        conn_destino.close()
+        conn_origem.close()
+
+def verificar_integridade(caminho):
+    """Executa PRAGMA integrity_check no arquivo e retorna a lista de problemas ([] se íntegro)."""
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        resultado = [linha[0] for linha in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return [] if resultado == ["ok"] else resultado
+
+# =============================================================================
+# ROTAÇÃO
+# =============================================================================
+
+def listar_backups(diretorio=None, prefixo=PREFIXO_BACKUP):
+    """Retorna os caminhos dos backups do diretório, do mais antigo ao mais recente."""
+    diretorio = diretorio or diretorio_padrao()
+    if not os.path.isdir(diretorio):
+        return []
+    # O timestamp no nome (AAAAMMDD_HHMMSS) ordena cronologicamente
+    nomes = sorted(nome for nome in os.listdir(diretorio)
+                   if nome.startswith(prefixo) and nome.endswith(EXTENSAO_BACKUP))
+    return [os.path.join(diretorio, nome) for nome in nomes]
+
+def rotacionar_backups(diretorio=None, manter=None, prefixo=PREFIXO_BACKUP):
+    """Apaga os backups mais antigos, mantendo apenas os 'manter' mais recentes."""
+    manter = obter_configuracao('BACKUP_MANTER', 10) if manter is None else manter
+    backups = listar_backups(diretorio, prefixo)
+    removidos = backups[:max(0, len(backups) - max(1, manter))]
+    for caminho in removidos:
+        os.remove(caminho)
+    return removidos
+
+# =============================================================================
+# BACKUP COMPLETO
+# =============================================================================
+
+def _copiar_verificado(origem, destino):
+    """Copia para um temporário, verifica e só então dá o nome definitivo; retorna os problemas."""
+    temporario = destino + ".parcial"
+    try:
+        copiar_banco(origem, temporario)
+        problemas = verificar_integridade(temporario)
+        if not problemas:
+            os.replace(temporario, destino)
+        return problemas
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+def fazer_backup(origem=None, diretorio=None, manter=None):
+    """Copia, verifica e rotaciona os backups do banco em uso e do banco de arquivo.
+
+    O banco principal é copiado antes do arquivo: como o arquivamento grava no
+    arquivo antes de remover do principal, um aluguel arquivado durante o
+    backup aparece em ao menos uma das cópias.
+
+    Retorna (sucesso, mensagens), como as operações do módulo database.
+    """
+    origem = origem or db.NOME_BANCO_DADOS
+    diretorio = diretorio or diretorio_padrao()
+    if not os.path.exists(origem):
+        return False, [f"Banco de dados não encontrado: {origem}"]
+
+    timestamp = obter_timestamp()
+    copias = [(origem, PREFIXO_BACKUP)]
+    arquivo = db.caminho_arquivo(origem)
+    if arquivo and os.path.exists(arquivo):
+        copias.append((arquivo, PREFIXO_BACKUP_ARQUIVO))
+
+    mensagens, removidos = [], 0
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        for caminho, prefixo in copias:
+            destino = os.path.join(diretorio, f"{prefixo}{timestamp}{EXTENSAO_BACKUP}")
+            problemas = _copiar_verificado(caminho, destino)
+            if problemas:
+                return False, [f"A cópia de {caminho} falhou na verificação de integridade:"] + problemas[:10]
+            mensagens.append(f"Backup criado em {destino}.")
+            removidos += len(rotacionar_backups(diretorio, manter, prefixo))
+    except (sqlite3.Error, OSError) as e:
+        return False, [f"Erro ao criar o backup: {e}"]
+
+    if removidos:
+        mensagens.append(f"{removidos} backup(s) antigo(s) removido(s).")
+    return True, mensagens
+
+# =============================================================================
+# AGENDAMENTO
+# =============================================================================
+
+class AgendadorBackup:
+    """Executa fazer_backup() periodicamente em uma thread própria.
+
+    O intervalo vem de BACKUP_INTERVAL (em minutos). O primeiro backup é feito
+    um intervalo após iniciar; parar() interrompe a espera imediatamente.
+    """
+
+    def __init__(self, intervalo_min=None, ao_concluir=None, **opcoes):
+        self.intervalo = 60 * (obter_configuracao('BACKUP_INTERVAL', 30) if intervalo_min is None else intervalo_min)
+        # Chamado na thread do agendador com o retorno de fazer_backup()
+        self.ao_concluir = ao_concluir
+        self.opcoes = opcoes
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def ativo(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        if self.ativo:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="locadora-backup", daemon=True)
+        self._thread.start()
+
+    def parar(self, aguardar=True):
+        """Interrompe o agendamento; com 'aguardar', espera um backup em andamento terminar."""
+        self._parar.set()
+        if aguardar and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            resultado = fazer_backup(**self.opcoes)
+            if self.ao_concluir:
+                self.ao_concluir(resultado)
+
+def iniciar_backup_automatico(ao_concluir=None):
+    """Inicia o agendador se AUTO_BACKUP estiver ativo; retorna o agendador ou None."""
+    if not obter_configuracao('AUTO_BACKUP', False) or db.NOME_BANCO_DADOS == ":memory:":
+        return None
+    agendador = AgendadorBackup(ao_concluir=ao_concluir)
+    agendador.iniciar()
+    return agendador
@@ -0,0 +1,107 @@
+"""
+Módulo de cache de leituras do Sistema de Locadora
+
+Guarda o resultado das listagens do módulo database até que o banco mude.
+Duas fontes de mudança são observadas:
+
+- escritas deste processo: cada COMMIT do pool chama invalidar();
+- escritas de outros processos (ou conexões): uma conexão dedicada consulta
+  PRAGMA data_version, cujo valor muda sempre que outra conexão confirma
+  alterações no arquivo.
+
+Enquanto nada mudar, repetir uma listagem não executa nenhuma consulta nas
+tabelas; a verificação custa apenas a leitura do PRAGMA.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class CacheLeitura:
+    """Cache LRU de resultados de leitura, invalidado por mudanças no banco.
+
+    Os resultados são compartilhados entre quem os pede: não devem ser
+    alterados por quem os recebe.
+    """
+
+    def __init__(self, abrir_conexao=None, capacidade=128):
+        self.capacidade = max(0, int(capacidade))
+        self.acertos = 0
+        self.falhas = 0
+        # Função que abre a conexão usada para ler PRAGMA data_version
+        self.abrir_conexao = abrir_conexao
+        self._observador = None
+        self._pid = os.getpid()
+        self._trava = threading.Lock()
+        self._itens = OrderedDict()
+        self._geracao = 0
+        self._data_version = None
+
+    def invalidar(self):
+        """Descarta todos os resultados guardados (ex.: após uma escrita)."""
+        with self._trava:
+            self._geracao += 1
+            self._itens.clear()
+
+    def fechar(self):
+        """Fecha a conexão de observação e descarta os resultados."""
+        with self._trava:
+            observador, self._observador = self._observador, None
+            if os.getpid() != self._pid:
+                self._pid, observador = os.getpid(), None
+            self._geracao += 1
+            self._itens.clear()
+            self._data_version = None
+        if observador is not None:
+            try:
+                observador.close()
+            except sqlite3.Error:
+                pass
+
+    def _versao(self):
+        """Retorna a geração atual, invalidando antes se outra conexão escreveu."""
+        with self._trava:
+            if os.getpid() != self._pid:
+                # Conexão herdada via fork: abandona sem fechar (pertence ao processo pai)
+                self._pid, self._observador, self._data_version = os.getpid(), None, None
+            if self.abrir_conexao is not None:
+                if self._observador is None:
+                    self._observador = self.abrir_conexao()
+                data_version = self._observador.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._data_version:
+                    self._data_version = data_version
+                    self._geracao += 1
+                    self._itens.clear()
+            return self._geracao
+
+    def obter(self, chave, carregar):
+        """Retorna o resultado guardado para a chave ou executa 'carregar()'."""
+        if not self.capacidade:
+            return carregar()
+        # A geração é lida antes da consulta: se uma escrita acontecer durante
+        # a consulta, o resultado fica guardado com a geração antiga e é
+        # ignorado na próxima leitura.
+        geracao = self._versao()
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None and item[0] == geracao:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[1]
+            self.falhas += 1
+
+        resultado = carregar()
+        with self._trava:
+            if geracao == self._geracao:
+                self._itens[chave] = (geracao, resultado)
+                self._itens.move_to_end(chave)
+                while len(self._itens) > self.capacidade:
+                    self._itens.popitem(last=False)
+        return resultado
+
+    def estatisticas(self):
+        """Retorna as contagens de acertos, falhas e itens guardados."""
+        with self._trava:
+            return {"acertos": self.acertos, "falhas": self.falhas, "itens": len(self._itens)}
@@ -0,0 +1,391 @@
+"""
+Módulo de linha de comando do Sistema de Locadora
+
+Permite operar a locadora sem interface gráfica (ex.: em servidores sem
+display ou em scripts). Este módulo nunca importa tkinter nem o módulo
+interface, de modo que uma operação isolada inicia em poucas dezenas de
+milissegundos.
+
+Uso:
+    python -m locadora.cli alugar ABC1D23 123.456.789-09 --devolucao 2025-08-05
+    python -m locadora.cli devolver ABC1D23
+    python -m locadora.cli alugar-lote ABC1D23:123.456.789-09 XYZ9W87:98765432100
+    python -m locadora.cli devolver-lote ABC1D23 XYZ9W87
+    python -m locadora.cli reservar ABC1D23 123.456.789-09 2025-08-01 2025-08-05
+    python -m locadora.cli disponiveis 2025-08-01 2025-08-05
+    python -m locadora.cli backup --manter 5
+    python -m locadora.cli arquivar --dias 365
+    python -m locadora.cli veiculos --status Disponível
+    python -m locadora.cli clientes --busca "ana silva"
+    python -m locadora.cli historico --cpf 12345678909 --json
+    python -m locadora.cli faturamento 2025-07-01 2025-07-31
+    python -m locadora.cli faturamento 2025-01-01 2025-12-31 --por mes,marca --subtotais
+    python -m locadora.cli --diagnostico veiculos > /dev/null
+    python -m locadora.cli diagnostico --servidor http://127.0.0.1:8080
+    python -m locadora.cli exportar julho.csv.gz --inicio 2025-07-01 --fim 2025-07-31
+"""
+
+import argparse
+import json
+import os
+import sys
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from . import database as db
+from .backup import fazer_backup
+from .exportacao import FORMATOS, exportar_historico
+from .utils import formatar_cpf, formatar_moeda, formatar_texto_capitalizado, obter_configuracao
+
+# =============================================================================
+# SAÍDA
+# =============================================================================
+
+def _imprimir_mensagens(sucesso, mensagens, destino=None):
+    simbolo = "✅" if sucesso else "❌"
+    destino = destino or (sys.stdout if sucesso else sys.stderr)
+    for mensagem in mensagens:
+        print(f"{simbolo} {mensagem}", file=destino)
+    return 0 if sucesso else 1
+
+def _imprimir_registros(registros, colunas, formatar, como_json):
+    """Imprime registros conforme chegam (página a página), em tabela ou JSONL."""
+    quantidade = 0
+    for registro in registros:
+        if como_json:
+            print(json.dumps(registro, ensure_ascii=False))
+        else:
+            if quantidade == 0:
+                print(" | ".join(colunas))
+            print(" | ".join(str(valor) for valor in formatar(registro)))
+        quantidade += 1
+    if not como_json:
+        print(f"({quantidade} registro(s))")
+    return 0
+
+def _imprimir_diagnostico(diagnostico, destino=None):
+    """Imprime as estatísticas de operações e do cache no formato do endpoint /diagnostico."""
+    destino = destino or sys.stdout
+    estado = "ativa" if diagnostico["ativa"] else "desligada"
+    print(f"🩺 Instrumentação {estado}; consultas lentas acima de {diagnostico['limite_lento_ms']:g} ms", file=destino)
+    print(" | ".join(("Operação", "Chamadas", "Erros", "Total (ms)", "Média (ms)", "Máx (ms)", "Linhas", "SQL",
+                      *diagnostico["faixas_histograma"])), file=destino)
+    for item in diagnostico["operacoes"]:
+        print(" | ".join(str(valor) for valor in (
+            item["funcao"], item["chamadas"], item["erros"], f"{item['total_ms']:.1f}", f"{item['media_ms']:.3f}",
+            f"{item['max_ms']:.1f}", item["linhas"], item["comandos_sql"], *item["histograma"])), file=destino)
+    cache = diagnostico["cache"]
+    print(f"💾 Cache de leituras: {cache['acertos']} acerto(s), {cache['falhas']} falha(s), "
+          f"{cache['itens']} item(ns)", file=destino)
+
+def _paginas(funcao, *args, **kwargs):
+    """Percorre todas as páginas de uma função *_paginado sem carregar tudo na memória."""
+    cursor = None
+    while True:
+        itens, cursor = funcao(*args, cursor=cursor, **kwargs)
+        yield from itens
+        if cursor is None:
+            return
+
+# =============================================================================
+# SUBCOMANDOS
+# =============================================================================
+
+def comando_alugar(args):
+    return _imprimir_mensagens(*db.realizar_aluguel(args.placa, args.cpf, args.devolucao))
+
+def comando_devolver(args):
+    sucesso, mensagens, _ = db.realizar_devolucao(args.placa)
+    return _imprimir_mensagens(sucesso, mensagens)
+
+def _imprimir_lote(resposta, como_json):
+    """Imprime o resultado de cada item de uma operação em lote; falha se algum foi recusado."""
+    sucesso, resultados = resposta
+    if not sucesso:
+        return _imprimir_mensagens(False, resultados)
+    for item in resultados:
+        if como_json:
+            print(json.dumps(item, ensure_ascii=False))
+        else:
+            print(f"{'✅' if item['sucesso'] else '❌'} {item['placa']}: {item['mensagem']}")
+    recusados = sum(1 for item in resultados if not item["sucesso"])
+    if not como_json:
+        print(f"({len(resultados) - recusados} aceito(s), {recusados} recusado(s))")
+    return 1 if recusados else 0
+
+def comando_alugar_lote(args):
+    pares = []
+    for par in args.pares:
+        placa, separador, cpf = par.partition(":")
+        if not separador:
+            return _imprimir_mensagens(False, [f"Item inválido: {par}. Use PLACA:CPF."])
+        pares.append((placa, cpf))
+    return _imprimir_lote(db.realizar_alugueis_em_lote(pares, args.devolucao), args.json)
+
+def comando_devolver_lote(args):
+    return _imprimir_lote(db.realizar_devolucoes_em_lote(args.placas), args.json)
+
+def comando_reservar(args):
+    return _imprimir_mensagens(*db.criar_reserva(args.placa, args.cpf, args.inicio, args.fim))
+
+def comando_cancelar_reserva(args):
+    return _imprimir_mensagens(*db.cancelar_reserva(args.id))
+
+def comando_reservas(args):
+    return _imprimir_registros(
+        db.listar_reservas(args.placa, args.cpf),
+        ("ID", "Placa", "CPF", "Cliente", "Início", "Fim"),
+        lambda r: (r['id'], r['placa_carro'], formatar_cpf(r['cpf_cliente']),
+                   formatar_texto_capitalizado(r['nome_cliente'] or "-"), r['inicio'], r['fim']),
+        args.json,
+    )
+
+def comando_disponiveis(args):
+    sucesso, resultado = db.listar_veiculos_disponiveis(args.inicio, args.fim)
+    if not sucesso:
+        return _imprimir_mensagens(False, resultado)
+    return _imprimir_registros(
+        resultado,
+        ("Placa", "Marca", "Modelo", "Ano", "Cor", "Diária", "Status"),
+        lambda v: (v['placa'], formatar_texto_capitalizado(v['marca']), formatar_texto_capitalizado(v['modelo']),
+                   v['ano'], formatar_texto_capitalizado(v['cor']), formatar_moeda(v['valor_diaria']), v['status']),
+        args.json,
+    )
+
+def comando_diagnostico(args):
+    url = args.servidor or f"http://{obter_configuracao('API_HOST', '127.0.0.1')}:{obter_configuracao('API_PORTA', 8080)}"
+    try:
+        with urlopen(url.rstrip("/") + "/diagnostico", timeout=10) as resposta:
+            diagnostico = json.load(resposta)
+    except (URLError, OSError, ValueError) as e:
+        return _imprimir_mensagens(False, [f"Não foi possível consultar {url}: {e}"])
+    if args.json:
+        print(json.dumps(diagnostico, ensure_ascii=False))
+    else:
+        _imprimir_diagnostico(diagnostico)
+    return 0
+
+def comando_arquivar(args):
+    sucesso, mensagens = db.arquivar_alugueis(args.dias, args.lote)
+    if sucesso:
+        contagem = db.contar_alugueis_arquivados()
+        mensagens.append(f"Banco principal: {contagem['principal']} aluguel(is); arquivo: {contagem['arquivo']}.")
+    return _imprimir_mensagens(sucesso, mensagens)
+
+def comando_backup(args):
+    return _imprimir_mensagens(*fazer_backup(diretorio=args.diretorio, manter=args.manter))
+
+def comando_exportar(args):
+    sucesso, mensagens = exportar_historico(
+        args.destino, args.formato, True if args.gzip else None, args.cpf, args.inicio, args.fim)
+    # Com a saída padrão como destino, as mensagens não podem se misturar aos dados
+    return _imprimir_mensagens(sucesso, mensagens, sys.stderr if args.destino == "-" else None)
+
+def comando_veiculos(args):
+    return _imprimir_registros(
+        _paginas(db.listar_veiculos_paginado, status_filtro=args.status),
+        ("Placa", "Marca", "Modelo", "Ano", "Cor", "Diária", "Status"),
+        lambda v: (v['placa'], formatar_texto_capitalizado(v['marca']), formatar_texto_capitalizado(v['modelo']),
+                   v['ano'], formatar_texto_capitalizado(v['cor']), formatar_moeda(v['valor_diaria']), v['status']),
+        args.json,
+    )
+
+def comando_clientes(args):
+    return _imprimir_registros(
+        db.buscar_clientes(args.busca) if args.busca else _paginas(db.listar_clientes_paginado),
+        ("CPF", "Nome", "Telefone", "Email"),
+        lambda c: (formatar_cpf(c['cpf']), formatar_texto_capitalizado(c['nome']), c['telefone'] or "", c['email'] or ""),
+        args.json,
+    )
+
+def comando_ativos(args):
+    return _imprimir_registros(
+        db.listar_alugueis_ativos(),
+        ("ID", "Placa", "CPF", "Retirada"),
+        lambda a: (a['id'], a['placa_carro'], formatar_cpf(a['cpf_cliente']), a['data_retirada']),
+        args.json,
+    )
+
+def comando_historico(args):
+    return _imprimir_registros(
+        _paginas(db.buscar_historico_paginado, args.cpf),
+        ("ID", "Placa", "CPF", "Retirada", "Devolução", "Valor", "Status"),
+        lambda a: (a['id'], a['placa_carro'], formatar_cpf(a['cpf_cliente']), a['data_retirada'],
+                   a['data_devolucao'] or "-", formatar_moeda(a['valor_total'] or 0), a['status']),
+        args.json,
+    )
+
+def comando_faturamento(args):
+    if args.por:
+        return _imprimir_faturamento_detalhado(args)
+    sucesso, resultado = db.calcular_faturamento_periodo(args.inicio, args.fim)
+    if not sucesso:
+        return _imprimir_mensagens(False, resultado)
+    if args.json:
+        print(json.dumps({"inicio": args.inicio, "fim": args.fim, "faturamento": resultado}))
+    else:
+        print(f"💰 Faturamento de {args.inicio} a {args.fim}: {formatar_moeda(resultado)}")
+    return 0
+
+def _imprimir_faturamento_detalhado(args):
+    dimensoes = [d.strip() for d in args.por.split(",") if d.strip()]
+    sucesso, resultado = db.faturamento_detalhado(args.inicio, args.fim, dimensoes, args.subtotais)
+    if not sucesso:
+        return _imprimir_mensagens(False, resultado)
+    cabecalho = [d.capitalize() for d in dimensoes] + (["Nome"] if "cliente" in dimensoes else [])
+    return _imprimir_registros(
+        resultado,
+        ("Nível", *cabecalho, "Aluguéis", "Faturamento"),
+        lambda f: (f['nivel'], *("*" if f[d] is None else f[d] for d in dimensoes),
+                   *([f['nome_cliente'] or "-"] if "cliente" in dimensoes else []),
+                   f['alugueis'], formatar_moeda(f['faturamento'])),
+        args.json,
+    )
+
+def comando_utilizacao(args):
+    sucesso, resultado = db.relatorio_utilizacao_frota(args.inicio, args.fim)
+    if not sucesso:
+        return _imprimir_mensagens(False, resultado)
+    return _imprimir_registros(
+        resultado,
+        ("Placa", "Marca", "Modelo", "Aluguéis", "Dias alugados", "Utilização", "Maior ociosidade", "Receita"),
+        lambda u: (u['placa'], formatar_texto_capitalizado(u['marca']), formatar_texto_capitalizado(u['modelo']),
+                   u['alugueis'], u['dias_alugados'], f"{u['utilizacao']}%", u['maior_ociosidade'],
+                   formatar_moeda(u['receita'])),
+        args.json,
+    )
+
+# =============================================================================
+# LINHA DE COMANDO
+# =============================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="locadora", description="Operações da locadora sem interface gráfica.")
+    parser.add_argument("--banco", help="arquivo de banco de dados (padrão: dados/locadora.db)")
+    parser.add_argument("--diagnostico", action="store_true",
+                        help="mede as operações do comando e imprime as estatísticas na saída de erros")
+    subparsers = parser.add_subparsers(dest="comando", metavar="comando")
+    subparsers.required = True
+
+    # Opção --json compartilhada pelos subcomandos de consulta
+    saida = argparse.ArgumentParser(add_help=False)
+    saida.add_argument("--json", action="store_true", help="imprime um objeto JSON por linha")
+
+    # Opção --devolucao compartilhada pelos subcomandos de aluguel
+    devolucao = argparse.ArgumentParser(add_help=False)
+    devolucao.add_argument("--devolucao", metavar="AAAA-MM-DD",
+                           help="devolução prevista (sem ela, o veículo não aceita reservas enquanto estiver alugado)")
+
+    sub = subparsers.add_parser("alugar", parents=[devolucao], help="registra a retirada de um veículo")
+    sub.add_argument("placa")
+    sub.add_argument("cpf")
+    sub.set_defaults(funcao=comando_alugar)
+
+    sub = subparsers.add_parser("devolver", help="registra a devolução de um veículo")
+    sub.add_argument("placa")
+    sub.set_defaults(funcao=comando_devolver)
+
+    sub = subparsers.add_parser("alugar-lote", parents=[saida, devolucao],
+                                help="registra várias retiradas em uma única transação")
+    sub.add_argument("pares", nargs="+", metavar="PLACA:CPF")
+    sub.set_defaults(funcao=comando_alugar_lote)
+
+    sub = subparsers.add_parser("devolver-lote", parents=[saida],
+                                help="registra várias devoluções em uma única transação")
+    sub.add_argument("placas", nargs="+", metavar="PLACA")
+    sub.set_defaults(funcao=comando_devolver_lote)
+
+    sub = subparsers.add_parser("reservar", help="reserva um veículo para um cliente em um período futuro")
+    sub.add_argument("placa")
+    sub.add_argument("cpf")
+    sub.add_argument("inicio", help="primeiro dia da reserva (AAAA-MM-DD)")
+    sub.add_argument("fim", help="último dia da reserva, inclusive (AAAA-MM-DD)")
+    sub.set_defaults(funcao=comando_reservar)
+
+    sub = subparsers.add_parser("cancelar-reserva", help="cancela uma reserva ativa")
+    sub.add_argument("id", type=int, help="número da reserva")
+    sub.set_defaults(funcao=comando_cancelar_reserva)
+
+    sub = subparsers.add_parser("reservas", parents=[saida], help="lista as reservas ativas que ainda não terminaram")
+    sub.add_argument("--placa", help="filtra pela placa do veículo")
+    sub.add_argument("--cpf", help="filtra pelo CPF do cliente")
+    sub.set_defaults(funcao=comando_reservas)
+
+    sub = subparsers.add_parser("backup", help="cria um backup verificado do banco em uso")
+    sub.add_argument("--diretorio", help="diretório dos backups (padrão: BACKUP_DIR ou dados/backups)")
+    sub.add_argument("--manter", type=int, help="quantidade de backups mantidos (padrão: BACKUP_MANTER)")
+    sub.set_defaults(funcao=comando_backup)
+
+    sub = subparsers.add_parser("arquivar", help="move aluguéis finalizados antigos para o banco de arquivo")
+    sub.add_argument("--dias", type=int, help="idade mínima da devolução, em dias (padrão: ARQUIVAR_APOS_DIAS)")
+    sub.add_argument("--lote", type=int, help="aluguéis movidos por transação (padrão: ARQUIVAMENTO_LOTE)")
+    sub.set_defaults(funcao=comando_arquivar)
+
+    sub = subparsers.add_parser("veiculos", parents=[saida], help="lista os veículos")
+    sub.add_argument("--status", choices=("Disponível", "Alugado"), help="filtra pelo status")
+    sub.set_defaults(funcao=comando_veiculos)
+
+    sub = subparsers.add_parser("clientes", parents=[saida], help="lista os clientes")
+    sub.add_argument("--busca", help="busca por nome, e-mail ou telefone (mais relevantes primeiro)")
+    sub.set_defaults(funcao=comando_clientes)
+
+    sub = subparsers.add_parser("ativos", parents=[saida], help="lista os aluguéis ativos")
+    sub.set_defaults(funcao=comando_ativos)
+
+    sub = subparsers.add_parser("historico", parents=[saida], help="lista o histórico de aluguéis")
+    sub.add_argument("--cpf", help="filtra pelo CPF do cliente")
+    sub.set_defaults(funcao=comando_historico)
+
+    sub = subparsers.add_parser("exportar", help="exporta o histórico de aluguéis (CSV ou JSONL)")
+    sub.add_argument("destino", help="arquivo de saída (.csv, .jsonl, .csv.gz, .jsonl.gz) ou '-' para a saída padrão")
+    sub.add_argument("--formato", choices=FORMATOS, help="formato da saída (padrão: pela extensão, ou csv)")
+    sub.add_argument("--gzip", action="store_true", help="compacta a saída com gzip")
+    sub.add_argument("--cpf", help="filtra pelo CPF do cliente")
+    sub.add_argument("--inicio", help="retiradas a partir desta data (AAAA-MM-DD)")
+    sub.add_argument("--fim", help="retiradas até esta data, inclusive (AAAA-MM-DD)")
+    sub.set_defaults(funcao=comando_exportar)
+
+    sub = subparsers.add_parser("diagnostico", parents=[saida],
+                                help="estatísticas das operações de um servidor da API em execução")
+    sub.add_argument("--servidor", help="URL do servidor (padrão: http://API_HOST:API_PORTA)")
+    sub.set_defaults(funcao=comando_diagnostico)
+
+    for nome, funcao, ajuda in (
+        ("faturamento", comando_faturamento, "faturamento no período"),
+        ("utilizacao", comando_utilizacao, "utilização da frota no período"),
+        ("disponiveis", comando_disponiveis, "veículos livres em todos os dias do período"),
+    ):
+        sub = subparsers.add_parser(nome, parents=[saida], help=ajuda)
+        sub.add_argument("inicio", help="data inicial (AAAA-MM-DD)")
+        sub.add_argument("fim", help="data final (AAAA-MM-DD)")
+        sub.set_defaults(funcao=funcao)
+        if nome == "faturamento":
+            sub.add_argument("--por", help="detalha por dimensões separadas por vírgula "
+                                           f"({', '.join(db.DIMENSOES_FATURAMENTO)}), da mais externa à mais interna")
+            sub.add_argument("--subtotais", action="store_true", help="inclui os subtotais de cada nível e o total geral")
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.banco:
+        db.configurar_banco(args.banco)
+    if args.diagnostico:
+        db.ativar_instrumentacao()
+    try:
+        db.criar_tabelas()
+        return args.funcao(args)
+    except BrokenPipeError:
+        # Saída interrompida (ex.: '| head'); não é um erro da operação. A
+        # saída padrão passa a apontar para devnull, para que o flush no
+        # encerramento não falhe de novo; a de erros continua aberta para o
+        # diagnóstico.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if args.diagnostico:
+            _imprimir_diagnostico(db.diagnostico(), sys.stderr)
+        db.fechar_conexoes()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Módulo de conexões do Sistema de Locadora
+
+Mantém um pool de conexões SQLite reaproveitáveis. Cada thread recebe o seu
+próprio handle enquanto estiver usando o banco, e as configurações da conexão
+(WAL, busy_timeout, cache de comandos) são aplicadas uma única vez, quando a
+conexão é aberta.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+
+
+class PoolConexoes:
+    """Pool limitado de conexões SQLite com handles por thread."""
+
+    def __init__(self, caminho, tamanho=4, busy_timeout=5000, cached_statements=256, ao_confirmar=None,
+                 rastrear_sql=None, ao_abrir=None):
+        self.caminho = caminho
+        self.tamanho = max(1, int(tamanho))
+        self.busy_timeout = int(busy_timeout)
+        self.cached_statements = int(cached_statements)
+        # Chamado após cada COMMIT da transação mais externa
+        self.ao_confirmar = ao_confirmar
+        # Trace callback instalado nas conexões (recebe cada comando SQL executado)
+        self.rastrear_sql = rastrear_sql
+        # Chamado com cada conexão recém-aberta, depois das configurações do pool
+        self.ao_abrir = ao_abrir
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        self._pid = os.getpid()
+        self._livres = LifoQueue()
+        self._vagas = threading.BoundedSemaphore(self.tamanho)
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._abertas = set()
+
+    def _verificar_processo(self):
+        # Conexões herdadas via fork não podem ser usadas no processo filho.
+        if os.getpid() != self._pid:
+            self._reiniciar_estado()
+
+    def abrir_conexao(self):
+        """Abre uma nova conexão já configurada (fora do controle do pool)."""
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        conn = sqlite3.connect(
+            self.caminho,
+            timeout=self.busy_timeout / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        if self.rastrear_sql is not None:
+            conn.set_trace_callback(self.rastrear_sql)
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        if self.caminho != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        if self.ao_abrir is not None:
+            try:
+                self.ao_abrir(conn)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def _obter(self):
+        self._vagas.acquire()
+        try:
+            return self._livres.get_nowait()
+        except Empty:
+            pass
+        try:
+            conn = self.abrir_conexao()
+        except Exception:
+            self._vagas.release()
+            raise
+        with self._trava:
+            self._abertas.add(conn)
+        return conn
+
+    def _devolver(self, conn):
+        with self._trava:
+            ativa = conn in self._abertas
+        try:
+            if not ativa:
+                # O pool foi fechado enquanto a conexão estava emprestada.
+                conn.close()
+            else:
+                if conn.in_transaction:
+                    # Nunca devolve ao pool uma conexão com transação pendente.
+                    conn.rollback()
+                self._livres.put(conn)
+        finally:
+            self._vagas.release()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta à thread atual uma conexão do pool e devolve ao final.
+
+        Chamadas aninhadas na mesma thread reutilizam a mesma conexão.
+        """
+        self._verificar_processo()
+        local = self._local
+        if getattr(local, "conn", None) is not None:
+            local.usos += 1
+            try:
+                yield local.conn
+            finally:
+                local.usos -= 1
+            return
+
+        conn = self._obter()
+        local.conn, local.usos, local.transacoes = conn, 1, 0
+        try:
+            yield conn
+        finally:
+            local.conn, local.usos, local.transacoes = None, 0, 0
+            self._devolver(conn)
+
+    def definir_rastreamento(self, rastrear_sql):
+        """Troca o trace callback das conexões abertas e das próximas (None desliga)."""
+        self.rastrear_sql = rastrear_sql
+        with self._trava:
+            abertas = list(self._abertas)
+        for conn in abertas:
+            conn.set_trace_callback(rastrear_sql)
+
+    def em_transacao(self):
+        """Indica se a thread atual está dentro de um bloco transacao()."""
+        return getattr(self._local, "transacoes", 0) > 0
+
+    @contextmanager
+    def transacao(self, imediata=False):
+        """Agrupa as operações do bloco em uma única transação.
+
+        Na transação mais externa executa BEGIN/COMMIT; blocos aninhados usam
+        SAVEPOINT, de modo que uma falha interna desfaz apenas a sua parte.
+        Com 'imediata', a transação externa começa com BEGIN IMMEDIATE e já
+        reserva a escrita: escritores concorrentes esperam na fila do
+        busy_timeout em vez de falharem ao promover a leitura para escrita.
+        Em blocos aninhados o modo é decidido pela transação externa.
+        """
+        with self.conexao() as conn:
+            local = self._local
+            nivel = local.transacoes
+            cursor = conn.cursor()
+            if nivel == 0:
+                cursor.execute("BEGIN IMMEDIATE" if imediata else "BEGIN")
+            else:
+                cursor.execute(f"SAVEPOINT sp_{nivel}")
+            local.transacoes = nivel + 1
+            try:
+                yield cursor
+            except BaseException:
+                local.transacoes = nivel
+                if nivel == 0:
+                    conn.rollback()
+                else:
+                    cursor.execute(f"ROLLBACK TO sp_{nivel}")
+                    cursor.execute(f"RELEASE sp_{nivel}")
+                raise
+            else:
+                local.transacoes = nivel
+                if nivel == 0:
+                    cursor.execute("COMMIT")
+                    if self.ao_confirmar:
+                        self.ao_confirmar()
+                else:
+                    cursor.execute(f"RELEASE sp_{nivel}")
+
+    def renovar(self):
+        """Descarta as conexões atuais para que as próximas passem de novo por 'ao_abrir'.
+
+        As livres são fechadas já; as emprestadas seguem em uso e são fechadas
+        ao serem devolvidas.
+        """
+        with self._trava:
+            self._abertas = set()
+        while True:
+            try:
+                conn = self._livres.get_nowait()
+            except Empty:
+                break
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def fechar(self):
+        """Fecha todas as conexões abertas pelo pool."""
+        with self._trava:
+            abertas, self._abertas = self._abertas, set()
+        while True:
+            try:
+                self._livres.get_nowait()
+            except Empty:
+                break
+        for conn in abertas:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
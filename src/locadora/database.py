@@ -1,8 +1,19 @@
 import sqlite3
-import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial, wraps
+import calendar
 import math
 import os
+import json
+import base64
+import random
+import re
+import time
+
+from . import instrumentacao, validacao
+from .cache import CacheLeitura
+from .conexao import PoolConexoes
+from .utils import obter_configuracao
 
 # =============================================================================
 # CONFIGURAÇÃO E CONEXÃO COM O BANCO DE DADOS
@@ -16,60 +27,536 @@ NOME_BANCO_DADOS = os.path.join(DADOS_DIR, 'locadora.db')
 # Cria a pasta dados se não existir
 os.makedirs(DADOS_DIR, exist_ok=True)
 
+# Aluguéis finalizados antigos são movidos para um banco de arquivo, anexado
+# a cada conexão como 'arquivo' (ver arquivar_alugueis). Colunas da tabela de
+# aluguéis, na mesma ordem nos dois bancos (as duas últimas são as datas em
+# segundos, ver a migração 6):
+COLUNAS_ALUGUEIS = ("id", "placa_carro", "cpf_cliente", "data_retirada", "data_devolucao", "valor_total", "status",
+                    "retirada_ts", "devolucao_ts")
+
+def caminho_arquivo(caminho_banco):
+    """Retorna o arquivo do banco de arquivo (ex.: dados/locadora_arquivo.db), ou None em memória."""
+    if caminho_banco == ":memory:":
+        return None
+    base, extensao = os.path.splitext(caminho_banco)
+    return f"{base}_arquivo{extensao or '.db'}"
+
+def _anexar_arquivo(caminho, conn):
+    """Anexa o banco de arquivo, se já existir, e cria a visão 'historico_alugueis'.
+
+    A visão une os aluguéis do banco principal (ativos e recentes) aos
+    arquivados; as consultas de histórico e de relatórios leem dela e não
+    precisam saber onde cada aluguel está. O esquema do arquivo é criado por
+    _preparar_arquivo, chamado em criar_tabelas, e não aqui, a cada conexão
+    aberta.
+    """
+    colunas = ", ".join(COLUNAS_ALUGUEIS)
+    origem = f"SELECT {colunas} FROM main.alugueis"
+    if caminho is not None and os.path.exists(caminho):
+        conn.execute("ATTACH DATABASE ? AS arquivo", (caminho,))
+        if conn.execute("SELECT 1 FROM arquivo.sqlite_master WHERE type = 'table' AND name = 'alugueis'").fetchone():
+            conn.execute("PRAGMA arquivo.synchronous = NORMAL")
+            origem += f" UNION ALL SELECT {colunas} FROM arquivo.alugueis"
+        else:
+            # Arquivo ainda sem esquema (ex.: criação interrompida)
+            conn.execute("DETACH DATABASE arquivo")
+    conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS historico_alugueis AS {origem}")
+
+def _arquivo_anexado(conn):
+    """Indica se o banco de arquivo está anexado à conexão."""
+    return any(row[1] == "arquivo" for row in conn.execute("PRAGMA database_list"))
+
+def _criar_pool(caminho):
+    return PoolConexoes(
+        caminho,
+        tamanho=obter_configuracao('DB_POOL_SIZE', 4),
+        busy_timeout=obter_configuracao('DB_BUSY_TIMEOUT', 5000),
+        cached_statements=obter_configuracao('DB_CACHED_STATEMENTS', 256),
+        ao_confirmar=_cache.invalidar,
+        rastrear_sql=instrumentacao.rastrear_sql if instrumentacao.ativa() else None,
+        ao_abrir=partial(_anexar_arquivo, caminho_arquivo(caminho)),
+    )
+
+# Cache das listagens, invalidado a cada COMMIT deste processo e, via
+# PRAGMA data_version, por escritas de outros processos
+_cache = CacheLeitura(capacidade=obter_configuracao('DB_CACHE_LEITURAS', 128))
+
+# Pool compartilhado por todas as operações deste módulo
+_pool = _criar_pool(NOME_BANCO_DADOS)
+_cache.abrir_conexao = _pool.abrir_conexao
+
+def configurar_banco(caminho=None):
+    """Aponta o módulo para outro arquivo de banco, fechando as conexões atuais."""
+    global NOME_BANCO_DADOS, _pool
+    _pool.fechar()
+    _cache.fechar()
+    NOME_BANCO_DADOS = caminho or os.path.join(DADOS_DIR, 'locadora.db')
+    _pool = _criar_pool(NOME_BANCO_DADOS)
+    _cache.abrir_conexao = _pool.abrir_conexao
+
+def fechar_conexoes():
+    """Fecha as conexões mantidas pelo pool (ex.: ao encerrar a aplicação)."""
+    _pool.fechar()
+    _cache.fechar()
+
+def _copiar_resultado(resultado):
+    """Copia as listas, tuplas e dicionários de um resultado guardado no cache."""
+    if isinstance(resultado, list):
+        return [_copiar_resultado(item) for item in resultado]
+    if isinstance(resultado, tuple):
+        return tuple(_copiar_resultado(item) for item in resultado)
+    if isinstance(resultado, dict):
+        return {chave: _copiar_resultado(valor) for chave, valor in resultado.items()}
+    return resultado
+
+def em_cache(funcao):
+    """Decora uma função de leitura para guardar seus resultados no cache.
+
+    Cada chamada recebe uma cópia do resultado guardado: quem a altera (ex.:
+    ordena a lista ou acrescenta campos a um item) não afeta as próximas
+    chamadas. Dentro de uma transação o cache é ignorado, pois a leitura
+    pode enxergar alterações ainda não confirmadas.
+    """
+    @wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if _pool.em_transacao():
+            return funcao(*args, **kwargs)
+        chave = (funcao.__name__, args, tuple(sorted(kwargs.items())))
+        return _copiar_resultado(_cache.obter(chave, lambda: funcao(*args, **kwargs)))
+    return envoltorio
+
+def estatisticas_cache():
+    """Retorna acertos, falhas e itens guardados no cache de leituras."""
+    return _cache.estatisticas()
+
+def ativar_instrumentacao(ativa=True):
+    """Liga ou desliga a medição das operações e a captura dos comandos SQL."""
+    instrumentacao.definir_ativa(ativa)
+    _pool.definir_rastreamento(instrumentacao.rastrear_sql if ativa else None)
+
+def estatisticas_operacoes():
+    """Retorna as estatísticas das operações medidas (ver módulo instrumentacao)."""
+    return instrumentacao.estatisticas()
+
+def diagnostico():
+    """Reúne o estado da instrumentação, as estatísticas das operações e as do cache."""
+    return {
+        "ativa": instrumentacao.ativa(),
+        "limite_lento_ms": instrumentacao.limite_lento_ms(),
+        "faixas_histograma": instrumentacao.rotulos_histograma(),
+        "operacoes": estatisticas_operacoes(),
+        "cache": estatisticas_cache(),
+    }
+
 def conectar_bd():
-    """Conecta ao banco de dados SQLite e retorna a conexão e o cursor."""
-    conn = sqlite3.connect(NOME_BANCO_DADOS)
-    conn.row_factory = sqlite3.Row
+    """Abre uma conexão independente do pool e retorna a conexão e o cursor."""
+    conn = _pool.abrir_conexao()
     cursor = conn.cursor()
     return conn, cursor
 
+def conexao():
+    """Context manager que empresta uma conexão do pool para leituras."""
+    return _pool.conexao()
+
+def transacao(imediata=False):
+    """Context manager que agrupa várias operações em uma única transação.
+
+    Use 'imediata=True' em transações que vão escrever: o bloqueio de escrita
+    é obtido já no BEGIN, evitando conflitos entre leitura e escrita.
+
+    Exemplo:
+        with transacao():
+            adicionar_cliente(...)
+            realizar_aluguel(...)
+    """
+    return _pool.transacao(imediata)
+
+# Tentativas e espera inicial (com backoff exponencial) para escritas que
+# encontram o banco ocupado mesmo após o busy_timeout
+TENTATIVAS_ESCRITA = obter_configuracao('DB_TENTATIVAS_ESCRITA', 5)
+ESPERA_INICIAL_ESCRITA = obter_configuracao('DB_ESPERA_INICIAL_MS', 20) / 1000
+
+def _banco_ocupado(erro):
+    return isinstance(erro, sqlite3.OperationalError) and (
+        "locked" in str(erro) or "busy" in str(erro))
+
+def executar_com_retentativas(operacao, *args, **kwargs):
+    """Executa uma operação de escrita, repetindo-a se o banco estiver ocupado.
+
+    A operação deve abrir a sua própria transação. Entre as tentativas a
+    espera dobra, com variação aleatória para que processos concorrentes não
+    voltem todos ao mesmo tempo. Dentro de uma transação externa não há
+    repetição: o erro é repassado para que a transação inteira seja desfeita.
+    """
+    for tentativa in range(1, TENTATIVAS_ESCRITA + 1):
+        try:
+            return operacao(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not _banco_ocupado(e) or tentativa == TENTATIVAS_ESCRITA or _pool.em_transacao():
+                raise
+            time.sleep(ESPERA_INICIAL_ESCRITA * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+
+# =============================================================================
+# PAGINAÇÃO POR CHAVE (KEYSET)
+# =============================================================================
+
+# Quantidade padrão de registros por página nas listagens paginadas
+TAMANHO_PAGINA_PADRAO = 200
+
+def _codificar_cursor(chave):
+    """Transforma a chave do último registro de uma página em um cursor opaco."""
+    texto = json.dumps(list(chave), separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii")
+
+def _decodificar_cursor(cursor, quantidade):
+    """Recupera a chave contida em um cursor gerado por _codificar_cursor."""
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Cursor de paginação inválido.")
+    if not isinstance(chave, list) or len(chave) != quantidade:
+        raise ValueError("Cursor de paginação inválido.")
+    return chave
+
+def _paginar(query, params, colunas_chave, filtros, ordem, tamanho_pagina, cursor):
+    """Executa uma consulta paginada por chave e retorna (itens, próximo cursor).
+
+    'filtros' são condições fixas da consulta; a condição de continuação é
+    montada a partir das 'colunas_chave', comparadas como row value no
+    sentido indicado por 'ordem' ('<' para DESC, '>' para ASC).
+    """
+    tamanho_pagina = max(1, int(tamanho_pagina or TAMANHO_PAGINA_PADRAO))
+    condicoes = list(filtros)
+    params = list(params)
+    if cursor:
+        chave = _decodificar_cursor(cursor, len(colunas_chave))
+        marcadores = ", ".join("?" for _ in colunas_chave)
+        condicoes.append(f"({', '.join(colunas_chave)}) {ordem} ({marcadores})")
+        params.extend(chave)
+    if condicoes:
+        query += " WHERE " + " AND ".join(condicoes)
+    direcao = "DESC" if ordem == "<" else "ASC"
+    query += " ORDER BY " + ", ".join(f"{coluna} {direcao}" for coluna in colunas_chave)
+    query += " LIMIT ?"
+    params.append(tamanho_pagina + 1)
+
+    with conexao() as conn:
+        itens = [dict(row) for row in conn.execute(query, params)]
+
+    proximo_cursor = None
+    if len(itens) > tamanho_pagina:
+        itens.pop()
+        proximo_cursor = _codificar_cursor(itens[-1][coluna] for coluna in colunas_chave)
+    return itens, proximo_cursor
+
 def criar_tabelas():
     """Cria as tabelas do banco de dados se elas não existirem."""
-    conn, cursor = conectar_bd()
     try:
-        # Tabela de Veículos
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS veiculos (
-                placa TEXT PRIMARY KEY,
-                marca TEXT NOT NULL,
-                modelo TEXT NOT NULL,
-                ano INTEGER NOT NULL,
-                cor TEXT NOT NULL,
-                valor_diaria REAL NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Disponível'
-            );
-        """)
-        
-        # Tabela de Clientes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS clientes (
-                cpf TEXT PRIMARY KEY,
-                nome TEXT NOT NULL,
-                telefone TEXT,
-                email TEXT UNIQUE
-            );
-        """)
-        
-        # Tabela de Aluguéis
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alugueis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                placa_carro TEXT NOT NULL,
-                cpf_cliente TEXT NOT NULL,
-                data_retirada TEXT NOT NULL,
-                data_devolucao TEXT,
-                valor_total REAL,
-                status TEXT NOT NULL,
-                FOREIGN KEY (placa_carro) REFERENCES veiculos (placa) ON DELETE RESTRICT,
-                FOREIGN KEY (cpf_cliente) REFERENCES clientes (cpf) ON DELETE RESTRICT
-            );
-        """)
-        
-        conn.commit()
+        with transacao() as cursor:
+            # Tabela de Veículos
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS veiculos (
+                    placa TEXT PRIMARY KEY,
+                    marca TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    ano INTEGER NOT NULL,
+                    cor TEXT NOT NULL,
+                    valor_diaria REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'Disponível'
+                );
+            """)
+
+            # Tabela de Clientes
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS clientes (
+                    cpf TEXT PRIMARY KEY,
+                    nome TEXT NOT NULL,
+                    telefone TEXT,
+                    email TEXT UNIQUE
+                );
+            """)
+
+            # Tabela de Aluguéis
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS alugueis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    placa_carro TEXT NOT NULL,
+                    cpf_cliente TEXT NOT NULL,
+                    data_retirada TEXT NOT NULL,
+                    data_devolucao TEXT,
+                    valor_total REAL,
+                    status TEXT NOT NULL,
+                    FOREIGN KEY (placa_carro) REFERENCES veiculos (placa) ON DELETE RESTRICT,
+                    FOREIGN KEY (cpf_cliente) REFERENCES clientes (cpf) ON DELETE RESTRICT
+                );
+            """)
+
+            aplicar_migracoes(cursor)
+        if caminho_arquivo(NOME_BANCO_DADOS) is not None:
+            # O banco de arquivo é criado já na inicialização, mesmo vazio:
+            # assim toda conexão o anexa desde o início, e os aluguéis que
+            # outro processo arquivar (ex.: 'locadora arquivar' agendado)
+            # continuam visíveis sem reiniciar a aplicação. Arquivos de
+            # versões anteriores são atualizados aqui, uma única vez.
+            _preparar_arquivo()
     except Exception as e:
         print(f"Erro ao criar tabelas: {e}")
-    finally:
-        conn.close()
+
+# =============================================================================
+# MIGRAÇÕES DE ESQUEMA
+# =============================================================================
+
+def fts5_disponivel(cursor):
+    """Indica se o SQLite em uso foi compilado com FTS5."""
+    return any(row[0] == 'ENABLE_FTS5' for row in cursor.execute("PRAGMA compile_options"))
+
+def _criar_busca_clientes(cursor):
+    """Cria o índice FTS5 de clientes, os gatilhos que o mantêm e a carga inicial.
+
+    O rowid do índice é o próprio CPF como inteiro: o rowid de 'clientes'
+    pode mudar em um VACUUM, o CPF não.
+    """
+    if not fts5_disponivel(cursor):
+        return
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts
+        USING fts5(nome, email, telefone, tokenize = 'unicode61')
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_inserir AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts (rowid, nome, email, telefone)
+            VALUES (CAST(new.cpf AS INTEGER), new.nome, new.email, new.telefone);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_remover AFTER DELETE ON clientes BEGIN
+            DELETE FROM clientes_fts WHERE rowid = CAST(old.cpf AS INTEGER);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_atualizar
+        AFTER UPDATE OF cpf, nome, email, telefone ON clientes BEGIN
+            DELETE FROM clientes_fts WHERE rowid = CAST(old.cpf AS INTEGER);
+            INSERT INTO clientes_fts (rowid, nome, email, telefone)
+            VALUES (CAST(new.cpf AS INTEGER), new.nome, new.email, new.telefone);
+        END
+    """)
+    cursor.execute("DELETE FROM clientes_fts")
+    cursor.execute("""
+        INSERT INTO clientes_fts (rowid, nome, email, telefone)
+        SELECT CAST(cpf AS INTEGER), nome, email, telefone FROM clientes
+    """)
+
+def rtree_disponivel(cursor):
+    """Indica se o SQLite em uso foi compilado com o módulo R*Tree."""
+    return any(row[0] == 'ENABLE_RTREE' for row in cursor.execute("PRAGMA compile_options"))
+
+def _criar_indice_reservas(cursor):
+    """Cria o índice de intervalos das reservas ativas.
+
+    Com R*Tree, cada reserva ativa vira um intervalo [início, fim) em dias
+    desde 1970 (exatos mesmo na precisão de 32 bits do módulo), com a placa
+    como coluna auxiliar: a busca de reservas que se sobrepõem a um período
+    desce só pelos nós da árvore que o tocam. Sem R*Tree, um índice comum
+    por fim da reserva limita a busca às reservas que terminam depois do
+    início do período.
+    """
+    if not rtree_disponivel(cursor):
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_reservas_ativas_fim
+            ON reservas (fim_ts, inicio_ts, placa_carro) WHERE status = 'Ativa'
+        """)
+        return
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS reservas_intervalos
+        USING rtree(id, inicio, fim, +placa_carro)
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS reservas_intervalos_inserir
+        AFTER INSERT ON reservas WHEN new.status = 'Ativa' BEGIN
+            INSERT INTO reservas_intervalos (id, inicio, fim, placa_carro)
+            VALUES (new.id, new.inicio_ts / {SEGUNDOS_POR_DIA}, new.fim_ts / {SEGUNDOS_POR_DIA}, new.placa_carro);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS reservas_intervalos_remover AFTER DELETE ON reservas BEGIN
+            DELETE FROM reservas_intervalos WHERE id = old.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS reservas_intervalos_atualizar
+        AFTER UPDATE OF placa_carro, inicio_ts, fim_ts, status ON reservas BEGIN
+            DELETE FROM reservas_intervalos WHERE id = old.id;
+            INSERT INTO reservas_intervalos (id, inicio, fim, placa_carro)
+            SELECT new.id, new.inicio_ts / {SEGUNDOS_POR_DIA}, new.fim_ts / {SEGUNDOS_POR_DIA}, new.placa_carro
+            WHERE new.status = 'Ativa';
+        END
+    """)
+
+# Cada migração é aplicada uma única vez, em ordem, e registrada em
+# PRAGMA user_version. Novas alterações de esquema devem ser acrescentadas
+# ao final da lista, nunca editadas depois de publicadas.
+MIGRACOES = [
+    # 1: Índices da tabela de aluguéis e do filtro de status de veículos
+    (1, [
+        # Aluguel ativo por placa (realizar_devolucao)
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_ativos_placa
+           ON alugueis (placa_carro) WHERE status = 'Ativo'""",
+        # Aluguéis ativos ordenados por retirada (listar_alugueis_ativos)
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_ativos_retirada
+           ON alugueis (data_retirada) WHERE status = 'Ativo'""",
+        # Histórico por cliente já ordenado (buscar_historico com CPF)
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_cliente_retirada
+           ON alugueis (cpf_cliente, data_retirada DESC)""",
+        # Histórico geral ordenado (buscar_historico sem filtro)
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_retirada
+           ON alugueis (data_retirada DESC)""",
+        # Faturamento por período: cobre o filtro e o valor somado
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_finalizados_devolucao
+           ON alugueis (date(data_devolucao), valor_total) WHERE status = 'Finalizado'""",
+        # Filtro de veículos por status (sugestões de carros disponíveis)
+        """CREATE INDEX IF NOT EXISTS idx_veiculos_status
+           ON veiculos (status)""",
+    ]),
+    # 2: Índices de histórico em ordem crescente; percorridos de trás para
+    #    frente eles entregam (data_retirada DESC, id DESC) sem ordenação
+    #    extra, como exige a paginação por chave.
+    (2, [
+        "DROP INDEX IF EXISTS idx_alugueis_cliente_retirada",
+        "DROP INDEX IF EXISTS idx_alugueis_retirada",
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_cliente_retirada
+           ON alugueis (cpf_cliente, data_retirada)""",
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_retirada
+           ON alugueis (data_retirada)""",
+    ]),
+    # 3: Agregado diário de faturamento, mantido por realizar_devolucao, com a
+    #    carga inicial a partir dos aluguéis já finalizados.
+    (3, [
+        """CREATE TABLE IF NOT EXISTS faturamento_diario (
+               dia TEXT PRIMARY KEY,
+               total REAL NOT NULL DEFAULT 0,
+               quantidade INTEGER NOT NULL DEFAULT 0
+           ) WITHOUT ROWID""",
+        """INSERT OR REPLACE INTO faturamento_diario (dia, total, quantidade)
+           SELECT date(data_devolucao), SUM(valor_total), COUNT(*)
+           FROM alugueis
+           WHERE status = 'Finalizado' AND data_devolucao IS NOT NULL
+           GROUP BY date(data_devolucao)""",
+    ]),
+    # 4: Sugestões por prefixo. O índice de status passa a incluir a placa,
+    #    entregando os carros disponíveis já em ordem de placa, e o nome dos
+    #    clientes ganha um índice sem distinção de maiúsculas.
+    (4, [
+        "DROP INDEX IF EXISTS idx_veiculos_status",
+        """CREATE INDEX IF NOT EXISTS idx_veiculos_status
+           ON veiculos (status, placa)""",
+        """CREATE INDEX IF NOT EXISTS idx_clientes_nome
+           ON clientes (nome COLLATE NOCASE)""",
+    ]),
+    # 5: Busca textual de clientes (FTS5), quando o SQLite tiver suporte
+    (5, [_criar_busca_clientes]),
+    # 6: Datas de retirada e devolução também em segundos desde 1970 (o
+    #    texto lido como UTC, igual a strftime('%s')). Filtros de período
+    #    comparam inteiros indexados, e as durações saem de uma subtração,
+    #    sem julianday() nem strptime por linha. As operações do módulo
+    #    gravam os segundos junto com o texto; os gatilhos só corrigem quem
+    #    escrever apenas o texto. O índice de date(data_devolucao) deixa de
+    #    ser usado (o faturamento lê o agregado diário desde a migração 3).
+    (6, [
+        "ALTER TABLE alugueis ADD COLUMN retirada_ts INTEGER",
+        "ALTER TABLE alugueis ADD COLUMN devolucao_ts INTEGER",
+        """UPDATE alugueis
+           SET retirada_ts = CAST(strftime('%s', data_retirada) AS INTEGER),
+               devolucao_ts = CAST(strftime('%s', data_devolucao) AS INTEGER)""",
+        """CREATE TRIGGER IF NOT EXISTS alugueis_ts_inserir AFTER INSERT ON alugueis
+           WHEN new.retirada_ts IS NOT CAST(strftime('%s', new.data_retirada) AS INTEGER)
+             OR new.devolucao_ts IS NOT CAST(strftime('%s', new.data_devolucao) AS INTEGER)
+           BEGIN
+               UPDATE alugueis
+               SET retirada_ts = CAST(strftime('%s', new.data_retirada) AS INTEGER),
+                   devolucao_ts = CAST(strftime('%s', new.data_devolucao) AS INTEGER)
+               WHERE id = new.id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS alugueis_ts_atualizar
+           AFTER UPDATE OF data_retirada, data_devolucao, retirada_ts, devolucao_ts ON alugueis
+           WHEN new.retirada_ts IS NOT CAST(strftime('%s', new.data_retirada) AS INTEGER)
+             OR new.devolucao_ts IS NOT CAST(strftime('%s', new.data_devolucao) AS INTEGER)
+           BEGIN
+               UPDATE alugueis
+               SET retirada_ts = CAST(strftime('%s', new.data_retirada) AS INTEGER),
+                   devolucao_ts = CAST(strftime('%s', new.data_devolucao) AS INTEGER)
+               WHERE id = new.id;
+           END""",
+        # Aluguéis que começaram antes do fim de um período
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_retirada_ts
+           ON alugueis (retirada_ts)""",
+        # Aluguéis que terminaram depois do início de um período (e arquivamento)
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_devolucao_ts
+           ON alugueis (devolucao_ts)""",
+        "DROP INDEX IF EXISTS idx_alugueis_finalizados_devolucao",
+    ]),
+    # 7: Detalhamento de faturamento (faturamento_detalhado). O índice tem
+    #    todas as colunas que a consulta lê dos aluguéis finalizados (o
+    #    status também, senão o SQLite abre a tabela para conferi-lo); o
+    #    período é um intervalo do índice e a tabela não é aberta.
+    (7, [
+        """CREATE INDEX IF NOT EXISTS idx_alugueis_faturamento
+           ON alugueis (devolucao_ts, placa_carro, cpf_cliente, valor_total, data_devolucao, status)
+           WHERE status = 'Finalizado'""",
+    ]),
+    # 8: Reservas futuras. Os dias reservados vão de 'inicio' a 'fim'
+    #    (inclusive); em segundos, de inicio_ts até fim_ts (exclusivo, o
+    #    começo do dia seguinte ao fim). O índice por placa e fim confere
+    #    conflitos de um veículo sem passar pelas reservas já encerradas; a
+    #    disponibilidade da frota usa o índice de intervalos.
+    (8, [
+        """CREATE TABLE IF NOT EXISTS reservas (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               placa_carro TEXT NOT NULL,
+               cpf_cliente TEXT NOT NULL,
+               inicio TEXT NOT NULL,
+               fim TEXT NOT NULL,
+               inicio_ts INTEGER NOT NULL,
+               fim_ts INTEGER NOT NULL,
+               status TEXT NOT NULL DEFAULT 'Ativa',
+               criada_em TEXT NOT NULL,
+               CHECK (fim_ts > inicio_ts),
+               FOREIGN KEY (placa_carro) REFERENCES veiculos (placa) ON DELETE RESTRICT,
+               FOREIGN KEY (cpf_cliente) REFERENCES clientes (cpf) ON DELETE RESTRICT
+           )""",
+        """CREATE INDEX IF NOT EXISTS idx_reservas_ativas_placa
+           ON reservas (placa_carro, fim_ts, inicio_ts) WHERE status = 'Ativa'""",
+        _criar_indice_reservas,
+    ]),
+    # 9: Devolução prevista dos aluguéis (opcional), confrontada com as
+    #    reservas: o aluguel ocupa o veículo até o fim desse dia; em
+    #    segundos, até devolucao_prevista_ts (exclusivo, como o fim_ts das
+    #    reservas).
+    (9, [
+        "ALTER TABLE alugueis ADD COLUMN devolucao_prevista TEXT",
+        "ALTER TABLE alugueis ADD COLUMN devolucao_prevista_ts INTEGER",
+    ]),
+]
+
+def versao_esquema(cursor):
+    """Retorna a versão de esquema registrada no banco."""
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+def aplicar_migracoes(cursor):
+    """Aplica, dentro da transação corrente, as migrações ainda pendentes."""
+    versao_atual = versao_esquema(cursor)
+    for versao, comandos in MIGRACOES:
+        if versao <= versao_atual:
+            continue
+        for comando in comandos:
+            # Comandos SQL são executados diretamente; funções recebem o cursor
+            if callable(comando):
+                comando(cursor)
+            else:
+                cursor.execute(comando)
+        cursor.execute(f"PRAGMA user_version = {int(versao)}")
+        versao_atual = versao
+    return versao_atual
 
 # =============================================================================
 # FUNÇÕES DE VALIDAÇÃO
@@ -79,10 +566,7 @@ def validar_placa(placa):
     """Valida placas no formato antigo (ABC-1234) e Mercosul (ABC1D23)."""
     if not isinstance(placa, str) or not placa.strip():
         return "O campo 'Placa' é obrigatório."
-    placa = placa.upper().strip()
-    padrao_mercosul = re.compile(r'^[A-Z]{3}\d[A-Z]\d{2}$')
-    padrao_antigo = re.compile(r'^[A-Z]{3}-\d{4}$')
-    if padrao_mercosul.match(placa) or padrao_antigo.match(placa.replace("-", "")):
+    if validacao.placa_valida(placa):
         return None
     return "Formato de placa inválido. Use 'ABC-1234' ou 'ABC1D23'."
 
@@ -112,28 +596,13 @@ def validar_valor(valor):
 def validar_cpf(cpf):
     """Valida um CPF brasileiro."""
     if not cpf: return "O campo 'CPF' é obrigatório."
-    cpf_numerico = ''.join(filter(str.isdigit, str(cpf)))
-    if len(cpf_numerico) != 11 or len(set(cpf_numerico)) == 1:
+    if not validacao.cpf_valido(cpf):
         return "CPF inválido. Verifique o número digitado."
-    
-    # Validação do primeiro dígito verificador
-    soma = sum(int(cpf_numerico[i]) * (10 - i) for i in range(9))
-    d1 = (soma * 10) % 11
-    if d1 == 10: d1 = 0
-    if d1 != int(cpf_numerico[9]):
-        return "CPF inválido. Verifique o número digitado."
-
-    # Validação do segundo dígito verificador
-    soma = sum(int(cpf_numerico[i]) * (11 - i) for i in range(10))
-    d2 = (soma * 10) % 11
-    if d2 == 10: d2 = 0
-    if d2 != int(cpf_numerico[10]):
-        return "CPF inválido. Verifique o número digitado."
-
     return None
 
-def adicionar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
-    erros = list(filter(None, [
+def validar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
+    """Retorna a lista de erros de validação dos dados de um veículo."""
+    return list(filter(None, [
         validar_placa(placa),
         "O campo 'Marca' é obrigatório." if not marca.strip() else None,
         "O campo 'Modelo' é obrigatório." if not modelo.strip() else None,
@@ -141,21 +610,28 @@ def adicionar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
         "O campo 'Cor' é obrigatório." if not cor.strip() else None,
         validar_valor(valor_diaria)
     ]))
+
+def validar_cliente(cpf, nome):
+    """Retorna a lista de erros de validação dos dados de um cliente."""
+    return list(filter(None, [
+        validar_cpf(cpf),
+        "O campo 'Nome' é obrigatório." if not nome.strip() else None
+    ]))
+
+def adicionar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
+    erros = validar_veiculo(placa, marca, modelo, ano, cor, valor_diaria)
     if erros:
         return (False, erros)
 
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute(
-            "INSERT INTO veiculos (placa, marca, modelo, ano, cor, valor_diaria) VALUES (?, ?, ?, ?, ?, ?)",
-            (placa.upper().strip(), marca.strip(), modelo.strip(), int(ano), cor.strip(), float(str(valor_diaria).replace(",", ".")))
-        )
-        conn.commit()
+        with transacao() as cursor:
+            cursor.execute(
+                "INSERT INTO veiculos (placa, marca, modelo, ano, cor, valor_diaria) VALUES (?, ?, ?, ?, ?, ?)",
+                (validacao.normalizar_placa(placa), marca.strip(), modelo.strip(), int(ano), cor.strip(), float(str(valor_diaria).replace(",", ".")))
+            )
         return (True, ["Veículo adicionado com sucesso."])
     except sqlite3.IntegrityError:
-        return (False, [f"A placa '{placa.upper().strip()}' já está cadastrada."])
-    finally:
-        conn.close()
+        return (False, [f"A placa '{validacao.normalizar_placa(placa)}' já está cadastrada."])
 
 def atualizar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
     erros = list(filter(None, [
@@ -168,64 +644,63 @@ def atualizar_veiculo(placa, marca, modelo, ano, cor, valor_diaria):
     if erros:
         return (False, erros)
 
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute(
-            "UPDATE veiculos SET marca=?, modelo=?, ano=?, cor=?, valor_diaria=? WHERE placa=?",
-            (marca.strip(), modelo.strip(), int(ano), cor.strip(), float(str(valor_diaria).replace(",", ".")), placa.upper().strip())
-        )
-        conn.commit()
+        with transacao() as cursor:
+            cursor.execute(
+                "UPDATE veiculos SET marca=?, modelo=?, ano=?, cor=?, valor_diaria=? WHERE placa=?",
+                (marca.strip(), modelo.strip(), int(ano), cor.strip(), float(str(valor_diaria).replace(",", ".")), validacao.normalizar_placa(placa))
+            )
         return (True, ["Veículo atualizado com sucesso."])
     except Exception as e:
         return (False, [f"Erro ao atualizar veículo: {e}"])
-    finally:
-        conn.close()
 
 def remover_veiculo(placa):
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute("DELETE FROM veiculos WHERE placa = ?", (placa.upper().strip(),))
-        if cursor.rowcount == 0:
-            return (False, [f"Nenhum veículo encontrado com a placa '{placa.upper().strip()}'."])
-        conn.commit()
+        with transacao() as cursor:
+            cursor.execute("DELETE FROM veiculos WHERE placa = ?", (validacao.normalizar_placa(placa),))
+            removidos = cursor.rowcount
+        if removidos == 0:
+            return (False, [f"Nenhum veículo encontrado com a placa '{validacao.normalizar_placa(placa)}'."])
         return (True, ["Veículo removido com sucesso."])
     except sqlite3.IntegrityError:
         return (False, ["Não é possível remover o veículo, pois ele possui um histórico de aluguéis."])
-    finally:
-        conn.close()
 
+@em_cache
 def listar_veiculos(status_filtro=None):
-    conn, cursor = conectar_bd()
     query = "SELECT * FROM veiculos"
     params = []
     if status_filtro:
         query += " WHERE status = ?"
         params.append(status_filtro)
-    cursor.execute(query, params)
-    veiculos = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with conexao() as conn:
+        veiculos = [dict(row) for row in conn.execute(query, params)]
     return veiculos
 
+@em_cache
+def listar_veiculos_paginado(tamanho_pagina=TAMANHO_PAGINA_PADRAO, cursor=None, status_filtro=None):
+    """Retorna uma página de veículos ordenados por placa e o cursor da próxima."""
+    filtros, params = [], []
+    if status_filtro:
+        filtros.append("status = ?")
+        params.append(status_filtro)
+    return _paginar("SELECT * FROM veiculos", params, ("placa",), filtros, ">", tamanho_pagina, cursor)
+
 # =============================================================================
 # OPERAÇÕES CRUD - CLIENTES
 # =============================================================================
 
 def adicionar_cliente(cpf, nome, telefone, email):
-    erros = list(filter(None, [
-        validar_cpf(cpf),
-        "O campo 'Nome' é obrigatório." if not nome.strip() else None
-    ]))
+    erros = validar_cliente(cpf, nome)
     if erros:
         return (False, erros)
     
     cpf_limpo = ''.join(filter(str.isdigit, str(cpf)))
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute(
-            "INSERT INTO clientes (cpf, nome, telefone, email) VALUES (?, ?, ?, ?)",
-            (cpf_limpo, nome.strip(), telefone.strip(), email.strip().lower())
-        )
-        conn.commit()
+        with transacao() as cursor:
+            cursor.execute(
+                "INSERT INTO clientes (cpf, nome, telefone, email) VALUES (?, ?, ?, ?)",
+                (cpf_limpo, nome.strip(), telefone.strip(), email.strip().lower())
+            )
         return (True, ["Cliente adicionado com sucesso."])
     except sqlite3.IntegrityError as e:
         if "clientes.cpf" in str(e):
@@ -233,141 +708,642 @@ def adicionar_cliente(cpf, nome, telefone, email):
         if "clientes.email" in str(e):
             return (False, [f"O e-mail '{email.strip().lower()}' já está em uso."])
         return (False, [f"Erro no banco de dados: {e}"])
-    finally:
-        conn.close()
 
 def atualizar_cliente(cpf, nome, telefone, email):
-    erros = list(filter(None, [
-        validar_cpf(cpf),
-        "O campo 'Nome' é obrigatório." if not nome.strip() else None
-    ]))
+    erros = validar_cliente(cpf, nome)
     if erros:
         return (False, erros)
         
     cpf_limpo = ''.join(filter(str.isdigit, str(cpf)))
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute(
-            "UPDATE clientes SET nome=?, telefone=?, email=? WHERE cpf=?",
-            (nome.strip(), telefone.strip(), email.strip().lower(), cpf_limpo)
-        )
-        conn.commit()
+        with transacao() as cursor:
+            cursor.execute(
+                "UPDATE clientes SET nome=?, telefone=?, email=? WHERE cpf=?",
+                (nome.strip(), telefone.strip(), email.strip().lower(), cpf_limpo)
+            )
         return (True, ["Cliente atualizado com sucesso."])
     except sqlite3.IntegrityError:
         return (False, [f"O e-mail '{email.strip().lower()}' já está em uso por outro cliente."])
-    finally:
-        conn.close()
 
 def remover_cliente(cpf):
     cpf_limpo = ''.join(filter(str.isdigit, str(cpf)))
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute("DELETE FROM clientes WHERE cpf = ?", (cpf_limpo,))
-        if cursor.rowcount == 0:
+        with transacao() as cursor:
+            cursor.execute("DELETE FROM clientes WHERE cpf = ?", (cpf_limpo,))
+            removidos = cursor.rowcount
+        if removidos == 0:
             return (False, [f"Nenhum cliente encontrado com o CPF '{cpf_limpo}'."])
-        conn.commit()
         return (True, ["Cliente removido com sucesso."])
     except sqlite3.IntegrityError:
         return (False, ["Não é possível remover o cliente, pois ele possui um histórico de aluguéis."])
-    finally:
-        conn.close()
 
+@em_cache
 def listar_clientes():
-    conn, cursor = conectar_bd()
-    cursor.execute("SELECT * FROM clientes")
-    clientes = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with conexao() as conn:
+        clientes = [dict(row) for row in conn.execute("SELECT * FROM clientes")]
     return clientes
 
+@em_cache
+def listar_clientes_paginado(tamanho_pagina=TAMANHO_PAGINA_PADRAO, cursor=None):
+    """Retorna uma página de clientes ordenados por CPF e o cursor da próxima."""
+    return _paginar("SELECT * FROM clientes", [], ("cpf",), [], ">", tamanho_pagina, cursor)
+
 # =============================================================================
 # OPERAÇÕES DE ALUGUEL
 # =============================================================================
 
-def realizar_aluguel(placa_carro, cpf_cliente):
+SEGUNDOS_POR_DIA = 86400
+
+def em_segundos(momento):
+    """Converte um datetime sem fuso em segundos desde 1970, como strftime('%s') do SQLite."""
+    return calendar.timegm(momento.timetuple())
+
+def realizar_aluguel(placa_carro, cpf_cliente, data_prevista=None):
+    """Registra o aluguel de um veículo, com a devolução prevista opcional ('AAAA-MM-DD').
+
+    O aluguel é recusado se outro cliente tiver reserva no período que ele
+    ocupa (ver RESERVA_MARGEM_DIAS); as reservas do próprio cliente nesse
+    período passam a 'Utilizada'.
+    """
     if not placa_carro or not cpf_cliente:
         return (False, ["Placa do carro e CPF do cliente são obrigatórios."])
+    prevista = _devolucao_prevista(data_prevista)
+    if isinstance(prevista, str):
+        return (False, [prevista])
 
-    conn, cursor = conectar_bd()
+    placa = validacao.normalizar_placa(placa_carro)
+    cpf_limpo = ''.join(filter(str.isdigit, str(cpf_cliente)))
     try:
-        # Verifica se o carro existe e está disponível
-        cursor.execute("SELECT status FROM veiculos WHERE placa = ?", (placa_carro.upper().strip(),))
-        carro = cursor.fetchone()
-        if not carro:
-            return (False, ["Veículo não encontrado."])
-        if carro['status'] != 'Disponível':
-            return (False, [f"Veículo não está disponível (Status: {carro['status']})."])
+        return executar_com_retentativas(_registrar_aluguel, placa, cpf_limpo, prevista)
+    except Exception as e:
+        return (False, [f"Erro ao realizar aluguel: {e}"])
 
-        # Verifica se o cliente existe
-        cpf_limpo = ''.join(filter(str.isdigit, str(cpf_cliente)))
-        cursor.execute("SELECT nome FROM clientes WHERE cpf = ?", (cpf_limpo,))
-        if not cursor.fetchone():
-            return (False, ["Cliente não encontrado."])
+def _registrar_aluguel(placa, cpf, prevista):
+    data_prevista, prevista_ts = prevista
+    with transacao(imediata=True) as cursor:
+        reservas = _reservas_no_aluguel(cursor, [placa], _fim_da_ocupacao(prevista_ts)).get(placa, [])
+        outras = [r for r in reservas if r['cpf_cliente'] != cpf]
+        if outras:
+            return (False, [_motivo_reservado(outras[0], prevista_ts)])
 
-        # Insere o novo aluguel e atualiza o status do carro
-        data_hoje = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Reserva o carro de forma atômica: só um aluguel consegue mudar o
+        # status de 'Disponível' para 'Alugado'.
+        cursor.execute("""
+            UPDATE veiculos SET status = 'Alugado'
+            WHERE placa = ? AND status = 'Disponível'
+              AND EXISTS (SELECT 1 FROM clientes WHERE cpf = ?)
+        """, (placa, cpf))
+        if cursor.rowcount == 0:
+            return (False, [_motivo_aluguel_recusado(cursor, placa, cpf)])
+
+        data_hoje = datetime.now().replace(microsecond=0)
         cursor.execute(
-            "INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, status) VALUES (?, ?, ?, ?)",
-            (placa_carro.upper().strip(), cpf_limpo, data_hoje, 'Ativo')
+            "INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, retirada_ts, devolucao_prevista, "
+            "devolucao_prevista_ts, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (placa, cpf, data_hoje.strftime('%Y-%m-%d %H:%M:%S'), em_segundos(data_hoje), data_prevista, prevista_ts,
+             'Ativo')
         )
-        cursor.execute("UPDATE veiculos SET status = 'Alugado' WHERE placa = ?", (placa_carro.upper().strip(),))
-        conn.commit()
-        return (True, ["Aluguel registrado com sucesso."])
-    except Exception as e:
-        return (False, [f"Erro ao realizar aluguel: {e}"])
-    finally:
-        conn.close()
+        _marcar_reservas_utilizadas(cursor, [r['id'] for r in reservas])
+    return (True, ["Aluguel registrado com sucesso."])
+
+def _motivo_aluguel_recusado(cursor, placa, cpf):
+    """Explica por que a reserva condicional do veículo não alterou nenhuma linha."""
+    carro = cursor.execute("SELECT status FROM veiculos WHERE placa = ?", (placa,)).fetchone()
+    if not carro:
+        return "Veículo não encontrado."
+    if carro['status'] != 'Disponível':
+        return f"Veículo não está disponível (Status: {carro['status']})."
+    return "Cliente não encontrado."
 
 def realizar_devolucao(placa_carro):
-    conn, cursor = conectar_bd()
     try:
-        # Busca o aluguel ativo para o veículo
-        cursor.execute("SELECT * FROM alugueis WHERE placa_carro = ? AND status = 'Ativo'", (placa_carro.upper().strip(),))
+        return executar_com_retentativas(_registrar_devolucao, validacao.normalizar_placa(placa_carro))
+    except Exception as e:
+        return (False, [f"Erro ao realizar devolução: {e}"], None)
+
+def _registrar_devolucao(placa):
+    with transacao(imediata=True) as cursor:
+        # Com a escrita já reservada, o aluguel lido aqui não muda até o COMMIT
+        cursor.execute("""
+            SELECT a.id, a.retirada_ts, v.valor_diaria
+            FROM alugueis a JOIN veiculos v ON v.placa = a.placa_carro
+            WHERE a.placa_carro = ? AND a.status = 'Ativo'
+        """, (placa,))
         aluguel = cursor.fetchone()
         if not aluguel:
             return (False, ["Nenhum aluguel ativo encontrado para este veículo."], None)
 
-        # Busca o valor da diária do carro
-        cursor.execute("SELECT valor_diaria FROM veiculos WHERE placa = ?", (placa_carro.upper().strip(),))
-        carro = cursor.fetchone()
-        valor_diaria = carro['valor_diaria']
-
         # Calcula o valor total
-        data_retirada = datetime.strptime(aluguel["data_retirada"], "%Y-%m-%d %H:%M:%S")
-        data_devolucao = datetime.now()
-        duracao = data_devolucao - data_retirada
-        dias_alugado = math.ceil(duracao.total_seconds() / 86400)
-        dias_alugado = max(1, dias_alugado) # Mínimo de 1 dia de aluguel
-        valor_total = dias_alugado * valor_diaria
-
-        # Atualiza o registro de aluguel e o status do carro
+        data_devolucao = datetime.now().replace(microsecond=0)
+        devolucao_ts = em_segundos(data_devolucao)
+        dias_alugado, valor_total = _calcular_cobranca(aluguel['retirada_ts'], devolucao_ts, aluguel['valor_diaria'])
+
+        # Finaliza o aluguel apenas se ele ainda estiver ativo
         cursor.execute(
-            "UPDATE alugueis SET data_devolucao = ?, valor_total = ?, status = 'Finalizado' WHERE id = ?",
-            (data_devolucao.strftime('%Y-%m-%d %H:%M:%S'), valor_total, aluguel['id'])
+            "UPDATE alugueis SET data_devolucao = ?, devolucao_ts = ?, valor_total = ?, status = 'Finalizado' "
+            "WHERE id = ? AND status = 'Ativo'",
+            (data_devolucao.strftime('%Y-%m-%d %H:%M:%S'), devolucao_ts, valor_total, aluguel['id'])
         )
-        cursor.execute("UPDATE veiculos SET status = 'Disponível' WHERE placa = ?", (placa_carro.upper().strip(),))
-        conn.commit()
-        
-        msg = f"Devolução realizada. Total: R$ {valor_total:.2f} ({dias_alugado} dia(s))."
-        return (True, [msg], valor_total)
+        if cursor.rowcount == 0:
+            return (False, ["Nenhum aluguel ativo encontrado para este veículo."], None)
+        cursor.execute("UPDATE veiculos SET status = 'Disponível' WHERE placa = ? AND status = 'Alugado'", (placa,))
+        registrar_faturamento(cursor, data_devolucao.strftime('%Y-%m-%d'), valor_total)
+
+    msg = f"Devolução realizada. Total: R$ {valor_total:.2f} ({dias_alugado} dia(s))."
+    return (True, [msg], valor_total)
+
+def _calcular_cobranca(retirada_ts, devolucao_ts, valor_diaria):
+    """Retorna (dias cobrados, valor total) de um aluguel; mínimo de 1 dia de aluguel."""
+    dias_alugado = max(1, math.ceil((devolucao_ts - retirada_ts) / SEGUNDOS_POR_DIA))
+    return dias_alugado, dias_alugado * valor_diaria
+
+def registrar_faturamento(cursor, dia, valor, quantidade=1):
+    """Soma um valor ao agregado diário; deve rodar na transação da devolução."""
+    cursor.execute("""
+        INSERT INTO faturamento_diario (dia, total, quantidade) VALUES (?, ?, ?)
+        ON CONFLICT (dia) DO UPDATE SET
+            total = total + excluded.total,
+            quantidade = quantidade + excluded.quantidade
+    """, (dia, valor, quantidade))
+
+# =============================================================================
+# OPERAÇÕES EM LOTE
+# =============================================================================
+
+# Itens aceitos por chamada: o lote inteiro vai em uma transação e em listas IN (...)
+TAMANHO_MAXIMO_LOTE = obter_configuracao('TAMANHO_MAXIMO_LOTE', 500)
+
+def _marcadores(valores):
+    return ", ".join("?" * len(valores))
+
+def _validar_lote(itens):
+    """Retorna a mensagem de erro de um lote vazio ou grande demais, ou None."""
+    if not itens:
+        return "Nenhum item informado para o lote."
+    if len(itens) > TAMANHO_MAXIMO_LOTE:
+        return f"O lote aceita no máximo {TAMANHO_MAXIMO_LOTE} itens (recebidos {len(itens)})."
+    return None
+
+def realizar_alugueis_em_lote(pares, data_prevista=None):
+    """Registra vários aluguéis, dados como pares (placa, CPF), em uma única transação.
+
+    Veículos e clientes do lote são conferidos com uma consulta cada, os
+    carros são reservados com um único UPDATE e os aluguéis gravados com um
+    executemany. Um item recusado (veículo inexistente, indisponível ou
+    reservado para outro cliente, cliente inexistente, placa repetida no
+    lote) não impede os demais. A devolução prevista, se informada, vale
+    para todos os aluguéis do lote.
+
+    Retorna (True, resultados), com um dicionário por item na ordem recebida
+    (placa, cpf, sucesso, mensagem), ou (False, mensagens) se o lote não
+    pôde ser processado.
+    """
+    prevista = _devolucao_prevista(data_prevista)
+    if isinstance(prevista, str):
+        return (False, [prevista])
+    try:
+        itens = [(validacao.normalizar_placa(str(placa or "")), ''.join(filter(str.isdigit, str(cpf or ""))))
+                 for placa, cpf in pares]
+    except (TypeError, ValueError):
+        return (False, ["Informe o lote como pares (placa, CPF)."])
+    erro = _validar_lote(itens)
+    if erro:
+        return (False, [erro])
+    try:
+        return (True, executar_com_retentativas(_registrar_alugueis_em_lote, itens, prevista))
     except Exception as e:
-        return (False, [f"Erro ao realizar devolução: {e}"], None)
-    finally:
-        conn.close()
+        return (False, [f"Erro ao realizar aluguéis em lote: {e}"])
+
+def _registrar_alugueis_em_lote(itens, prevista):
+    data_prevista, prevista_ts = prevista
+    placas = sorted({placa for placa, _ in itens})
+    cpfs = sorted({cpf for _, cpf in itens})
+    with transacao(imediata=True) as cursor:
+        # Com a escrita já reservada, os status lidos aqui não mudam até o COMMIT
+        status = {row['placa']: row['status'] for row in cursor.execute(
+            f"SELECT placa, status FROM veiculos WHERE placa IN ({_marcadores(placas)})", placas)}
+        clientes = {row['cpf'] for row in cursor.execute(
+            f"SELECT cpf FROM clientes WHERE cpf IN ({_marcadores(cpfs)})", cpfs)}
+        reservas = _reservas_no_aluguel(cursor, placas, _fim_da_ocupacao(prevista_ts))
+
+        resultados, aceitos, utilizadas, vistas = [], [], [], set()
+        for placa, cpf in itens:
+            if not placa or not cpf:
+                motivo = "Placa do carro e CPF do cliente são obrigatórios."
+            elif placa in vistas:
+                motivo = "Veículo repetido no lote."
+            elif placa not in status:
+                motivo = "Veículo não encontrado."
+            elif status[placa] != 'Disponível':
+                motivo = f"Veículo não está disponível (Status: {status[placa]})."
+            elif cpf not in clientes:
+                motivo = "Cliente não encontrado."
+            elif any(r['cpf_cliente'] != cpf for r in reservas.get(placa, [])):
+                motivo = _motivo_reservado(next(r for r in reservas[placa] if r['cpf_cliente'] != cpf), prevista_ts)
+            else:
+                motivo = None
+                aceitos.append((placa, cpf))
+                utilizadas.extend(r['id'] for r in reservas.get(placa, []))
+            vistas.add(placa)
+            resultados.append({"placa": placa, "cpf": cpf, "sucesso": motivo is None,
+                               "mensagem": motivo or "Aluguel registrado com sucesso."})
+
+        if aceitos:
+            data_hoje = datetime.now().replace(microsecond=0)
+            texto, segundos = data_hoje.strftime('%Y-%m-%d %H:%M:%S'), em_segundos(data_hoje)
+            reservadas = [placa for placa, _ in aceitos]
+            cursor.execute(
+                f"UPDATE veiculos SET status = 'Alugado' WHERE status = 'Disponível' AND placa IN ({_marcadores(reservadas)})",
+                reservadas)
+            cursor.executemany(
+                "INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, retirada_ts, devolucao_prevista, "
+                "devolucao_prevista_ts, status) VALUES (?, ?, ?, ?, ?, ?, 'Ativo')",
+                [(placa, cpf, texto, segundos, data_prevista, prevista_ts) for placa, cpf in aceitos])
+            _marcar_reservas_utilizadas(cursor, utilizadas)
+    return resultados
+
+def realizar_devolucoes_em_lote(placas):
+    """Registra a devolução de vários veículos em uma única transação.
+
+    Os aluguéis ativos do lote são lidos com uma consulta, finalizados com um
+    executemany e os carros liberados com um único UPDATE; o faturamento do
+    dia recebe a soma do lote de uma vez. Placas sem aluguel ativo (ou
+    repetidas no lote) são recusadas sem impedir as demais.
+
+    Retorna (True, resultados), com um dicionário por placa na ordem recebida
+    (placa, sucesso, mensagem, valor_total, dias), ou (False, mensagens) se
+    o lote não pôde ser processado.
+    """
+    try:
+        itens = [validacao.normalizar_placa(str(placa or "")) for placa in placas]
+    except TypeError:
+        return (False, ["Informe o lote como uma lista de placas."])
+    erro = _validar_lote(itens)
+    if erro:
+        return (False, [erro])
+    try:
+        return (True, executar_com_retentativas(_registrar_devolucoes_em_lote, itens))
+    except Exception as e:
+        return (False, [f"Erro ao realizar devoluções em lote: {e}"])
+
+def _registrar_devolucoes_em_lote(itens):
+    placas = sorted(set(itens))
+    with transacao(imediata=True) as cursor:
+        ativos = {row['placa_carro']: row for row in cursor.execute(f"""
+            SELECT a.id, a.placa_carro, a.retirada_ts, v.valor_diaria
+            FROM alugueis a JOIN veiculos v ON v.placa = a.placa_carro
+            WHERE a.status = 'Ativo' AND a.placa_carro IN ({_marcadores(placas)})
+        """, placas)}
+
+        data_devolucao = datetime.now().replace(microsecond=0)
+        texto, devolucao_ts = data_devolucao.strftime('%Y-%m-%d %H:%M:%S'), em_segundos(data_devolucao)
+        resultados, finalizados, vistas = [], [], set()
+        for placa in itens:
+            aluguel = ativos.get(placa) if placa not in vistas else None
+            if aluguel is None:
+                motivo = "Veículo repetido no lote." if placa in vistas else "Nenhum aluguel ativo encontrado para este veículo."
+                resultados.append({"placa": placa, "sucesso": False, "mensagem": motivo, "valor_total": None, "dias": None})
+            else:
+                dias_alugado, valor_total = _calcular_cobranca(aluguel['retirada_ts'], devolucao_ts, aluguel['valor_diaria'])
+                finalizados.append((placa, aluguel['id'], valor_total))
+                resultados.append({"placa": placa, "sucesso": True, "valor_total": valor_total, "dias": dias_alugado,
+                                   "mensagem": f"Devolução realizada. Total: R$ {valor_total:.2f} ({dias_alugado} dia(s))."})
+            vistas.add(placa)
+
+        if finalizados:
+            cursor.executemany(
+                "UPDATE alugueis SET data_devolucao = ?, devolucao_ts = ?, valor_total = ?, status = 'Finalizado' "
+                "WHERE id = ? AND status = 'Ativo'",
+                [(texto, devolucao_ts, valor_total, id_aluguel) for _, id_aluguel, valor_total in finalizados])
+            liberadas = [placa for placa, _, _ in finalizados]
+            cursor.execute(
+                f"UPDATE veiculos SET status = 'Disponível' WHERE status = 'Alugado' AND placa IN ({_marcadores(liberadas)})",
+                liberadas)
+            registrar_faturamento(cursor, data_devolucao.strftime('%Y-%m-%d'),
+                                  sum(valor_total for _, _, valor_total in finalizados), len(finalizados))
+    return resultados
+
+# =============================================================================
+# RESERVAS
+# =============================================================================
+
+# Um aluguel com devolução prevista ocupa o veículo de hoje até o fim do dia
+# previsto (ou até o fim de hoje, se estiver atrasado). Sem ela, o fim é
+# desconhecido: o aluguel é recusado se outro cliente tiver reserva começando
+# nos próximos RESERVA_MARGEM_DIAS dias e, enquanto estiver ativo, o veículo
+# não aceita novas reservas.
+RESERVA_MARGEM_DIAS = obter_configuracao('RESERVA_MARGEM_DIAS', 7)
+
+def _inicio_do_dia(momento):
+    return em_segundos(datetime(momento.year, momento.month, momento.day))
+
+def _devolucao_prevista(data_prevista):
+    """Retorna (data, fim exclusivo em segundos) da devolução prevista, (None, None) sem ela, ou uma mensagem de erro."""
+    if not data_prevista:
+        return None, None
+    try:
+        dia = datetime.strptime(data_prevista, '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return "Formato de data inválido para a devolução prevista. Use 'AAAA-MM-DD'."
+    if em_segundos(dia) < _inicio_do_dia(datetime.now()):
+        return "A devolução prevista não pode ser antes de hoje."
+    return dia.strftime('%Y-%m-%d'), em_segundos(dia) + SEGUNDOS_POR_DIA
+
+def _fim_da_ocupacao(prevista_ts):
+    """Fim (exclusivo, em segundos) do período que um aluguel feito agora ocupa para as reservas."""
+    if prevista_ts is not None:
+        return prevista_ts
+    return _inicio_do_dia(datetime.now()) + max(1, RESERVA_MARGEM_DIAS) * SEGUNDOS_POR_DIA
+
+def _periodo_reserva(data_inicio, data_fim):
+    """Retorna (inicio_ts, fim_ts exclusivo) das datas 'AAAA-MM-DD' ou uma mensagem de erro."""
+    try:
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+        fim = datetime.strptime(data_fim, '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return "Formato de data inválido. Use 'AAAA-MM-DD'."
+    if fim < inicio:
+        return "A data de fim deve ser igual ou posterior à data de início."
+    return em_segundos(inicio), em_segundos(fim) + SEGUNDOS_POR_DIA
+
+def _motivo_reservado(reserva, prevista_ts):
+    motivo = f"Veículo reservado para outro cliente de {reserva['inicio']} a {reserva['fim']}."
+    if prevista_ts is None and reserva['inicio_ts'] > _inicio_do_dia(datetime.now()):
+        motivo += (f" Sem devolução prevista, o aluguel ocupa os próximos {RESERVA_MARGEM_DIAS} dia(s);"
+                   f" informe uma devolução prevista anterior a {reserva['inicio']}.")
+    return motivo
+
+def _reservas_no_aluguel(cursor, placas, fim_ts):
+    """Reservas ativas, por placa, que um aluguel feito agora e ocupando o veículo até 'fim_ts' atravessaria."""
+    reservas = {}
+    for row in cursor.execute(f"""
+        SELECT id, placa_carro, cpf_cliente, inicio, fim, inicio_ts FROM reservas
+        WHERE status = 'Ativa' AND placa_carro IN ({_marcadores(placas)}) AND fim_ts > ? AND inicio_ts < ?
+        ORDER BY inicio_ts
+    """, [*placas, _inicio_do_dia(datetime.now()), fim_ts]):
+        reservas.setdefault(row['placa_carro'], []).append(row)
+    return reservas
+
+def _marcar_reservas_utilizadas(cursor, ids):
+    """As reservas do próprio cliente atendidas por um aluguel deixam de bloquear o veículo."""
+    if ids:
+        cursor.execute(f"UPDATE reservas SET status = 'Utilizada' WHERE id IN ({_marcadores(ids)})", ids)
+
+def _filtro_reservas_sobrepostas(conn):
+    """Subconsulta com as placas de reservas ativas que tocam o período (:ini_ts, :fim_ts)."""
+    indice = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reservas_intervalos'").fetchone()
+    if indice:
+        # Intervalos em dias: a árvore só visita os nós que se sobrepõem ao período
+        return "SELECT placa_carro FROM reservas_intervalos WHERE inicio < :fim_dia AND fim > :ini_dia"
+    return """SELECT placa_carro FROM reservas
+              WHERE status = 'Ativa' AND fim_ts > :ini_ts AND inicio_ts < :fim_ts"""
+
+# Placas de aluguéis em andamento que ocupam o veículo no início do período
+# (:ini_ts); um aluguel atrasado ocupa o veículo ao menos até :amanha
+FILTRO_ALUGUEIS_SOBREPOSTOS = """
+    SELECT placa_carro FROM alugueis
+    WHERE status = 'Ativo'
+      AND (devolucao_prevista_ts IS NULL OR MAX(devolucao_prevista_ts, :amanha) > :ini_ts)
+"""
+
+def criar_reserva(placa_carro, cpf_cliente, data_inicio, data_fim):
+    """Reserva um veículo para um cliente nos dias de 'data_inicio' a 'data_fim' (inclusive).
+
+    A reserva é recusada se o período começar no passado, se o veículo já
+    tiver outra reserva ativa que se sobreponha a ele ou se um aluguel em
+    andamento o ocupar no início do período: sem devolução prevista, o
+    aluguel ocupa o veículo até ser devolvido.
+    """
+    if not placa_carro or not cpf_cliente:
+        return (False, ["Placa do carro e CPF do cliente são obrigatórios."])
+    periodo = _periodo_reserva(data_inicio, data_fim)
+    if isinstance(periodo, str):
+        return (False, [periodo])
+    if periodo[0] < _inicio_do_dia(datetime.now()):
+        return (False, ["A reserva não pode começar antes de hoje."])
+
+    placa = validacao.normalizar_placa(placa_carro)
+    cpf_limpo = ''.join(filter(str.isdigit, str(cpf_cliente)))
+    try:
+        return executar_com_retentativas(_registrar_reserva, placa, cpf_limpo, data_inicio, data_fim, *periodo)
+    except Exception as e:
+        return (False, [f"Erro ao criar reserva: {e}"])
+
+def _registrar_reserva(placa, cpf, data_inicio, data_fim, inicio_ts, fim_ts):
+    with transacao(imediata=True) as cursor:
+        # Com a escrita já reservada, nenhuma reserva concorrente entra entre
+        # a conferência de conflitos e o INSERT
+        if not cursor.execute("SELECT 1 FROM veiculos WHERE placa = ?", (placa,)).fetchone():
+            return (False, ["Veículo não encontrado."])
+        if not cursor.execute("SELECT 1 FROM clientes WHERE cpf = ?", (cpf,)).fetchone():
+            return (False, ["Cliente não encontrado."])
+        conflito = cursor.execute("""
+            SELECT inicio, fim FROM reservas
+            WHERE placa_carro = ? AND status = 'Ativa' AND fim_ts > ? AND inicio_ts < ?
+            ORDER BY inicio_ts LIMIT 1
+        """, (placa, inicio_ts, fim_ts)).fetchone()
+        if conflito:
+            return (False, [f"Veículo já reservado de {conflito['inicio']} a {conflito['fim']}."])
+        aluguel = cursor.execute("""
+            SELECT devolucao_prevista, devolucao_prevista_ts FROM alugueis
+            WHERE placa_carro = ? AND status = 'Ativo'
+        """, (placa,)).fetchone()
+        if aluguel:
+            if aluguel['devolucao_prevista_ts'] is None:
+                return (False, ["Veículo está alugado sem devolução prevista."])
+            # Um aluguel atrasado ocupa o veículo ao menos até o fim de hoje
+            ocupado_ate = max(aluguel['devolucao_prevista_ts'], _inicio_do_dia(datetime.now()) + SEGUNDOS_POR_DIA)
+            if inicio_ts < ocupado_ate:
+                return (False, [f"Veículo está alugado com devolução prevista para {aluguel['devolucao_prevista']}."])
+
+        cursor.execute("""
+            INSERT INTO reservas (placa_carro, cpf_cliente, inicio, fim, inicio_ts, fim_ts, status, criada_em)
+            VALUES (?, ?, ?, ?, ?, ?, 'Ativa', ?)
+        """, (placa, cpf, data_inicio, data_fim, inicio_ts, fim_ts, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        id_reserva = cursor.lastrowid
+    return (True, [f"Reserva {id_reserva} registrada de {data_inicio} a {data_fim}."])
+
+def cancelar_reserva(id_reserva):
+    try:
+        with transacao() as cursor:
+            cursor.execute("UPDATE reservas SET status = 'Cancelada' WHERE id = ? AND status = 'Ativa'", (id_reserva,))
+            cancelada = cursor.rowcount
+        if cancelada == 0:
+            return (False, [f"Nenhuma reserva ativa encontrada com o número {id_reserva}."])
+        return (True, ["Reserva cancelada com sucesso."])
+    except Exception as e:
+        return (False, [f"Erro ao cancelar reserva: {e}"])
+
+def listar_reservas(placa_filtro=None, cpf_filtro=None):
+    """Lista as reservas ativas que ainda não terminaram, da mais próxima à mais distante."""
+    filtros, params = ["r.status = 'Ativa'", "r.fim_ts > ?"], [_inicio_do_dia(datetime.now())]
+    if placa_filtro:
+        filtros.append("r.placa_carro = ?")
+        params.append(validacao.normalizar_placa(placa_filtro))
+    if cpf_filtro:
+        filtros.append("r.cpf_cliente = ?")
+        params.append(''.join(filter(str.isdigit, str(cpf_filtro))))
+    with conexao() as conn:
+        cursor = conn.execute(f"""
+            SELECT r.id, r.placa_carro, r.cpf_cliente, c.nome AS nome_cliente, r.inicio, r.fim, r.criada_em
+            FROM reservas r LEFT JOIN clientes c ON c.cpf = r.cpf_cliente
+            WHERE {' AND '.join(filtros)}
+            ORDER BY r.inicio_ts, r.id
+        """, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+def listar_veiculos_disponiveis(data_inicio, data_fim):
+    """Retorna os veículos livres em todos os dias de 'data_inicio' a 'data_fim' (inclusive).
+
+    Um veículo está livre se nenhuma reserva ativa se sobrepõe ao período e,
+    caso esteja alugado, se a devolução prevista é anterior ao início do
+    período (sem ela, o veículo só fica livre ao ser devolvido). As reservas
+    sobrepostas vêm do índice de intervalos, sem percorrer as demais.
+    """
+    periodo = _periodo_reserva(data_inicio, data_fim)
+    if isinstance(periodo, str):
+        return (False, [periodo])
+    inicio_ts, fim_ts = periodo
+    parametros = {
+        "ini_ts": inicio_ts, "fim_ts": fim_ts,
+        "ini_dia": inicio_ts // SEGUNDOS_POR_DIA, "fim_dia": fim_ts // SEGUNDOS_POR_DIA,
+        "amanha": _inicio_do_dia(datetime.now()) + SEGUNDOS_POR_DIA,
+    }
+    try:
+        with conexao() as conn:
+            cursor = conn.execute(f"""
+                SELECT v.* FROM veiculos v
+                WHERE v.placa NOT IN ({_filtro_reservas_sobrepostas(conn)})
+                  AND v.placa NOT IN ({FILTRO_ALUGUEIS_SOBREPOSTOS})
+                ORDER BY v.placa
+            """, parametros)
+            return (True, [dict(row) for row in cursor.fetchall()])
+    except Exception as e:
+        return (False, [f"Erro ao consultar a disponibilidade: {e}"])
+
+# =============================================================================
+# SUGESTÕES POR PREFIXO
+# =============================================================================
+
+# Quantidade padrão de sugestões devolvidas por busca
+LIMITE_SUGESTOES_PADRAO = 20
+
+def _intervalo_prefixo(prefixo):
+    """Retorna (início, fim) tal que 'início <= valor < fim' equivale a começar com o prefixo.
+
+    A comparação por intervalo usa o índice da coluna, o que LIKE 'x%' não faz
+    em colunas com a collation padrão.
+    """
+    return prefixo, prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
+@em_cache
+def sugerir_placas(prefixo="", limite=LIMITE_SUGESTOES_PADRAO, status_filtro='Disponível'):
+    """Retorna até 'limite' placas que começam com o prefixo, em ordem alfabética.
+
+    O hífen das placas antigas é opcional no prefixo (ver validacao.prefixos_placa).
+    """
+    prefixos = validacao.prefixos_placa(prefixo or "")
+    filtros, params = [], []
+    if status_filtro:
+        filtros.append("status = ?")
+        params.append(status_filtro)
+    if prefixos:
+        filtros.append("(" + " OR ".join("(placa >= ? AND placa < ?)" for _ in prefixos) + ")")
+        for forma in prefixos:
+            params.extend(_intervalo_prefixo(forma))
+    query = "SELECT placa FROM veiculos"
+    if filtros:
+        query += " WHERE " + " AND ".join(filtros)
+    query += " ORDER BY placa LIMIT ?"
+    params.append(max(1, int(limite)))
+    with conexao() as conn:
+        return [row['placa'] for row in conn.execute(query, params)]
+
+@em_cache
+def sugerir_clientes(texto="", limite=LIMITE_SUGESTOES_PADRAO):
+    """Retorna até 'limite' clientes (cpf, nome) cujo CPF ou nome começa com o texto.
+
+    Texto formado só por dígitos e pontuação de CPF é buscado pelo início do
+    CPF; qualquer outro texto, pelo início do nome (sem distinguir maiúsculas).
+    """
+    texto = (texto or "").strip()
+    digitos = validacao.somente_digitos(texto)
+    limite = max(1, int(limite))
+    if not texto:
+        query, params = "SELECT cpf, nome FROM clientes ORDER BY cpf LIMIT ?", [limite]
+    elif digitos and not texto.strip("0123456789.- "):
+        query = "SELECT cpf, nome FROM clientes WHERE cpf >= ? AND cpf < ? ORDER BY cpf LIMIT ?"
+        params = [*_intervalo_prefixo(digitos), limite]
+    else:
+        query = """
+            SELECT cpf, nome FROM clientes
+            WHERE nome >= ? COLLATE NOCASE AND nome < ? COLLATE NOCASE
+            ORDER BY nome COLLATE NOCASE LIMIT ?
+        """
+        params = [*_intervalo_prefixo(texto.lower()), limite]
+    with conexao() as conn:
+        return [dict(row) for row in conn.execute(query, params)]
+
+# =============================================================================
+# BUSCA TEXTUAL DE CLIENTES
+# =============================================================================
+
+# Pesos do bm25 por coluna do índice: nome, email, telefone
+PESOS_BUSCA_CLIENTES = (10.0, 5.0, 1.0)
+
+
+@em_cache
+def buscar_clientes(texto, limite=100):
+    """Busca clientes por partes do nome, e-mail ou telefone, dos mais relevantes aos menos.
+
+    Cada palavra do texto é tratada como prefixo e todas precisam aparecer
+    (ex.: 'ana sil' encontra 'Ana Maria Silva'). Sem suporte a FTS5 no
+    SQLite, recorre a uma busca com LIKE sem ordenação por relevância.
+    """
+    termos = re.findall(r"\w+", texto or "")
+    if not termos:
+        return []
+    limite = max(1, int(limite))
+    with conexao() as conn:
+        existe_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_fts'").fetchone()
+        if existe_fts:
+            # ORDER BY rank LIMIT dentro do FTS5: todas as ocorrências entram no
+            # ranking e só as 'limite' melhores são mantidas
+            linhas = conn.execute("""
+                SELECT c.* FROM (
+                    SELECT rowid, rank FROM clientes_fts
+                    WHERE clientes_fts MATCH :consulta AND rank MATCH :pesos
+                    ORDER BY rank LIMIT :limite
+                ) AS f
+                JOIN clientes c ON c.cpf = printf('%011d', f.rowid)
+                ORDER BY f.rank
+            """, {"consulta": " ".join(f'"{termo}"*' for termo in termos), "limite": limite,
+                  "pesos": "bm25(" + ", ".join(map(str, PESOS_BUSCA_CLIENTES)) + ")"})
+        else:
+            linhas = conn.execute(*_consulta_like(termos, limite))
+        return [dict(row) for row in linhas]
+
+def _consulta_like(termos, limite):
+    """Consulta equivalente sem FTS5: cada termo em qualquer das colunas, sem ranking."""
+    condicao = "(nome LIKE ? OR email LIKE ? OR telefone LIKE ?)"
+    query = "SELECT * FROM clientes WHERE " + " AND ".join(condicao for _ in termos) + " LIMIT ?"
+    params = [f"%{termo}%" for termo in termos for _ in range(3)]
+    return query, params + [limite]
 
 # =============================================================================
 # CONSULTAS E RELATÓRIOS
 # =============================================================================
 
+@em_cache
 def listar_alugueis_ativos():
-    conn, cursor = conectar_bd()
-    cursor.execute("SELECT * FROM alugueis WHERE status = 'Ativo' ORDER BY data_retirada DESC")
-    alugueis = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with conexao() as conn:
+        alugueis = [dict(row) for row in conn.execute("SELECT * FROM alugueis WHERE status = 'Ativo' ORDER BY data_retirada DESC")]
     return alugueis
 
 def buscar_historico(filtro_cpf=None):
-    conn, cursor = conectar_bd()
-    query = "SELECT * FROM alugueis"
+    query = "SELECT * FROM historico_alugueis"
     params = []
     if filtro_cpf:
         cpf_numerico = ''.join(filter(str.isdigit, str(filtro_cpf)))
@@ -375,11 +1351,60 @@ def buscar_historico(filtro_cpf=None):
         params.append(cpf_numerico)
     
     query += " ORDER BY data_retirada DESC"
-    cursor.execute(query, params)
-    historico = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with conexao() as conn:
+        historico = [dict(row) for row in conn.execute(query, params)]
     return historico
 
+def buscar_historico_paginado(filtro_cpf=None, tamanho_pagina=TAMANHO_PAGINA_PADRAO, cursor=None):
+    """Retorna uma página do histórico (mais recentes primeiro) e o cursor da próxima."""
+    filtros, params = [], []
+    if filtro_cpf:
+        filtros.append("cpf_cliente = ?")
+        params.append(''.join(filter(str.isdigit, str(filtro_cpf))))
+    return _paginar("SELECT * FROM historico_alugueis", params, ("data_retirada", "id"), filtros, "<", tamanho_pagina, cursor)
+
+# Quantidade de linhas lidas do banco por vez ao percorrer consultas grandes
+TAMANHO_LOTE_LEITURA = 1000
+
+def iterar_historico(filtro_cpf=None, data_inicio=None, data_fim=None, tamanho_lote=TAMANHO_LOTE_LEITURA):
+    """Percorre o histórico em ordem de retirada, lote a lote, sem montar a lista inteira.
+
+    As datas (AAAA-MM-DD, inclusivas) filtram a data de retirada. Lança
+    ValueError se alguma data for inválida, antes de abrir a consulta.
+    """
+    filtros, params = [], []
+    if filtro_cpf:
+        filtros.append("cpf_cliente = ?")
+        params.append(''.join(filter(str.isdigit, str(filtro_cpf))))
+    for data, condicao in ((data_inicio, "data_retirada >= ?"), (data_fim, "data_retirada < date(?, '+1 day')")):
+        if data:
+            try:
+                datetime.strptime(data, '%Y-%m-%d')
+            except (ValueError, TypeError):
+                raise ValueError("Formato de data inválido. Use 'AAAA-MM-DD'.")
+            filtros.append(condicao)
+            params.append(data)
+    query = "SELECT * FROM historico_alugueis"
+    if filtros:
+        query += " WHERE " + " AND ".join(filtros)
+    query += " ORDER BY data_retirada, id"
+    return _iterar_consulta(query, params, max(1, int(tamanho_lote)))
+
+def _iterar_consulta(query, params, tamanho_lote):
+    # A conexão fica emprestada enquanto o gerador é percorrido; no modo WAL a
+    # leitura não bloqueia as escritas.
+    with conexao() as conn:
+        cursor = conn.execute(query, params)
+        try:
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    return
+                for row in linhas:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
 def calcular_faturamento_periodo(data_inicio, data_fim):
     try:
         # Valida o formato das datas
@@ -388,19 +1413,421 @@ def calcular_faturamento_periodo(data_inicio, data_fim):
     except (ValueError, TypeError):
         return (False, ["Formato de data inválido. Use 'AAAA-MM-DD'."])
 
-    conn, cursor = conectar_bd()
     try:
-        cursor.execute("""
-            SELECT SUM(valor_total) AS faturamento
-            FROM alugueis
-            WHERE status = 'Finalizado' AND date(data_devolucao) BETWEEN ? AND ?
-        """, (data_inicio, data_fim))
-        
-        resultado = cursor.fetchone()
+        # Soma os totais diários já agregados: custo proporcional aos dias do período
+        with conexao() as conn:
+            resultado = conn.execute("""
+                SELECT SUM(total) AS faturamento
+                FROM faturamento_diario
+                WHERE dia BETWEEN ? AND ?
+            """, (data_inicio, data_fim)).fetchone()
+
         faturamento = resultado['faturamento'] if resultado['faturamento'] is not None else 0
         return (True, faturamento)
     except Exception as e:
         return (False, [f"Erro ao calcular faturamento: {e}"])
-    finally:
-        conn.close()
 
+def reconstruir_faturamento_diario():
+    """Recalcula o agregado diário de faturamento a partir dos aluguéis finalizados."""
+    try:
+        with transacao() as cursor:
+            cursor.execute("DELETE FROM faturamento_diario")
+            cursor.execute("""
+                INSERT INTO faturamento_diario (dia, total, quantidade)
+                SELECT date(data_devolucao), SUM(valor_total), COUNT(*)
+                FROM historico_alugueis
+                WHERE status = 'Finalizado' AND data_devolucao IS NOT NULL
+                GROUP BY date(data_devolucao)
+            """)
+            dias = cursor.rowcount
+        return (True, [f"Faturamento diário reconstruído ({dias} dia(s))."])
+    except Exception as e:
+        return (False, [f"Erro ao reconstruir faturamento diário: {e}"])
+
+def _tabelas_alugueis(conn):
+    """Tabelas de aluguéis da conexão: a principal e, se houver, a do arquivo."""
+    if not _arquivo_anexado(conn):
+        return ["main.alugueis"]
+    return ["main.alugueis", "arquivo.alugueis"]
+
+def _limites_alugueis(conn):
+    """Retorna a menor retirada e a maior devolução (em segundos) entre os aluguéis.
+
+    Cada MIN/MAX lê só a ponta de um índice, no banco principal e no arquivo.
+    """
+    retiradas, devolucoes = [], []
+    for tabela in _tabelas_alugueis(conn):
+        retiradas.append(conn.execute(f"SELECT MIN(retirada_ts) FROM {tabela}").fetchone()[0])
+        devolucoes.append(conn.execute(f"SELECT MAX(devolucao_ts) FROM {tabela}").fetchone()[0])
+    retiradas = [r for r in retiradas if r is not None]
+    devolucoes = [d for d in devolucoes if d is not None]
+    return (min(retiradas) if retiradas else None), (max(devolucoes) if devolucoes else None)
+
+def _filtro_periodo(conn, inicio, fim):
+    """Monta o filtro dos aluguéis que cruzam [inicio, fim) pelo índice mais seletivo.
+
+    Um aluguel cruza o período se foi retirado antes do fim e devolvido
+    depois do início (ou segue ativo). Cada metade do filtro tem seu índice,
+    mas o planejador não sabe qual delas separa menos linhas: para períodos
+    recentes quase todo o histórico foi retirado antes do fim, e para
+    períodos antigos quase todo ele foi devolvido depois do início. Supondo
+    os aluguéis espalhados de forma uniforme no tempo, percorre o índice do
+    lado mais curto; o '+' impede o uso do índice do outro lado.
+    """
+    menor_retirada, maior_devolucao = _limites_alugueis(conn)
+    if (menor_retirada is not None and maior_devolucao is not None
+            and maior_devolucao - inicio < fim - menor_retirada):
+        return "+a.retirada_ts < :fim AND (a.devolucao_ts IS NULL OR a.devolucao_ts >= :ini)"
+    return "a.retirada_ts < :fim AND (+a.devolucao_ts IS NULL OR +a.devolucao_ts >= :ini)"
+
+def relatorio_utilizacao_frota(data_inicio, data_fim):
+    """Calcula, por veículo, o uso da frota no período em uma única consulta.
+
+    Para cada veículo retorna a quantidade de aluguéis no período, os dias
+    alugados (aluguéis recortados aos limites do período; aluguéis ativos
+    contam até agora), a utilização percentual, os dias ociosos, o maior
+    intervalo ocioso (incluindo o início e o fim do período) e a receita dos
+    aluguéis devolvidos no período. Os intervalos entre aluguéis consecutivos
+    são obtidos com LAG() sobre os aluguéis de cada placa, sem consultas por
+    veículo. As contas são feitas em segundos inteiros (retirada_ts e
+    devolucao_ts) e convertidas em dias só no resultado.
+    """
+    try:
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+        fim = datetime.strptime(data_fim, '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return (False, ["Formato de data inválido. Use 'AAAA-MM-DD'."])
+    if fim < inicio:
+        return (False, ["A data de fim deve ser igual ou posterior à data de início."])
+
+    parametros = {
+        "ini": em_segundos(inicio),
+        "fim": em_segundos(fim) + SEGUNDOS_POR_DIA,
+        "agora": em_segundos(datetime.now()),
+        "dia": float(SEGUNDOS_POR_DIA),
+    }
+    try:
+        with conexao() as conn:
+            filtro = _filtro_periodo(conn, parametros["ini"], parametros["fim"])
+            linhas = conn.execute(f"""
+                WITH intervalos AS (
+                    SELECT a.placa_carro AS placa,
+                           MAX(a.retirada_ts, :ini) AS ini,
+                           MIN(COALESCE(a.devolucao_ts, :agora), :fim) AS fim,
+                           CASE WHEN a.status = 'Finalizado'
+                                 AND a.devolucao_ts >= :ini
+                                 AND a.devolucao_ts < :fim
+                                THEN a.valor_total ELSE 0 END AS receita,
+                           a.devolucao_ts = a.retirada_ts AND a.retirada_ts >= :ini AS instantaneo
+                    FROM historico_alugueis a
+                    WHERE {filtro}
+                ),
+                ordenados AS (
+                    SELECT placa, ini, fim, receita,
+                           ini - LAG(fim) OVER (PARTITION BY placa ORDER BY ini) AS intervalo
+                    FROM intervalos
+                    -- Só aluguéis que se sobrepõem ao período, mais os de duração
+                    -- zero feitos dentro dele (devolvidos no mesmo segundo da
+                    -- retirada); um aluguel devolvido exatamente no início do
+                    -- período não entra
+                    WHERE fim > ini OR instantaneo
+                ),
+                por_placa AS (
+                    SELECT placa,
+                           COUNT(*) AS alugueis,
+                           SUM(fim - ini) AS segundos_alugados,
+                           MAX(COALESCE(MAX(intervalo), 0), MIN(ini) - :ini, :fim - MAX(fim)) AS maior_ociosidade,
+                           SUM(receita) AS receita
+                    FROM ordenados
+                    GROUP BY placa
+                )
+                SELECT v.placa, v.marca, v.modelo,
+                       COALESCE(u.alugueis, 0) AS alugueis,
+                       ROUND(COALESCE(u.segundos_alugados, 0) / :dia, 2) AS dias_alugados,
+                       ROUND(100.0 * COALESCE(u.segundos_alugados, 0) / (:fim - :ini), 1) AS utilizacao,
+                       ROUND((:fim - :ini - COALESCE(u.segundos_alugados, 0)) / :dia, 2) AS dias_ociosos,
+                       ROUND(COALESCE(u.maior_ociosidade, :fim - :ini) / :dia, 2) AS maior_ociosidade,
+                       COALESCE(u.receita, 0) AS receita
+                FROM veiculos v
+                LEFT JOIN por_placa u ON u.placa = v.placa
+                ORDER BY utilizacao DESC, v.placa
+            """, parametros).fetchall()
+        return (True, [dict(row) for row in linhas])
+    except Exception as e:
+        return (False, [f"Erro ao calcular utilização da frota: {e}"])
+
+# Dimensões do detalhamento de faturamento. Para cada uma: a coluna de
+# alugueis agrupada na primeira passada e a expressão agrupada na segunda,
+# depois de juntar veículos (v) e clientes (c) às linhas já agregadas (b).
+DIMENSOES_FATURAMENTO = {
+    "mes": ("substr(a.data_devolucao, 1, 7) AS mes", "b.mes"),
+    "marca": ("a.placa_carro AS placa", "COALESCE(v.marca, '?')"),
+    "modelo": ("a.placa_carro AS placa", "COALESCE(v.modelo, '?')"),
+    "placa": ("a.placa_carro AS placa", "b.placa"),
+    "cliente": ("a.cpf_cliente AS cpf", "b.cpf"),
+}
+
+def faturamento_detalhado(data_inicio, data_fim, dimensoes=("mes",), subtotais=False):
+    """Detalha o faturamento dos aluguéis devolvidos no período pelas dimensões pedidas.
+
+    'dimensoes' são chaves de DIMENSOES_FATURAMENTO, da mais externa para a
+    mais interna. Uma única consulta agrupa os aluguéis pelas colunas que
+    as dimensões usam (mês, placa, CPF) e agrupa de novo o resultado, já
+    pequeno, por marca, modelo etc.; veículos e clientes são lidos uma vez
+    por grupo, não por aluguel. Só por mês, lê o agregado diário de
+    faturamento. Com 'subtotais' as linhas ganham os totais
+    de cada prefixo das dimensões, como um GROUP BY ROLLUP: o total geral
+    primeiro e cada subtotal antes das linhas que soma.
+
+    Cada linha traz as dimensões, 'alugueis', 'faturamento' e 'nivel' (a
+    quantidade de dimensões fixadas; nas linhas de subtotal as demais são
+    None). Quando 'cliente' é uma das dimensões, traz também 'nome_cliente'.
+    """
+    try:
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+        fim = datetime.strptime(data_fim, '%Y-%m-%d')
+    except (ValueError, TypeError):
+        return (False, ["Formato de data inválido. Use 'AAAA-MM-DD'."])
+    if fim < inicio:
+        return (False, ["A data de fim deve ser igual ou posterior à data de início."])
+    dimensoes = list(dimensoes)
+    invalidas = [d for d in dimensoes if d not in DIMENSOES_FATURAMENTO]
+    if not dimensoes or invalidas or len(set(dimensoes)) != len(dimensoes):
+        return (False, [f"Dimensões inválidas. Use uma ou mais de: {', '.join(DIMENSOES_FATURAMENTO)}."])
+
+    parametros = {"inicio": data_inicio, "fim": data_fim,
+                  "ini": em_segundos(inicio), "fim_ts": em_segundos(fim) + SEGUNDOS_POR_DIA}
+    try:
+        with conexao() as conn:
+            if dimensoes == ["mes"]:
+                # Só o mês: o agregado diário já tem os totais (ver calcular_faturamento_periodo)
+                consulta = """
+                    SELECT substr(dia, 1, 7) AS mes, SUM(quantidade) AS alugueis, ROUND(SUM(total), 2) AS faturamento
+                    FROM faturamento_diario
+                    WHERE dia BETWEEN :inicio AND :fim
+                    GROUP BY mes
+                    ORDER BY mes
+                """
+            else:
+                consulta = _consulta_faturamento_detalhado(dimensoes, _tabelas_alugueis(conn))
+            linhas = [dict(row) for row in conn.execute(consulta, parametros)]
+    except Exception as e:
+        return (False, [f"Erro ao detalhar faturamento: {e}"])
+
+    for linha in linhas:
+        linha["nivel"] = len(dimensoes)
+    if subtotais:
+        linhas = _acrescentar_subtotais(linhas, dimensoes)
+    return (True, linhas)
+
+def _consulta_faturamento_detalhado(dimensoes, tabelas):
+    """Monta a consulta em duas etapas de faturamento_detalhado sobre os aluguéis.
+
+    A etapa interna lê só o índice de faturamento (migração 7), sem abrir a
+    tabela, e agrupa pelas colunas que as dimensões usam; a externa junta
+    veículos e clientes aos grupos e agrupa pelas dimensões pedidas. As
+    tabelas são lidas diretamente, e não pela visão historico_alugueis,
+    que entregaria todas as colunas e obrigaria a abrir a tabela.
+    """
+    colunas_base = list(dict.fromkeys(DIMENSOES_FATURAMENTO[d][0] for d in dimensoes))
+    chaves_base = ", ".join(coluna.rsplit(" AS ", 1)[1] for coluna in colunas_base)
+    # Cada tabela é agrupada separadamente (unir as linhas antes custaria
+    # uma cópia por aluguel); os grupos se somam na etapa externa
+    origem = " UNION ALL ".join(
+        f"""SELECT {", ".join(colunas_base)}, COUNT(*) AS alugueis, SUM(a.valor_total) AS faturamento
+            FROM {tabela} a
+            WHERE a.status = 'Finalizado' AND a.devolucao_ts >= :ini AND a.devolucao_ts < :fim_ts
+            GROUP BY {chaves_base}"""
+        for tabela in tabelas)
+    expressoes = [DIMENSOES_FATURAMENTO[d][1] for d in dimensoes]
+    selecao = [f"{expressao} AS {d}" for d, expressao in zip(dimensoes, expressoes)]
+    juncoes = ""
+    if {"marca", "modelo"} & set(dimensoes):
+        juncoes += " LEFT JOIN veiculos v ON v.placa = b.placa"
+    if "cliente" in dimensoes:
+        selecao.append("MAX(c.nome) AS nome_cliente")
+        juncoes += " LEFT JOIN clientes c ON c.cpf = b.cpf"
+    return f"""
+        SELECT {", ".join(selecao)},
+               SUM(b.alugueis) AS alugueis,
+               ROUND(SUM(b.faturamento), 2) AS faturamento
+        FROM ({origem}) b{juncoes}
+        GROUP BY {", ".join(expressoes)}
+        ORDER BY {", ".join(expressoes)}
+    """
+
+def _acrescentar_subtotais(linhas, dimensoes):
+    """Intercala os subtotais de cada prefixo das dimensões nas linhas já ordenadas."""
+    totais = {}
+    for linha in linhas:
+        chave = tuple(linha[d] for d in dimensoes)
+        for nivel in range(len(dimensoes)):
+            total = totais.setdefault(chave[:nivel], [0, 0.0])
+            total[0] += linha["alugueis"]
+            total[1] += linha["faturamento"]
+    resultado = []
+    for linha in linhas:
+        chave = tuple(linha[d] for d in dimensoes)
+        for nivel in range(len(dimensoes)):
+            total = totais.pop(chave[:nivel], None)
+            if total is not None:
+                subtotal = {d: (chave[i] if i < nivel else None) for i, d in enumerate(dimensoes)}
+                if "nome_cliente" in linha:
+                    subtotal["nome_cliente"] = linha["nome_cliente"] if "cliente" in dimensoes[:nivel] else None
+                subtotal.update(alugueis=total[0], faturamento=round(total[1], 2), nivel=nivel)
+                resultado.append(subtotal)
+        resultado.append(linha)
+    if not linhas:
+        resultado.append({**{d: None for d in dimensoes}, "alugueis": 0, "faturamento": 0, "nivel": 0})
+    return resultado
+
+# =============================================================================
+# ARQUIVAMENTO DE ALUGUÉIS
+# =============================================================================
+
+# Aluguéis finalizados há mais dias que isto vão para o banco de arquivo, em
+# lotes de até ARQUIVAMENTO_LOTE aluguéis por transação
+ARQUIVAR_APOS_DIAS = obter_configuracao('ARQUIVAR_APOS_DIAS', 365)
+ARQUIVAMENTO_LOTE = obter_configuracao('ARQUIVAMENTO_LOTE', 1000)
+
+# Versão do esquema do banco de arquivo, registrada no PRAGMA user_version dele
+VERSAO_ARQUIVO = 1
+
+def _preparar_arquivo():
+    """Cria ou atualiza o esquema do banco de arquivo, se ainda não estiver na versão atual.
+
+    O arquivo é criado na inicialização (criar_tabelas); em seguida as
+    conexões do pool são renovadas para que passem a anexá-lo. Arquivos de
+    versões anteriores recebem as colunas e os índices que faltarem.
+    """
+    with conexao() as conn:
+        if _arquivo_anexado(conn):
+            if conn.execute("PRAGMA arquivo.user_version").fetchone()[0] >= VERSAO_ARQUIVO:
+                return
+        else:
+            conn.execute("ATTACH DATABASE ? AS arquivo", (caminho_arquivo(NOME_BANCO_DADOS),))
+            conn.execute("PRAGMA arquivo.journal_mode = WAL")
+        with transacao(imediata=True) as cursor:
+            # Outra conexão pode ter preparado o arquivo antes de obtermos a trava
+            if cursor.execute("PRAGMA arquivo.user_version").fetchone()[0] >= VERSAO_ARQUIVO:
+                return
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS arquivo.alugueis (
+                    id INTEGER PRIMARY KEY,
+                    placa_carro TEXT NOT NULL,
+                    cpf_cliente TEXT NOT NULL,
+                    data_retirada TEXT NOT NULL,
+                    data_devolucao TEXT,
+                    valor_total REAL,
+                    status TEXT NOT NULL,
+                    retirada_ts INTEGER,
+                    devolucao_ts INTEGER
+                )
+            """)
+            if "retirada_ts" not in {row[1] for row in cursor.execute("PRAGMA arquivo.table_info(alugueis)")}:
+                # Arquivo criado antes das datas em segundos (migração 6)
+                cursor.execute("ALTER TABLE arquivo.alugueis ADD COLUMN retirada_ts INTEGER")
+                cursor.execute("ALTER TABLE arquivo.alugueis ADD COLUMN devolucao_ts INTEGER")
+                cursor.execute("""
+                    UPDATE arquivo.alugueis
+                    SET retirada_ts = CAST(strftime('%s', data_retirada) AS INTEGER),
+                        devolucao_ts = CAST(strftime('%s', data_devolucao) AS INTEGER)
+                """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_arquivo_cliente_retirada ON alugueis (cpf_cliente, data_retirada)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_arquivo_retirada ON alugueis (data_retirada)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_arquivo_retirada_ts ON alugueis (retirada_ts)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_arquivo_devolucao_ts ON alugueis (devolucao_ts)")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS arquivo.idx_arquivo_faturamento
+                ON alugueis (devolucao_ts, placa_carro, cpf_cliente, valor_total, data_devolucao, status)
+                WHERE status = 'Finalizado'
+            """)
+            cursor.execute(f"PRAGMA arquivo.user_version = {VERSAO_ARQUIVO}")
+    _pool.renovar()
+
+def arquivar_alugueis(dias=None, tamanho_lote=None, max_lotes=None):
+    """Move os aluguéis finalizados há mais de 'dias' para o banco de arquivo.
+
+    Cada lote é copiado para o arquivo em uma transação e só depois removido
+    do banco principal, em outra. No modo WAL uma transação que escreve nos
+    dois bancos não é atômica entre eles; nesta ordem, uma interrupção deixa
+    no máximo cópias repetidas, que a próxima execução remove do principal.
+    Entre os lotes as demais escritas seguem normalmente.
+    """
+    if caminho_arquivo(NOME_BANCO_DADOS) is None:
+        return (False, ["O arquivamento exige um banco de dados em arquivo."])
+    dias = ARQUIVAR_APOS_DIAS if dias is None else int(dias)
+    tamanho_lote = max(1, int(tamanho_lote or ARQUIVAMENTO_LOTE))
+    data_corte = (datetime.now() - timedelta(days=dias)).replace(hour=0, minute=0, second=0, microsecond=0)
+    corte = data_corte.strftime('%Y-%m-%d')
+    colunas = ", ".join(COLUNAS_ALUGUEIS)
+    arquivados = lotes = 0
+    try:
+        _preparar_arquivo()
+        # Conclui um arquivamento interrompido entre a cópia e a remoção
+        with transacao(imediata=True) as cursor:
+            cursor.execute("""
+                DELETE FROM main.alugueis
+                WHERE status = 'Finalizado'
+                  AND EXISTS (SELECT 1 FROM arquivo.alugueis r WHERE r.id = main.alugueis.id)
+            """)
+            pendentes = cursor.rowcount
+
+        while max_lotes is None or lotes < max_lotes:
+            with transacao(imediata=True) as cursor:
+                ids = [row[0] for row in cursor.execute("""
+                    SELECT id FROM main.alugueis
+                    WHERE status = 'Finalizado' AND devolucao_ts < ?
+                    LIMIT ?
+                """, (em_segundos(data_corte), tamanho_lote))]
+                if not ids:
+                    break
+                marcadores = ", ".join("?" * len(ids))
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO arquivo.alugueis ({colunas})
+                    SELECT {colunas} FROM main.alugueis WHERE id IN ({marcadores})
+                """, ids)
+            with transacao(imediata=True) as cursor:
+                cursor.execute(f"""
+                    DELETE FROM main.alugueis
+                    WHERE id IN ({marcadores})
+                      AND EXISTS (SELECT 1 FROM arquivo.alugueis r WHERE r.id = main.alugueis.id)
+                """, ids)
+            arquivados += len(ids)
+            lotes += 1
+    except sqlite3.Error as e:
+        return (False, [f"Erro ao arquivar aluguéis ({arquivados} já arquivado(s)): {e}"])
+
+    mensagens = [f"{arquivados} aluguel(is) finalizado(s) antes de {corte} arquivado(s) em {lotes} lote(s)."]
+    if pendentes:
+        mensagens.append(f"{pendentes} aluguel(is) de um arquivamento interrompido concluído(s).")
+    return (True, mensagens)
+
+def contar_alugueis_arquivados():
+    """Retorna quantos aluguéis estão no banco principal e quantos no arquivo."""
+    with conexao() as conn:
+        principal = conn.execute("SELECT COUNT(*) FROM main.alugueis").fetchone()[0]
+        if not _arquivo_anexado(conn):
+            return {"principal": principal, "arquivo": 0}
+        arquivo = conn.execute("SELECT COUNT(*) FROM arquivo.alugueis").fetchone()[0]
+    return {"principal": principal, "arquivo": arquivo}
+
+# =============================================================================
+# INSTRUMENTAÇÃO
+# =============================================================================
+
+# Consultas acima de DB_LIMITE_LENTO_MS vão para dados/consultas_lentas.log
+instrumentacao.configurar_log_lentas(instrumentacao.caminho_log_lentas(DADOS_DIR))
+
+# Funções públicas que não são medidas: infraestrutura do módulo, validações
+# sem acesso ao banco e geradores (cujo trabalho acontece fora da chamada)
+NAO_INSTRUMENTADAS = {
+    "configurar_banco", "fechar_conexoes", "em_cache", "estatisticas_cache", "ativar_instrumentacao",
+    "estatisticas_operacoes", "diagnostico", "conectar_bd", "conexao", "transacao", "executar_com_retentativas",
+    "caminho_arquivo", "em_segundos", "fts5_disponivel", "versao_esquema", "aplicar_migracoes", "iterar_historico",
+    "validar_placa", "validar_ano", "validar_valor", "validar_cpf", "validar_veiculo", "validar_cliente",
+}
+
+# Deve permanecer no fim do módulo: substitui as funções públicas definidas
+# acima por versões medidas
+instrumentacao.instrumentar_modulo(globals(), __name__, NAO_INSTRUMENTADAS)
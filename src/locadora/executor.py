@@ -0,0 +1,129 @@
+"""
+Módulo de execução em segundo plano do Sistema de Locadora
+
+Executa operações de banco de dados em um pool de threads e entrega os
+resultados de volta à thread da interface, drenando uma fila de resultados
+com widget.after(). Assim, uma consulta lenta ou um banco bloqueado nunca
+congela o loop principal do Tkinter.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+
+class ExecutorBanco:
+    """Pool de threads para operações de banco com resultados entregues via after().
+
+    Cada tarefa pode ter uma 'chave' (ex.: "veiculos"). Ao enviar uma nova
+    tarefa com a mesma chave, a anterior é considerada obsoleta: se ainda não
+    começou é cancelada, e se já estiver rodando seu resultado é descartado.
+    Tarefas sem chave (escritas, por exemplo) nunca são substituídas.
+    """
+
+    def __init__(self, widget, max_workers=2, intervalo_ms=25, ao_mudar_ocupado=None, ao_erro=None):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self.ao_mudar_ocupado = ao_mudar_ocupado
+        self.ao_erro = ao_erro
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="locadora-db")
+        self._resultados = queue.Queue()
+        self._sequencia = count(1)
+        self._atuais = {}
+        self._futuros = {}
+        self._pendentes = 0
+        self._drenagem_agendada = False
+        self._encerrado = False
+
+    @property
+    def ocupado(self):
+        """Indica se há tarefas enviadas cujo resultado ainda não foi entregue."""
+        return self._pendentes > 0
+
+    def pendente(self, chave):
+        """Indica se a tarefa mais recente da chave ainda não foi concluída."""
+        futuro = self._futuros.get(chave)
+        return futuro is not None and not futuro.done()
+
+    def enviar(self, chave, funcao, *args, ao_concluir=None, ao_falhar=None, **kwargs):
+        """Agenda 'funcao(*args, **kwargs)' em segundo plano.
+
+        'ao_concluir(resultado)' e 'ao_falhar(erro)' são chamados na thread da
+        interface. Sem 'ao_falhar', o erro é repassado ao 'ao_erro' do executor.
+        """
+        if self._encerrado:
+            return None
+        identificador = next(self._sequencia)
+        if chave is not None:
+            self.cancelar(chave)
+            self._atuais[chave] = identificador
+
+        def executar():
+            try:
+                resultado = funcao(*args, **kwargs)
+            except Exception as erro:
+                self._resultados.put((chave, identificador, False, erro, ao_concluir, ao_falhar))
+            else:
+                self._resultados.put((chave, identificador, True, resultado, ao_concluir, ao_falhar))
+
+        futuro = self._pool.submit(executar)
+        if chave is not None:
+            self._futuros[chave] = futuro
+        self._alterar_pendentes(+1)
+        self._agendar_drenagem()
+        return identificador
+
+    def cancelar(self, chave):
+        """Descarta a tarefa corrente da chave, cancelando-a se ainda não começou."""
+        self._atuais.pop(chave, None)
+        futuro = self._futuros.pop(chave, None)
+        if futuro is not None and futuro.cancel():
+            self._alterar_pendentes(-1)
+
+    def encerrar(self):
+        """Impede novos envios e libera as threads sem esperar tarefas em curso."""
+        self._encerrado = True
+        for futuro in self._futuros.values():
+            futuro.cancel()
+        self._pool.shutdown(wait=False)
+
+    def _alterar_pendentes(self, delta):
+        estava_ocupado = self.ocupado
+        self._pendentes = max(0, self._pendentes + delta)
+        if self.ao_mudar_ocupado and estava_ocupado != self.ocupado:
+            self.ao_mudar_ocupado(self.ocupado)
+
+    def _agendar_drenagem(self):
+        if not self._drenagem_agendada and not self._encerrado:
+            self._drenagem_agendada = True
+            self.widget.after(self.intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        """Entrega, na thread da interface, os resultados já disponíveis."""
+        self._drenagem_agendada = False
+        if self._encerrado:
+            return
+        while True:
+            try:
+                chave, identificador, sucesso, valor, ao_concluir, ao_falhar = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._alterar_pendentes(-1)
+            if chave is not None:
+                if self._atuais.get(chave) != identificador:
+                    continue  # Resultado obsoleto: uma tarefa mais nova substituiu esta
+                self._atuais.pop(chave, None)
+                self._futuros.pop(chave, None)
+            try:
+                if sucesso:
+                    if ao_concluir:
+                        ao_concluir(valor)
+                elif ao_falhar:
+                    ao_falhar(valor)
+                elif self.ao_erro:
+                    self.ao_erro(valor)
+            except Exception as erro:
+                if self.ao_erro:
+                    self.ao_erro(erro)
+        if self._pendentes > 0:
+            self._agendar_drenagem()
@@ -0,0 +1,114 @@
+"""
+Módulo de exportação do Sistema de Locadora
+
+Grava o histórico de aluguéis em CSV ou JSONL, opcionalmente compactado com
+gzip. Os registros vêm de database.iterar_historico, que lê o banco em lotes
+com fetchmany, e são escritos um a um: a memória usada não depende do
+tamanho da tabela.
+
+O formato é deduzido da extensão do arquivo (.csv, .jsonl, .csv.gz,
+.jsonl.gz) quando não é informado. Um arquivo só recebe o nome definitivo
+depois de escrito por completo.
+
+Uso:
+    python -m locadora.cli exportar historico_julho.csv.gz --inicio 2025-07-01 --fim 2025-07-31
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+
+from . import database as db
+
+FORMATOS = ("csv", "jsonl")
+
+# Colunas exportadas, na ordem do arquivo
+COLUNAS_HISTORICO = ("id", "placa_carro", "cpf_cliente", "data_retirada", "data_devolucao", "valor_total", "status")
+
+# =============================================================================
+# FORMATOS
+# =============================================================================
+
+def deduzir_formato(caminho):
+    """Retorna (formato, compactado) a partir da extensão do arquivo."""
+    nome = caminho.lower()
+    compactado = nome.endswith(".gz")
+    if compactado:
+        nome = nome[:-3]
+    formato = os.path.splitext(nome)[1].lstrip(".")
+    return (formato if formato in FORMATOS else None), compactado
+
+def escrever_csv(registros, arquivo):
+    """Escreve os registros como CSV com cabeçalho e retorna a quantidade escrita."""
+    escritor = csv.writer(arquivo)
+    escritor.writerow(COLUNAS_HISTORICO)
+    quantidade = 0
+    for registro in registros:
+        escritor.writerow([registro[coluna] for coluna in COLUNAS_HISTORICO])
+        quantidade += 1
+    return quantidade
+
+def escrever_jsonl(registros, arquivo):
+    """Escreve um objeto JSON por linha e retorna a quantidade escrita."""
+    quantidade = 0
+    for registro in registros:
+        arquivo.write(json.dumps({coluna: registro[coluna] for coluna in COLUNAS_HISTORICO}, ensure_ascii=False))
+        arquivo.write("\n")
+        quantidade += 1
+    return quantidade
+
+ESCRITORES = {"csv": escrever_csv, "jsonl": escrever_jsonl}
+
+def _abrir(caminho, compactado, nome=None):
+    if not compactado:
+        return open(caminho, "w", encoding="utf-8", newline="")
+    # 'nome' é o nome registrado no cabeçalho gzip (o do arquivo final, não o temporário)
+    arquivo = open(caminho, "wb")
+    compactador = gzip.GzipFile(filename=nome or caminho, mode="wb", fileobj=arquivo)
+    compactador.myfileobj = arquivo  # fechado junto com o compactador
+    return io.TextIOWrapper(compactador, encoding="utf-8", newline="")
+
+# =============================================================================
+# EXPORTAÇÃO
+# =============================================================================
+
+def exportar_historico(destino, formato=None, compactar=None, filtro_cpf=None, data_inicio=None, data_fim=None):
+    """Exporta o histórico filtrado para 'destino' ('-' escreve na saída padrão).
+
+    Retorna (sucesso, mensagens), como as operações do módulo database.
+    """
+    formato_arquivo, compactado_arquivo = deduzir_formato(destino) if destino != "-" else (None, False)
+    formato = formato or formato_arquivo or "csv"
+    compactar = compactado_arquivo if compactar is None else compactar
+    if formato not in ESCRITORES:
+        return False, [f"Formato inválido: {formato}. Use {' ou '.join(FORMATOS)}."]
+    if destino == "-" and compactar:
+        return False, ["A saída compactada precisa de um arquivo de destino."]
+
+    try:
+        registros = db.iterar_historico(filtro_cpf, data_inicio, data_fim)
+    except ValueError as e:
+        return False, [str(e)]
+
+    if destino == "-":
+        try:
+            quantidade = ESCRITORES[formato](registros, sys.stdout)
+        finally:
+            registros.close()
+        return True, [f"{quantidade} registro(s) exportado(s)."]
+
+    temporario = destino + ".parcial"
+    try:
+        with _abrir(temporario, compactar, os.path.basename(destino)) as arquivo:
+            quantidade = ESCRITORES[formato](registros, arquivo)
+        os.replace(temporario, destino)
+    except Exception as e:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False, [f"Erro ao exportar o histórico: {e}"]
+    finally:
+        registros.close()
+    return True, [f"{quantidade} registro(s) exportado(s) para {destino}."]
@@ -0,0 +1,261 @@
+"""
+Módulo de importação em lote do Sistema de Locadora
+
+Lê veículos e clientes de arquivos CSV (com cabeçalho) ou JSONL (um objeto
+por linha) de forma incremental, valida cada registro com as mesmas regras
+de adicionar_veiculo/adicionar_cliente e grava os registros válidos com
+executemany em lotes transacionais. Registros rejeitados são gravados, um a
+um, em um relatório CSV, de modo que o uso de memória não depende do
+tamanho do arquivo.
+
+Uso:
+    python -m locadora.importacao veiculos frota.csv --relatorio rejeitados.csv
+    python -m locadora.importacao clientes clientes.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+from . import database as db, validacao
+
+# Quantidade de registros gravados por transação
+TAMANHO_LOTE_PADRAO = 5000
+
+# Quantidade máxima de parâmetros por consulta "IN (...)"
+LIMITE_PARAMETROS = 500
+
+FORMATOS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+CAMPOS_VEICULO = ("placa", "marca", "modelo", "ano", "cor", "valor_diaria")
+CAMPOS_CLIENTE = ("cpf", "nome", "telefone", "email")
+
+# =============================================================================
+# LEITURA E PREPARAÇÃO DOS REGISTROS
+# =============================================================================
+
+def detectar_formato(caminho):
+    """Deduz o formato do arquivo ('csv' ou 'jsonl') pela extensão."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in FORMATOS:
+        raise ValueError(f"Formato de arquivo não suportado: '{extensao}'. Use .csv ou .jsonl.")
+    return FORMATOS[extensao]
+
+def ler_registros(caminho, formato=None):
+    """Gera pares (número da linha, registro) lendo o arquivo incrementalmente.
+
+    Linhas JSONL que não contêm um objeto válido são entregues com registro None.
+    """
+    formato = formato or detectar_formato(caminho)
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        if formato == "csv":
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                yield leitor.line_num, registro
+            return
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                registro = None
+            yield numero, registro if isinstance(registro, dict) else None
+
+def _texto(valor):
+    return "" if valor is None else str(valor)
+
+def preparar_veiculo(registro):
+    """Valida e normaliza um registro; retorna (placa, linha para o INSERT, erros)."""
+    placa, marca, modelo, ano, cor, valor_diaria = (_texto(registro.get(campo)) for campo in CAMPOS_VEICULO)
+    erros = db.validar_veiculo(placa, marca, modelo, ano, cor, valor_diaria)
+    placa = validacao.normalizar_placa(placa)
+    if erros:
+        return placa, None, erros
+    linha = (placa, marca.strip(), modelo.strip(), int(ano), cor.strip(), float(valor_diaria.replace(",", ".")))
+    return placa, linha, []
+
+def preparar_cliente(registro):
+    """Valida e normaliza um registro; retorna (cpf, linha para o INSERT, erros)."""
+    cpf, nome, telefone, email = (_texto(registro.get(campo)) for campo in CAMPOS_CLIENTE)
+    erros = db.validar_cliente(cpf, nome)
+    cpf_limpo = ''.join(filter(str.isdigit, cpf))
+    if erros:
+        return cpf_limpo or cpf, None, erros
+    return cpf_limpo, (cpf_limpo, nome.strip(), telefone.strip(), email.strip().lower()), []
+
+# Para cada tipo: função de preparo, INSERT e colunas únicas
+# (coluna, posição na linha, mensagem de duplicidade).
+ESPECIFICACOES = {
+    "veiculos": {
+        "preparar": preparar_veiculo,
+        "insert": "INSERT INTO veiculos (placa, marca, modelo, ano, cor, valor_diaria) VALUES (?, ?, ?, ?, ?, ?)",
+        "unicos": [("placa", 0, "A placa '{}' já está cadastrada.")],
+    },
+    "clientes": {
+        "preparar": preparar_cliente,
+        "insert": "INSERT INTO clientes (cpf, nome, telefone, email) VALUES (?, ?, ?, ?)",
+        "unicos": [
+            ("cpf", 0, "O CPF '{}' já está cadastrado."),
+            ("email", 3, "O e-mail '{}' já está em uso."),
+        ],
+    },
+}
+
+# =============================================================================
+# GRAVAÇÃO EM LOTES
+# =============================================================================
+
+class _Relatorio:
+    """Acumula a contagem de rejeições e grava cada uma no CSV, se houver."""
+
+    def __init__(self, escritor=None):
+        self.escritor = escritor
+        self.rejeitados = 0
+
+    def rejeitar(self, numero, chave, erros):
+        self.rejeitados += 1
+        if self.escritor:
+            self.escritor.writerow([numero, chave, "; ".join(erros)])
+
+@contextmanager
+def _abrir_relatorio(caminho_relatorio):
+    if not caminho_relatorio:
+        yield _Relatorio()
+        return
+    with open(caminho_relatorio, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(["linha", "chave", "erros"])
+        yield _Relatorio(escritor)
+
+def _buscar_existentes(cursor, tabela, coluna, valores):
+    """Retorna quais dos valores já existem na coluna, consultando em blocos."""
+    valores = list(valores)
+    existentes = set()
+    for inicio in range(0, len(valores), LIMITE_PARAMETROS):
+        bloco = valores[inicio:inicio + LIMITE_PARAMETROS]
+        marcadores = ", ".join("?" for _ in bloco)
+        cursor.execute(f"SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({marcadores})", bloco)
+        existentes.update(row[0] for row in cursor.fetchall())
+    return existentes
+
+def _gravar_lote(tabela, especificacao, lote, relatorio):
+    """Grava um lote em uma única transação e retorna quantos registros entraram."""
+    # IMMEDIATE: as duplicidades conferidas abaixo não podem mudar antes do INSERT
+    with db.transacao(imediata=True) as cursor:
+        for coluna, posicao, mensagem in especificacao["unicos"]:
+            existentes = _buscar_existentes(cursor, tabela, coluna, {linha[posicao] for _, _, linha in lote})
+            if existentes:
+                restantes = []
+                for numero, chave, linha in lote:
+                    if linha[posicao] in existentes:
+                        relatorio.rejeitar(numero, chave, [mensagem.format(linha[posicao])])
+                    else:
+                        restantes.append((numero, chave, linha))
+                lote = restantes
+        if not lote:
+            return 0
+
+        try:
+            with db.transacao() as sub:
+                sub.executemany(especificacao["insert"], [linha for _, _, linha in lote])
+            return len(lote)
+        except sqlite3.IntegrityError:
+            pass
+
+        # Um conflito não previsto (ex.: escrita concorrente) derrubou o lote:
+        # regrava linha a linha para isolar apenas os registros problemáticos.
+        inseridos = 0
+        for numero, chave, linha in lote:
+            try:
+                with db.transacao() as sub:
+                    sub.execute(especificacao["insert"], linha)
+                inseridos += 1
+            except sqlite3.IntegrityError as e:
+                relatorio.rejeitar(numero, chave, [f"Erro no banco de dados: {e}"])
+        return inseridos
+
+def importar(tipo, caminho, formato=None, tamanho_lote=TAMANHO_LOTE_PADRAO, caminho_relatorio=None):
+    """Importa 'veiculos' ou 'clientes' de um arquivo CSV/JSONL.
+
+    Retorna (True, resumo) com as contagens 'lidos', 'inseridos' e
+    'rejeitados', ou (False, [mensagem]) se o arquivo não puder ser lido.
+    """
+    if tipo not in ESPECIFICACOES:
+        return (False, [f"Tipo de importação inválido: '{tipo}'. Use 'veiculos' ou 'clientes'."])
+    especificacao = ESPECIFICACOES[tipo]
+    tamanho_lote = max(1, int(tamanho_lote))
+    resumo = {"lidos": 0, "inseridos": 0, "rejeitados": 0}
+
+    try:
+        registros = ler_registros(caminho, formato)
+        with _abrir_relatorio(caminho_relatorio) as relatorio:
+            lote = []
+            vistos = [set() for _ in especificacao["unicos"]]
+            for numero, registro in registros:
+                resumo["lidos"] += 1
+                if registro is None:
+                    relatorio.rejeitar(numero, "", ["Linha não contém um objeto JSON válido."])
+                    continue
+                chave, linha, erros = especificacao["preparar"](registro)
+                if not erros:
+                    # Duplicidades dentro do próprio lote
+                    for (coluna, posicao, mensagem), valores in zip(especificacao["unicos"], vistos):
+                        if linha[posicao] in valores:
+                            erros = [mensagem.format(linha[posicao])]
+                            break
+                if erros:
+                    relatorio.rejeitar(numero, chave, erros)
+                    continue
+                for (coluna, posicao, _), valores in zip(especificacao["unicos"], vistos):
+                    valores.add(linha[posicao])
+                lote.append((numero, chave, linha))
+
+                if len(lote) >= tamanho_lote:
+                    resumo["inseridos"] += _gravar_lote(tipo, especificacao, lote, relatorio)
+                    lote = []
+                    vistos = [set() for _ in especificacao["unicos"]]
+            if lote:
+                resumo["inseridos"] += _gravar_lote(tipo, especificacao, lote, relatorio)
+            resumo["rejeitados"] = relatorio.rejeitados
+    except (OSError, ValueError, csv.Error) as e:
+        return (False, [f"Erro ao ler o arquivo: {e}"])
+    return (True, resumo)
+
+def importar_veiculos(caminho, formato=None, tamanho_lote=TAMANHO_LOTE_PADRAO, caminho_relatorio=None):
+    """Importa veículos de um arquivo CSV/JSONL (ver importar)."""
+    return importar("veiculos", caminho, formato, tamanho_lote, caminho_relatorio)
+
+def importar_clientes(caminho, formato=None, tamanho_lote=TAMANHO_LOTE_PADRAO, caminho_relatorio=None):
+    """Importa clientes de um arquivo CSV/JSONL (ver importar)."""
+    return importar("clientes", caminho, formato, tamanho_lote, caminho_relatorio)
+
+# =============================================================================
+# LINHA DE COMANDO
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa veículos ou clientes em lote a partir de CSV/JSONL.")
+    parser.add_argument("tipo", choices=sorted(ESPECIFICACOES), help="o que importar")
+    parser.add_argument("arquivo", help="arquivo .csv (com cabeçalho) ou .jsonl")
+    parser.add_argument("--formato", choices=sorted(set(FORMATOS.values())), help="força o formato do arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="registros por transação")
+    parser.add_argument("--relatorio", help="CSV de saída com os registros rejeitados")
+    args = parser.parse_args(argv)
+
+    db.criar_tabelas()
+    sucesso, resultado = importar(args.tipo, args.arquivo, args.formato, args.lote, args.relatorio)
+    if not sucesso:
+        print(f"❌ {resultado[0]}", file=sys.stderr)
+        return 1
+    print(f"✅ Lidos: {resultado['lidos']} | Inseridos: {resultado['inseridos']} | Rejeitados: {resultado['rejeitados']}")
+    if resultado["rejeitados"] and args.relatorio:
+        print(f"📋 Rejeições gravadas em {args.relatorio}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
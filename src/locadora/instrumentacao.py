@@ -0,0 +1,227 @@
+"""
+Módulo de instrumentação do Sistema de Locadora
+
+Mede as funções públicas do módulo database: quantidade de chamadas, erros,
+distribuição das latências, linhas devolvidas e os comandos SQL executados
+em cada operação (capturados com o trace callback das conexões do pool).
+Chamadas acima de DB_LIMITE_LENTO_MS são gravadas no log de consultas lentas.
+
+A instrumentação fica ativa quando DB_INSTRUMENTACAO ou DEBUG estão ligados
+nas configurações, e pode ser ligada ou desligada em execução. Desligada, o
+custo por chamada é um único teste de uma variável global, e nenhum trace
+callback fica instalado nas conexões.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+
+from .utils import obter_configuracao
+
+# Limites superiores (em ms) das faixas do histograma de latência; a última
+# faixa acumula tudo acima do maior limite
+LIMITES_HISTOGRAMA_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+# Quantidade máxima de comandos SQL gravados por entrada do log de lentas
+MAXIMO_SQL_NO_LOG = 20
+
+_ativa = bool(obter_configuracao('DB_INSTRUMENTACAO', False) or obter_configuracao('DEBUG', False))
+_limite_lento = obter_configuracao('DB_LIMITE_LENTO_MS', 100) / 1000
+_local = threading.local()
+_trava = threading.Lock()
+_estatisticas = {}
+_log_lentas = None
+
+# Literais de texto e números, trocados por '?' ao agrupar comandos iguais
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r"\s+")
+
+# =============================================================================
+# ESTADO
+# =============================================================================
+
+def ativa():
+    """Indica se as chamadas estão sendo medidas."""
+    return _ativa
+
+def definir_ativa(valor):
+    global _ativa
+    _ativa = bool(valor)
+
+def zerar():
+    """Descarta as estatísticas acumuladas."""
+    with _trava:
+        _estatisticas.clear()
+
+# =============================================================================
+# COLETA
+# =============================================================================
+
+class EstatisticasOperacao:
+    """Contadores acumulados de uma função instrumentada."""
+
+    __slots__ = ("chamadas", "erros", "total", "maximo", "linhas", "comandos", "histograma", "sql")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.erros = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.linhas = 0
+        self.comandos = 0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+        self.sql = Counter()
+
+def normalizar_sql(comando):
+    """Troca literais por '?' e compacta espaços, agrupando comandos de mesma forma."""
+    return _ESPACOS.sub(" ", _LITERAIS.sub("?", comando)).strip()
+
+def contar_linhas(resultado):
+    """Estima as linhas devolvidas pelos formatos de retorno do módulo database."""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, tuple) and resultado:
+        # Página: (itens, próximo cursor)
+        if isinstance(resultado[0], list):
+            return len(resultado[0])
+        # Consulta com status: (sucesso, [registros])
+        if len(resultado) == 2 and isinstance(resultado[1], list) and resultado[1] and isinstance(resultado[1][0], dict):
+            return len(resultado[1])
+    return 0
+
+def rastrear_sql(comando):
+    """Trace callback das conexões: anota o comando na operação em andamento na thread."""
+    pilha = getattr(_local, "pilha", None)
+    if pilha:
+        pilha[-1].append(comando)
+
+def _registrar(nome, duracao, linhas, comandos, erro, args, kwargs):
+    faixa = len(LIMITES_HISTOGRAMA_MS)
+    for i, limite in enumerate(LIMITES_HISTOGRAMA_MS):
+        if duracao * 1000 <= limite:
+            faixa = i
+            break
+    with _trava:
+        estatisticas = _estatisticas.get(nome)
+        if estatisticas is None:
+            estatisticas = _estatisticas[nome] = EstatisticasOperacao()
+        estatisticas.chamadas += 1
+        estatisticas.erros += erro
+        estatisticas.total += duracao
+        estatisticas.maximo = max(estatisticas.maximo, duracao)
+        estatisticas.linhas += linhas
+        estatisticas.comandos += len(comandos)
+        estatisticas.histograma[faixa] += 1
+        estatisticas.sql.update(normalizar_sql(comando) for comando in comandos)
+    if duracao >= _limite_lento:
+        _gravar_lenta(nome, duracao, linhas, comandos, erro, args, kwargs)
+
+def _medir(nome, funcao, args, kwargs):
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    comandos = []
+    pilha.append(comandos)
+    resultado, erro = None, True
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(*args, **kwargs)
+        erro = False
+        return resultado
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        # Os comandos de uma operação aninhada também contam para quem a chamou
+        if pilha:
+            pilha[-1].extend(comandos)
+        _registrar(nome, duracao, contar_linhas(resultado), comandos, erro, args, kwargs)
+
+def instrumentar(funcao, nome=None):
+    """Envolve 'funcao' para medi-la enquanto a instrumentação estiver ativa."""
+    nome = nome or funcao.__name__
+
+    @wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if not _ativa:
+            return funcao(*args, **kwargs)
+        return _medir(nome, funcao, args, kwargs)
+    return envoltorio
+
+def instrumentar_modulo(namespace, modulo, excluir=()):
+    """Instrumenta as funções públicas definidas em 'modulo' (em seu namespace)."""
+    for nome, valor in list(namespace.items()):
+        if (not nome.startswith("_") and nome not in excluir and callable(valor)
+                and not isinstance(valor, type) and getattr(valor, "__module__", None) == modulo):
+            namespace[nome] = instrumentar(valor, nome)
+
+# =============================================================================
+# LOG DE CONSULTAS LENTAS
+# =============================================================================
+
+def caminho_log_lentas(diretorio_padrao):
+    """Retorna o arquivo do log de consultas lentas (DB_LOG_LENTAS ou <dados>/consultas_lentas.log)."""
+    return obter_configuracao('DB_LOG_LENTAS') or os.path.join(diretorio_padrao, 'consultas_lentas.log')
+
+def configurar_log_lentas(caminho, limite_ms=None):
+    """Direciona o log de consultas lentas para 'caminho' e, se informado, muda o limite."""
+    global _log_lentas, _limite_lento
+    if limite_ms is not None:
+        _limite_lento = limite_ms / 1000
+    logger = logging.getLogger("locadora.consultas_lentas")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    handler = RotatingFileHandler(caminho, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    _log_lentas = logger
+
+def limite_lento_ms():
+    return _limite_lento * 1000
+
+def _gravar_lenta(nome, duracao, linhas, comandos, erro, args, kwargs):
+    if _log_lentas is None:
+        return
+    argumentos = ", ".join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items()])
+    linhas_log = [f"{duracao * 1000:.1f} ms {nome}({argumentos[:200]}) linhas={linhas} "
+                  f"comandos={len(comandos)}{' ERRO' if erro else ''}"]
+    linhas_log.extend(f"    {_ESPACOS.sub(' ', comando).strip()[:500]}" for comando in comandos[:MAXIMO_SQL_NO_LOG])
+    if len(comandos) > MAXIMO_SQL_NO_LOG:
+        linhas_log.append(f"    ... mais {len(comandos) - MAXIMO_SQL_NO_LOG} comando(s)")
+    _log_lentas.info("\n".join(linhas_log))
+
+# =============================================================================
+# CONSULTA DAS ESTATÍSTICAS
+# =============================================================================
+
+def rotulos_histograma():
+    """Rótulos das faixas do histograma, na ordem de 'histograma'."""
+    return [f"≤{limite}ms" for limite in LIMITES_HISTOGRAMA_MS] + [f">{LIMITES_HISTOGRAMA_MS[-1]}ms"]
+
+def estatisticas(maximo_sql=5):
+    """Retorna as estatísticas por função, da que consumiu mais tempo à que consumiu menos."""
+    with _trava:
+        itens = [
+            {
+                "funcao": nome,
+                "chamadas": e.chamadas,
+                "erros": e.erros,
+                "total_ms": round(e.total * 1000, 3),
+                "media_ms": round(e.total * 1000 / e.chamadas, 3),
+                "max_ms": round(e.maximo * 1000, 3),
+                "linhas": e.linhas,
+                "comandos_sql": e.comandos,
+                "histograma": list(e.histograma),
+                "sql": e.sql.most_common(maximo_sql),
+            }
+            for nome, e in _estatisticas.items()
+        ]
+    itens.sort(key=lambda item: item["total_ms"], reverse=True)
+    return itens
@@ -1,8 +1,24 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 # Importa as funções do módulo de banco de dados
-from . import database as db
+from . import database as db, instrumentacao
+from .backup import iniciar_backup_automatico
+from .executor import ExecutorBanco
+from .exportacao import exportar_historico
+
+# Quantidade de registros buscados por vez nas listas com carregamento incremental
+TAMANHO_PAGINA = 200
+
+# Espera após a última tecla antes de buscar sugestões, e quantas sugestões mostrar
+ATRASO_SUGESTOES_MS = 250
+LIMITE_SUGESTOES = 20
+
+# Separa o CPF do nome nas sugestões de clientes ("123.456.789-09 — Nome")
+SEPARADOR_SUGESTAO = " — "
+
+# Intervalo de atualização da janela de diagnóstico
+INTERVALO_DIAGNOSTICO_MS = 2000
 
 # =============================================================================
 # WIDGET PERSONALIZADO COM PLACEHOLDER
@@ -37,6 +53,494 @@ class EntryComTextoDeAjuda(ttk.Entry):
         if not self.get():
             self._colocar_texto_ajuda()
 
+    def obter_valor(self):
+        """Retorna o texto digitado, ou vazio enquanto o texto de ajuda é exibido."""
+        return "" if self['foreground'] == self.cor_texto_ajuda else self.get()
+
+# =============================================================================
+# SUGESTÕES COM BUSCA INCREMENTAL
+# =============================================================================
+
+class AutoCompletar:
+    """Preenche as sugestões de um Combobox com uma busca por prefixo no banco.
+
+    A busca só é disparada depois de 'atraso_ms' sem novas teclas e roda no
+    executor de banco, com uma chave própria: uma busca mais nova descarta o
+    resultado de uma anterior ainda em andamento. 'buscar(texto, limite)'
+    retorna os registros e 'formatar' os converte no texto de cada sugestão.
+    'extrair', se informado, ajusta o texto do campo quando uma sugestão é
+    escolhida.
+    """
+    TECLAS_IGNORADAS = {
+        "Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab",
+        "Home", "End", "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R",
+    }
+
+    def __init__(self, combobox, executor, chave, buscar, formatar=str, extrair=None,
+                 atraso_ms=ATRASO_SUGESTOES_MS, limite=LIMITE_SUGESTOES):
+        self.combobox = combobox
+        self.executor = executor
+        self.chave = chave
+        self.buscar = buscar
+        self.formatar = formatar
+        self.extrair = extrair
+        self.atraso_ms = atraso_ms
+        self.limite = limite
+        self._agendamento = None
+
+        combobox.bind("<KeyRelease>", self._ao_digitar, add="+")
+        if extrair:
+            combobox.bind("<<ComboboxSelected>>", self._ao_selecionar, add="+")
+
+    def _ao_digitar(self, event):
+        if event.keysym not in self.TECLAS_IGNORADAS:
+            self.agendar()
+
+    def _ao_selecionar(self, event):
+        self.combobox.set(self.extrair(self.combobox.get()))
+
+    def agendar(self):
+        """(Re)inicia a espera antes de buscar as sugestões do texto atual."""
+        if self._agendamento is not None:
+            self.combobox.after_cancel(self._agendamento)
+        self._agendamento = self.combobox.after(self.atraso_ms, self.atualizar)
+
+    def atualizar(self):
+        """Busca imediatamente as sugestões para o texto atual do campo."""
+        self._agendamento = None
+        self.executor.enviar(
+            self.chave, self.buscar, self.combobox.get(), self.limite,
+            ao_concluir=self._exibir
+        )
+
+    def _exibir(self, registros):
+        self.combobox.configure(values=[self.formatar(registro) for registro in registros])
+
+def formatar_sugestao_cliente(cliente):
+    """Texto de uma sugestão de cliente: CPF formatado e nome."""
+    return f"{formatar_cpf(cliente['cpf'])}{SEPARADOR_SUGESTAO}{formatar_texto_capitalizado(cliente['nome'])}"
+
+def extrair_cpf_sugestao(texto):
+    """Mantém apenas o CPF de uma sugestão de cliente escolhida."""
+    return texto.split(SEPARADOR_SUGESTAO)[0]
+
+# =============================================================================
+# LISTA VIRTUALIZADA
+# =============================================================================
+
+class ListaVirtual(ttk.Frame):
+    """Lista sobre um Treeview que materializa apenas a janela visível de linhas.
+
+    Os dados brutos ficam em uma lista Python; o Treeview mantém um número fixo
+    de itens (linhas visíveis mais um pequeno buffer) que são reaproveitados e
+    reformatados conforme a rolagem, de modo que o custo de desenho não depende
+    do tamanho dos dados. 'formatar_linha' converte um registro bruto na tupla
+    de valores exibida e só é chamada para as linhas que entram na janela.
+    'carregar_mais', se informado, é chamado quando a janela se aproxima do fim
+    dos dados já carregados.
+    """
+    def __init__(self, parent, colunas, formatar_linha, carregar_mais=None, buffer=5, largura_coluna=130, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.formatar_linha = formatar_linha
+        self.carregar_mais = carregar_mais
+        self.buffer = buffer
+        self.dados = []
+        self.inicio = 0
+        self.indice_selecionado = None
+        self._linhas_visiveis = 1
+        self._carga_agendada = False
+
+        self.tree = ttk.Treeview(self, columns=colunas, show="headings", selectmode="browse")
+        for col in colunas:
+            self.tree.heading(col, text=obter_cabecalho_exibicao(col))
+            self.tree.column(col, width=largura_coluna, anchor=tk.CENTER)
+        self.tree.pack(expand=True, fill="both", side="left")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._ao_mover_barra)
+        self.scrollbar.pack(side="right", fill="y")
+
+        altura = ttk.Style(self).lookup("Treeview", "rowheight")
+        self._altura_linha = int(altura) if str(altura).isdigit() else 20
+
+        self.tree.bind("<Configure>", self._ao_redimensionar)
+        self.tree.bind("<MouseWheel>", self._ao_rolar_mouse)
+        self.tree.bind("<Button-4>", lambda e: self.rolar(-3))
+        self.tree.bind("<Button-5>", lambda e: self.rolar(3))
+        self.tree.bind("<Prior>", lambda e: self.rolar(-self._linhas_visiveis) or "break")
+        self.tree.bind("<Next>", lambda e: self.rolar(self._linhas_visiveis) or "break")
+
+    def definir_dados(self, linhas):
+        """Substitui todos os dados da lista e volta ao topo."""
+        self.dados = list(linhas)
+        self.inicio = 0
+        self.indice_selecionado = None
+        self._renderizar()
+
+    def acrescentar(self, linhas):
+        """Acrescenta registros ao fim da lista sem mudar a posição atual."""
+        self.dados.extend(linhas)
+        self._renderizar()
+
+    def selecionar(self, indice):
+        """Seleciona o registro de índice 'indice' (None limpa a seleção)."""
+        self.indice_selecionado = indice
+        self._renderizar()
+
+    def indice_do_item(self, iid):
+        """Converte o id de um item do Treeview no índice do registro exibido nele."""
+        if not iid:
+            return None
+        indice = self.inicio + int(iid)
+        return indice if indice < len(self.dados) else None
+
+    def rolar(self, linhas):
+        """Desloca a janela visível em 'linhas' registros."""
+        self._mover_para(self.inicio + linhas)
+
+    def _mover_para(self, inicio):
+        maximo = max(0, len(self.dados) - self._linhas_visiveis)
+        inicio = min(max(0, int(inicio)), maximo)
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self._renderizar()
+
+    def _ao_mover_barra(self, acao, valor, unidade=None):
+        if acao == "moveto":
+            self._mover_para(float(valor) * len(self.dados))
+        elif acao == "scroll":
+            passo = self._linhas_visiveis if unidade == "pages" else 1
+            self.rolar(int(valor) * passo)
+
+    def _ao_rolar_mouse(self, event):
+        self.rolar(-3 if event.delta > 0 else 3)
+
+    def _ao_redimensionar(self, event):
+        # Desconta aproximadamente a altura do cabeçalho das colunas
+        linhas = max(1, (event.height - self._altura_linha - 4) // self._altura_linha)
+        if linhas != self._linhas_visiveis:
+            self._linhas_visiveis = linhas
+            self._renderizar()
+
+    def _renderizar(self):
+        """Atualiza os itens materializados para refletir a janela atual."""
+        total = len(self.dados)
+        maximo = max(0, total - self._linhas_visiveis)
+        self.inicio = min(self.inicio, maximo)
+        janela = self.dados[self.inicio:self.inicio + self._linhas_visiveis + self.buffer]
+
+        existentes = self.tree.get_children()
+        for posicao, registro in enumerate(janela):
+            iid = str(posicao)
+            valores = self.formatar_linha(registro)
+            if posicao < len(existentes):
+                self.tree.item(iid, values=valores)
+            else:
+                self.tree.insert("", "end", iid=iid, values=valores)
+        if len(existentes) > len(janela):
+            self.tree.delete(*existentes[len(janela):])
+
+        selecionado = self.indice_selecionado
+        if selecionado is not None and self.inicio <= selecionado < self.inicio + len(janela):
+            self.tree.selection_set(str(selecionado - self.inicio))
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+        if total <= self._linhas_visiveis:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.inicio / total, (self.inicio + self._linhas_visiveis) / total)
+
+        if self.carregar_mais and self.inicio + self._linhas_visiveis + self.buffer >= total and not self._carga_agendada:
+            self._carga_agendada = True
+            self.after_idle(self._executar_carga)
+
+    def _executar_carga(self):
+        self._carga_agendada = False
+        self.carregar_mais()
+
+# =============================================================================
+# MODELO DE LINHAS POR CHAVE
+# =============================================================================
+
+class ModeloLinhas:
+    """Mantém as linhas de um Treeview identificadas por uma chave do registro.
+
+    Cada linha usa a chave (placa, CPF ou id do aluguel) como iid do Treeview.
+    Ao receber uma nova lista, apenas as diferenças são aplicadas: linhas que
+    sumiram são removidas, linhas novas são inseridas na posição certa e só as
+    linhas cujos valores mudaram são reescritas. Seleção e posição de rolagem
+    são preservadas, e uma alteração em um único registro toca uma única linha.
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.valores = {}
+
+    def __len__(self):
+        return len(self.valores)
+
+    def sincronizar(self, linhas):
+        """Faz o Treeview refletir exatamente 'linhas', pares (iid, valores) em ordem."""
+        novas = {str(iid): tuple(valores) for iid, valores in linhas}
+        removidas = [iid for iid in self.valores if iid not in novas]
+        if removidas:
+            self.tree.delete(*removidas)
+
+        for posicao, (iid, valores) in enumerate(novas.items()):
+            anteriores = self.valores.get(iid)
+            if anteriores is None:
+                self.tree.insert("", posicao, iid=iid, values=valores)
+            elif anteriores != valores:
+                self.tree.item(iid, values=valores)
+
+        ordem = list(novas)
+        if list(self.tree.get_children()) != ordem:
+            self.tree.set_children("", *ordem)
+        self.valores = novas
+
+    def acrescentar(self, linhas):
+        """Acrescenta (ou atualiza) linhas ao fim da lista, sem remover as demais."""
+        for iid, valores in linhas:
+            iid, valores = str(iid), tuple(valores)
+            anteriores = self.valores.get(iid)
+            if anteriores is None:
+                self.tree.insert("", "end", iid=iid, values=valores)
+            elif anteriores != valores:
+                self.tree.item(iid, values=valores)
+            self.valores[iid] = valores
+
+# =============================================================================
+# JANELA DE RESULTADOS TABULARES
+# =============================================================================
+
+class JanelaTabela(tk.Toplevel):
+    """Janela auxiliar que exibe linhas de um relatório em um Treeview ordenável.
+
+    Um clique no cabeçalho ordena pela coluna (outro clique inverte a ordem),
+    comparando os valores de 'chaves' (os valores brutos de cada linha; por
+    padrão, os próprios valores exibidos). Com 'pais' (o índice da linha pai
+    de cada linha, ou None) as linhas formam uma árvore e cada linha é
+    ordenada apenas entre as irmãs; 'rotulos' é o texto da coluna da árvore.
+    """
+    def __init__(self, master, titulo, colunas, linhas, largura_coluna=120, chaves=None, pais=None, rotulos=None):
+        super().__init__(master)
+        self.title(titulo)
+        self.geometry("1000x450")
+        self.colunas = colunas
+        self.ordem = None
+
+        frame_lista = ttk.Frame(self)
+        frame_lista.pack(expand=True, fill="both", padx=10, pady=10)
+        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="tree headings" if pais else "headings")
+        self.tree.column("#0", width=largura_coluna, stretch=False)
+        for col in colunas:
+            self.tree.heading(col, text=obter_cabecalho_exibicao(col), command=lambda c=col: self.ordenar(c))
+            self.tree.column(col, width=largura_coluna, anchor=tk.CENTER)
+        self.tree.pack(expand=True, fill="both", side="left")
+        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+
+        self.chaves = {}
+        for i, valores in enumerate(linhas):
+            pai = pais[i] if pais and pais[i] is not None else ""
+            self.tree.insert(str(pai), "end", iid=str(i), values=valores, open=True,
+                             text=rotulos[i] if rotulos else "")
+            self.chaves[str(i)] = chaves[i] if chaves else valores
+
+    def ordenar(self, coluna):
+        """Ordena as linhas pela coluna; clicar de novo na mesma coluna inverte a ordem."""
+        decrescente = self.ordem == (coluna, False)
+        self.ordem = (coluna, decrescente)
+        for col in self.colunas:
+            seta = (" ▼" if decrescente else " ▲") if col == coluna else ""
+            self.tree.heading(col, text=obter_cabecalho_exibicao(col) + seta)
+        self._ordenar_filhos("", self.colunas.index(coluna), decrescente)
+
+    def _ordenar_filhos(self, pai, indice, decrescente):
+        # Valores ausentes ficam juntos, sem serem comparados com os demais
+        filhos = sorted(self.tree.get_children(pai), reverse=decrescente,
+                        key=lambda iid: self._chave_ordenacao(self.chaves[iid][indice]))
+        for posicao, iid in enumerate(filhos):
+            self.tree.move(iid, pai, posicao)
+            self._ordenar_filhos(iid, indice, decrescente)
+
+    @staticmethod
+    def _chave_ordenacao(valor):
+        return (valor is None, 0 if valor is None else valor)
+
+# =============================================================================
+# JANELA DE DIAGNÓSTICO
+# =============================================================================
+
+class JanelaDiagnostico(tk.Toplevel):
+    """Mostra as estatísticas das operações de banco, atualizadas periodicamente.
+
+    As estatísticas ficam em memória (módulo instrumentacao): a atualização
+    não consulta o banco e roda na própria thread da interface.
+    """
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Diagnóstico do Banco de Dados")
+        self.geometry("1100x500")
+        self._agendamento = None
+
+        frame_controles = ttk.Frame(self)
+        frame_controles.pack(fill="x", padx=10, pady=(10, 0))
+        self.var_ativa = tk.BooleanVar(value=instrumentacao.ativa())
+        ttk.Checkbutton(frame_controles, text="Medir operações", variable=self.var_ativa,
+                        command=self._alternar).pack(side="left")
+        ttk.Button(frame_controles, text="🔄\u2009Atualizar", style="Emoji.TButton", command=self.atualizar).pack(side="left", padx=5)
+        ttk.Button(frame_controles, text="🧹\u2009Zerar", style="Emoji.TButton", command=self._zerar).pack(side="left", padx=5)
+        self.label_resumo = ttk.Label(frame_controles, text="")
+        self.label_resumo.pack(side="left", padx=15)
+
+        faixas = instrumentacao.rotulos_histograma()
+        colunas = ("funcao", "chamadas", "erros", "total_ms", "media_ms", "max_ms", "linhas", "comandos_sql", *faixas)
+        frame_lista = ttk.Frame(self)
+        frame_lista.pack(expand=True, fill="both", padx=10, pady=10)
+        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="headings")
+        cabecalhos = {"funcao": "Operação", "total_ms": "Total (ms)", "media_ms": "Média (ms)", "max_ms": "Máx (ms)",
+                      "comandos_sql": "SQL"}
+        for col in colunas:
+            self.tree.heading(col, text=cabecalhos.get(col, col if col in faixas else obter_cabecalho_exibicao(col)))
+            self.tree.column(col, width=200 if col == "funcao" else 70, anchor=tk.W if col == "funcao" else tk.CENTER)
+        self.tree.pack(expand=True, fill="both", side="left")
+        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.modelo = ModeloLinhas(self.tree)
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._exibir_sql())
+
+        # Comandos SQL mais frequentes da operação selecionada
+        self.texto_sql = tk.Text(self, height=7, wrap="none", state="disabled")
+        self.texto_sql.pack(fill="x", padx=10, pady=(0, 10))
+
+        self._operacoes = {}
+        self.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.atualizar()
+
+    def atualizar(self):
+        if self._agendamento is not None:
+            self.after_cancel(self._agendamento)
+        diagnostico = db.diagnostico()
+        self._operacoes = {item["funcao"]: item for item in diagnostico["operacoes"]}
+        self.modelo.sincronizar(
+            (item["funcao"], (item["funcao"], item["chamadas"], item["erros"], f"{item['total_ms']:.1f}",
+                              f"{item['media_ms']:.3f}", f"{item['max_ms']:.1f}", item["linhas"],
+                              item["comandos_sql"], *item["histograma"]))
+            for item in diagnostico["operacoes"]
+        )
+        cache = diagnostico["cache"]
+        self.label_resumo.config(
+            text=f"Consultas lentas: acima de {diagnostico['limite_lento_ms']:g} ms  •  "
+                 f"Cache: {cache['acertos']} acerto(s), {cache['falhas']} falha(s), {cache['itens']} item(ns)")
+        self._exibir_sql()
+        self._agendamento = self.after(INTERVALO_DIAGNOSTICO_MS, self.atualizar)
+
+    def _exibir_sql(self):
+        selecao = self.tree.selection()
+        item = self._operacoes.get(selecao[0]) if selecao else None
+        linhas = [f"{quantidade:>8}×  {comando}" for comando, quantidade in item["sql"]] if item else []
+        self.texto_sql.config(state="normal")
+        self.texto_sql.delete("1.0", "end")
+        self.texto_sql.insert("1.0", "\n".join(linhas) or "Selecione uma operação para ver os comandos SQL mais frequentes.")
+        self.texto_sql.config(state="disabled")
+
+    def _alternar(self):
+        db.ativar_instrumentacao(self.var_ativa.get())
+        self.atualizar()
+
+    def _zerar(self):
+        instrumentacao.zerar()
+        self.atualizar()
+
+    def fechar(self):
+        if self._agendamento is not None:
+            self.after_cancel(self._agendamento)
+            self._agendamento = None
+        self.destroy()
+
+# =============================================================================
+# JANELA DE ALUGUEL EM LOTE
+# =============================================================================
+
+class JanelaAluguelLote(tk.Toplevel):
+    """Lista os veículos disponíveis para alugar vários de uma vez ao mesmo cliente.
+
+    Os veículos são carregados por páginas, à medida que a lista é rolada, e
+    escolhidos com Ctrl/Shift + clique; 'ao_confirmar(placas)' recebe as
+    placas marcadas e a janela se fecha.
+    """
+    def __init__(self, master, executor, cpf, ao_confirmar):
+        super().__init__(master)
+        self.title("Aluguel em Lote")
+        self.geometry("800x450")
+        self.executor = executor
+        self.ao_confirmar = ao_confirmar
+        self.cursor_veiculos = None
+
+        ttk.Label(self, text=f"Cliente: {formatar_cpf(cpf)}  •  Selecione os veículos (Ctrl/Shift + clique)").pack(
+            fill="x", padx=10, pady=(10, 0))
+
+        colunas = ("placa", "marca", "modelo", "ano", "cor", "valor_diaria")
+        frame_lista = ttk.Frame(self)
+        frame_lista.pack(expand=True, fill="both", padx=10, pady=10)
+        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="headings", selectmode="extended")
+        for col in colunas:
+            self.tree.heading(col, text=obter_cabecalho_exibicao(col))
+            self.tree.column(col, width=120, anchor=tk.CENTER)
+        self.tree.pack(expand=True, fill="both", side="left")
+        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical")
+        configurar_rolagem_incremental(self.tree, scrollbar, self.carregar_mais_veiculos)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._atualizar_resumo())
+
+        frame_botoes = ttk.Frame(self)
+        frame_botoes.pack(fill="x", padx=10, pady=(0, 10))
+        self.label_resumo = ttk.Label(frame_botoes, text="")
+        self.label_resumo.pack(side="left")
+        ttk.Button(frame_botoes, text="Cancelar", command=self.destroy).pack(side="right", padx=5)
+        ttk.Button(frame_botoes, text="➕\u2009Alugar Selecionados", style="Emoji.TButton",
+                   command=self.confirmar).pack(side="right", padx=5)
+        self._atualizar_resumo()
+        self._carregar_pagina()
+
+    def _carregar_pagina(self, cursor=None):
+        self.executor.enviar(
+            "veiculos_lote", db.listar_veiculos_paginado, TAMANHO_PAGINA, cursor, 'Disponível',
+            ao_concluir=self._exibir_pagina_veiculos, ao_falhar=self._falha_ao_carregar
+        )
+
+    def carregar_mais_veiculos(self):
+        """Acrescenta a próxima página de veículos disponíveis à lista, se houver."""
+        if self.cursor_veiculos and not self.executor.pendente("veiculos_lote"):
+            self._carregar_pagina(self.cursor_veiculos)
+
+    def _falha_ao_carregar(self, erro):
+        if self.winfo_exists():
+            messagebox.showerror("Erro de Banco de Dados", f"Não foi possível buscar os veículos:\n{erro}", parent=self)
+
+    def _exibir_pagina_veiculos(self, pagina):
+        if not self.winfo_exists():
+            return
+        veiculos, self.cursor_veiculos = pagina
+        for v in veiculos:
+            self.tree.insert("", "end", iid=v['placa'], values=(
+                v['placa'].upper(), formatar_texto_capitalizado(v['marca']), formatar_texto_capitalizado(v['modelo']),
+                v['ano'], formatar_texto_capitalizado(v['cor']), formatar_moeda(v['valor_diaria'])))
+        self._atualizar_resumo()
+
+    def _atualizar_resumo(self):
+        carregados = f"{len(self.tree.get_children())}{'+' if self.cursor_veiculos else ''}"
+        self.label_resumo.config(text=f"{len(self.tree.selection())} de {carregados} veículo(s) selecionado(s)")
+
+    def confirmar(self):
+        placas = list(self.tree.selection())
+        if not placas:
+            messagebox.showwarning("Ação Inválida", "Selecione ao menos um veículo.", parent=self)
+            return
+        self.destroy()
+        self.ao_confirmar(placas)
+
 # =============================================================================
 # FUNÇÕES AUXILIARES DE FORMATAÇÃO E UI
 # =============================================================================
@@ -57,6 +561,23 @@ def criar_cabecalho_secao(parent, text):
     ).grid(row=0, column=1, sticky="ew", padx=10)
     ttk.Separator(frame_cabecalho, orient="horizontal").grid(row=0, column=2, sticky="ew", padx=10)
 
+def configurar_rolagem_incremental(tree, scrollbar, carregar_mais):
+    """Liga a barra de rolagem ao Treeview e chama 'carregar_mais' ao atingir o fim da lista."""
+    agendado = [False]
+
+    def executar_carga():
+        agendado[0] = False
+        carregar_mais()
+
+    def ao_rolar(primeiro, ultimo):
+        scrollbar.set(primeiro, ultimo)
+        if float(ultimo) >= 1.0 and not agendado[0]:
+            agendado[0] = True
+            tree.after_idle(executar_carga)
+
+    scrollbar.configure(command=tree.yview)
+    tree.configure(yscrollcommand=ao_rolar)
+
 def formatar_cpf(cpf):
     """Formata uma string de CPF para o formato 123.456.789-01."""
     cpf_numerico = ''.join(filter(str.isdigit, str(cpf)))
@@ -86,14 +607,24 @@ def formatar_texto_capitalizado(texto):
         return texto.title()
     return texto
 
+def resumir_lote(resultados):
+    """Resume o resultado de uma operação em lote: (aceitos, texto com as recusas)."""
+    aceitos = sum(1 for item in resultados if item['sucesso'])
+    recusas = [f"• {item['placa']}: {item['mensagem']}" for item in resultados if not item['sucesso']]
+    return aceitos, "\n".join(recusas)
+
 def obter_cabecalho_exibicao(nome_coluna):
     """Retorna um cabeçalho mais amigável para a coluna."""
     cabecalhos = {
         "cpf": "CPF", "valor_diaria": "Valor da Diária", "email": "E-mail",
         "id": "ID do Aluguel", "placa_carro": "Placa do Carro", "cpf_cliente": "CPF do Cliente",
         "data_retirada": "Data de Retirada", "data_devolucao": "Data de Devolução",
+        "devolucao_prevista": "Devolução Prevista",
         "nome_cliente": "Nome do Cliente", "valor_total": "Valor Total", "carro": "Carro",
-        "cliente": "Cliente"
+        "cliente": "Cliente", "alugueis": "Aluguéis", "dias_alugados": "Dias Alugados",
+        "utilizacao": "Utilização (%)", "dias_ociosos": "Dias Ociosos",
+        "maior_ociosidade": "Maior Ociosidade (dias)", "receita": "Receita",
+        "mes": "Mês", "faturamento": "Faturamento", "inicio": "Primeiro Dia", "fim": "Último Dia"
     }
     return cabecalhos.get(nome_coluna, nome_coluna.replace("_", " ").title())
 
@@ -110,8 +641,15 @@ class LocadoraApp(tk.Tk):
 
         db.criar_tabelas()
 
+        # Todas as operações de banco das abas rodam em segundo plano
+        self.executor = ExecutorBanco(self, ao_mudar_ocupado=self._atualizar_indicador_ocupado, ao_erro=self._mostrar_erro_banco)
+
+        # Backups periódicos em uma thread própria (AUTO_BACKUP/BACKUP_INTERVAL)
+        self.agendador_backup = iniciar_backup_automatico()
+
         self._configurar_estilos()
         self._criar_widgets_principais()
+        self.protocol("WM_DELETE_WINDOW", self.ao_fechar)
         
         self.focus_set()
         self.ao_mudar_aba(None) # Força a atualização da primeira aba ao iniciar
@@ -127,18 +665,29 @@ class LocadoraApp(tk.Tk):
         titulo_label = ttk.Label(self, text="🚗\u2009Sistema de Locadora de Veículos", font=("Arial", 18, "bold"), anchor="center")
         titulo_label.pack(pady=(10, 5), fill="x")
 
+        # Barra de status com o indicador de operações em andamento
+        frame_status = ttk.Frame(self)
+        frame_status.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+        self.label_status = ttk.Label(frame_status, text="")
+        self.label_status.pack(side="left")
+        self.barra_ocupado = ttk.Progressbar(frame_status, mode="indeterminate", length=120)
+        ttk.Button(frame_status, text="🩺\u2009Diagnóstico", command=self.abrir_diagnostico).pack(side="right")
+        self.janela_diagnostico = None
+
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(pady=5, padx=10, expand=True, fill="both")
 
         # Mantendo as classes de abas separadas, como no original
-        self.tab_veiculos = AbaVeiculos(self.notebook)
-        self.tab_clientes = AbaClientes(self.notebook)
-        self.tab_alugueis = AbaAlugueis(self.notebook)
-        self.tab_relatorios = AbaRelatorios(self.notebook)
+        self.tab_veiculos = AbaVeiculos(self.notebook, self.executor)
+        self.tab_clientes = AbaClientes(self.notebook, self.executor)
+        self.tab_alugueis = AbaAlugueis(self.notebook, self.executor)
+        self.tab_reservas = AbaReservas(self.notebook, self.executor)
+        self.tab_relatorios = AbaRelatorios(self.notebook, self.executor)
 
         self.notebook.add(self.tab_veiculos, text="🚗\u2009Veículos")
         self.notebook.add(self.tab_clientes, text="👥\u2009Clientes")
         self.notebook.add(self.tab_alugueis, text="🔑\u2009Aluguéis")
+        self.notebook.add(self.tab_reservas, text="📌\u2009Reservas")
         self.notebook.add(self.tab_relatorios, text="📊\u2009Relatórios")
         
         self.notebook.bind("<<NotebookTabChanged>>", self.ao_mudar_aba)
@@ -158,6 +707,9 @@ class LocadoraApp(tk.Tk):
             elif "Aluguéis" in nome_da_aba:
                 self.tab_alugueis.popular_alugueis_ativos()
                 self.tab_alugueis.atualizar_sugestoes()
+            elif "Reservas" in nome_da_aba:
+                self.tab_reservas.popular_reservas()
+                self.tab_reservas.atualizar_sugestoes()
             elif "Relatórios" in nome_da_aba:
                 self.tab_relatorios.ver_historico_geral()
                 self.tab_relatorios.atualizar_sugestoes_cpf()
@@ -165,16 +717,48 @@ class LocadoraApp(tk.Tk):
             # Ignora o erro que pode ocorrer se a aba for trocada muito rápido
             pass
 
+    def _atualizar_indicador_ocupado(self, ocupado):
+        """Mostra ou esconde o indicador de operações de banco em andamento."""
+        if ocupado:
+            self.label_status.config(text="⏳ Carregando...")
+            self.barra_ocupado.pack(side="left", padx=10)
+            self.barra_ocupado.start(10)
+        else:
+            self.barra_ocupado.stop()
+            self.barra_ocupado.pack_forget()
+            self.label_status.config(text="")
+
+    def abrir_diagnostico(self):
+        """Abre (ou traz para a frente) a janela de diagnóstico do banco."""
+        if self.janela_diagnostico is not None and self.janela_diagnostico.winfo_exists():
+            self.janela_diagnostico.lift()
+            return
+        self.janela_diagnostico = JanelaDiagnostico(self)
+
+    def _mostrar_erro_banco(self, erro):
+        messagebox.showerror("Erro de Banco de Dados", f"Não foi possível concluir a operação:\n{erro}")
+
+    def ao_fechar(self):
+        """Encerra o executor, os backups e as conexões antes de fechar a janela."""
+        self.executor.encerrar()
+        if self.agendador_backup:
+            self.agendador_backup.parar()
+        db.fechar_conexoes()
+        self.destroy()
+
 
 # =============================================================================
 # ABA DE VEÍCULOS
 # =============================================================================
 
 class AbaVeiculos(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, executor):
         super().__init__(parent)
+        self.executor = executor
         self.item_selecionado = None
+        self.cursor_veiculos = None
         self._criar_widgets()
+        self.modelo = ModeloLinhas(self.tree)
         self.popular_lista_veiculos()
 
     def _criar_widgets(self):
@@ -217,24 +801,44 @@ class AbaVeiculos(ttk.Frame):
             self.tree.column(col, width=100, anchor=tk.CENTER)
             
         self.tree.pack(expand=True, fill="both", side="left")
-        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical")
+        configurar_rolagem_incremental(self.tree, scrollbar, self.carregar_mais_veiculos)
         scrollbar.pack(side="right", fill="y")
         
         self.tree.bind("<ButtonRelease-1>", self.ao_clicar_no_item)
 
     def popular_lista_veiculos(self):
-        self.item_selecionado = None
-        for linha in self.tree.get_children():
-            self.tree.delete(linha)
-        for veiculo in db.listar_veiculos():
-            valores_para_exibir = (
+        """Recarrega, desde o início, tantos veículos quantos já estavam carregados."""
+        self.executor.enviar(
+            "veiculos", db.listar_veiculos_paginado, max(TAMANHO_PAGINA, len(self.modelo)),
+            ao_concluir=lambda pagina: self._exibir_pagina_veiculos(pagina, substituir=True)
+        )
+
+    def carregar_mais_veiculos(self):
+        """Acrescenta a próxima página de veículos à lista, se houver."""
+        if self.cursor_veiculos and not self.executor.pendente("veiculos"):
+            self.executor.enviar(
+                "veiculos", db.listar_veiculos_paginado, TAMANHO_PAGINA, self.cursor_veiculos,
+                ao_concluir=self._exibir_pagina_veiculos
+            )
+
+    def _exibir_pagina_veiculos(self, pagina, substituir=False):
+        veiculos, self.cursor_veiculos = pagina
+        linhas = [
+            (veiculo['placa'], (
                 veiculo['placa'].upper(), formatar_texto_capitalizado(veiculo['marca']),
                 formatar_texto_capitalizado(veiculo['modelo']), veiculo['ano'],
                 formatar_texto_capitalizado(veiculo['cor']), formatar_moeda(veiculo['valor_diaria']),
                 veiculo['status']
-            )
-            self.tree.insert("", "end", values=valores_para_exibir)
+            ))
+            for veiculo in veiculos
+        ]
+        if substituir:
+            self.modelo.sincronizar(linhas)
+            if self.item_selecionado and not self.tree.exists(self.item_selecionado):
+                self.limpar_campos()
+        else:
+            self.modelo.acrescentar(linhas)
 
     def ao_clicar_no_item(self, event):
         id_item_clicado = self.tree.identify_row(event.y)
@@ -271,16 +875,22 @@ class AbaVeiculos(ttk.Frame):
 
     def adicionar_veiculo(self):
         dados = {chave: entrada.get() for chave, entrada in self.entradas.items()}
-        sucesso, mensagens = db.adicionar_veiculo(
+        self.executor.enviar(
+            None, db.adicionar_veiculo,
             dados["placa"], dados["marca"], dados["modelo"], dados["ano"], 
-            dados["cor"], dados["valor_da_diária"]
+            dados["cor"], dados["valor_da_diária"],
+            ao_concluir=lambda resultado: self._apos_salvar(resultado, "Erro de Validação")
         )
+
+    def _apos_salvar(self, resultado, titulo_erro="Erro"):
+        """Exibe o resultado de uma escrita e recarrega a lista em caso de sucesso."""
+        sucesso, mensagens = resultado
         if sucesso:
             messagebox.showinfo("Sucesso", mensagens[0])
             self.limpar_campos()
             self.popular_lista_veiculos()
         else:
-            messagebox.showerror("Erro de Validação", "\n".join(mensagens))
+            messagebox.showerror(titulo_erro, "\n".join(mensagens))
 
     def atualizar_veiculo(self):
         entrada_placa = self.entradas["placa"]
@@ -292,16 +902,12 @@ class AbaVeiculos(ttk.Frame):
         dados = {chave: entrada.get() for chave, entrada in self.entradas.items()}
         entrada_placa.config(state="disabled")
 
-        sucesso, mensagens = db.atualizar_veiculo(
+        self.executor.enviar(
+            None, db.atualizar_veiculo,
             dados["placa"], dados["marca"], dados["modelo"], dados["ano"], 
-            dados["cor"], dados["valor_da_diária"]
+            dados["cor"], dados["valor_da_diária"],
+            ao_concluir=self._apos_salvar
         )
-        if sucesso:
-            messagebox.showinfo("Sucesso", mensagens[0])
-            self.limpar_campos()
-            self.popular_lista_veiculos()
-        else:
-            messagebox.showerror("Erro", "\n".join(mensagens))
 
     def remover_veiculo(self):
         entrada_placa = self.entradas["placa"]
@@ -314,23 +920,19 @@ class AbaVeiculos(ttk.Frame):
         entrada_placa.config(state="disabled")
 
         if messagebox.askyesno("Confirmar Remoção", f"Remover veículo de placa {placa}?"):
-            sucesso, mensagens = db.remover_veiculo(placa)
-            if sucesso:
-                messagebox.showinfo("Sucesso", mensagens[0])
-                self.limpar_campos()
-                self.popular_lista_veiculos()
-            else:
-                messagebox.showerror("Erro", "\n".join(mensagens))
+            self.executor.enviar(None, db.remover_veiculo, placa, ao_concluir=self._apos_salvar)
 
 # =============================================================================
 # ABA DE CLIENTES
 # =============================================================================
 
 class AbaClientes(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, executor):
         super().__init__(parent)
+        self.executor = executor
         self.item_selecionado = None
         self._criar_widgets()
+        self.modelo = ModeloLinhas(self.tree)
         self.popular_lista_clientes()
 
     def _criar_widgets(self):
@@ -361,6 +963,15 @@ class AbaClientes(ttk.Frame):
         ttk.Button(frame_botoes, text="🧹\u2009Limpar Campos", style="Emoji.TButton", command=self.limpar_campos).pack(side="left", padx=5)
 
         criar_cabecalho_secao(self, "Lista de Clientes")
+        frame_busca = ttk.Frame(self)
+        frame_busca.pack(pady=(0, 5))
+        ttk.Label(frame_busca, text="🔍 Buscar:").pack(side="left", padx=5)
+        self.entrada_busca = EntryComTextoDeAjuda(frame_busca, texto_ajuda="Nome, e-mail ou telefone", width=40)
+        self.entrada_busca.pack(side="left", padx=5)
+        self.entrada_busca.bind("<KeyRelease>", self._agendar_busca)
+        ttk.Button(frame_busca, text="🧹 Limpar Busca", style="Emoji.TButton", command=self.limpar_busca).pack(side="left", padx=5)
+        self._busca_agendada = None
+
         frame_lista = ttk.Frame(self)
         frame_lista.pack(expand=True, fill="both", padx=10, pady=(0, 10))
         
@@ -380,16 +991,41 @@ class AbaClientes(ttk.Frame):
         self.tree.bind("<ButtonRelease-1>", self.ao_clicar_no_item)
         
     def popular_lista_clientes(self):
-        self.item_selecionado = None
-        for linha in self.tree.get_children(): self.tree.delete(linha)
-        for cliente in db.listar_clientes():
-            valores = (
+        """Lista todos os clientes ou, com texto na busca, os resultados mais relevantes."""
+        termo = self.entrada_busca.obter_valor().strip()
+        if termo:
+            self.executor.enviar("clientes", db.buscar_clientes, termo, ao_concluir=self._exibir_clientes)
+        else:
+            self.executor.enviar("clientes", db.listar_clientes, ao_concluir=self._exibir_clientes)
+
+    def _agendar_busca(self, event=None):
+        # Espera o usuário parar de digitar antes de consultar o banco
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.after(ATRASO_SUGESTOES_MS, self._executar_busca)
+
+    def _executar_busca(self):
+        self._busca_agendada = None
+        self.popular_lista_clientes()
+
+    def limpar_busca(self):
+        self.entrada_busca._ao_receber_foco()
+        self.entrada_busca.delete(0, "end")
+        self.entrada_busca._ao_perder_foco()
+        self.popular_lista_clientes()
+
+    def _exibir_clientes(self, clientes):
+        self.modelo.sincronizar(
+            (cliente['cpf'], (
                 formatar_cpf(cliente['cpf']),
                 formatar_texto_capitalizado(cliente['nome']),
                 formatar_telefone(cliente['telefone']),
                 cliente['email']
-            )
-            self.tree.insert("", "end", values=valores)
+            ))
+            for cliente in clientes
+        )
+        if self.item_selecionado and not self.tree.exists(self.item_selecionado):
+            self.limpar_campos()
             
     def ao_clicar_no_item(self, event):
         id_item_clicado = self.tree.identify_row(event.y)
@@ -422,7 +1058,14 @@ class AbaClientes(ttk.Frame):
 
     def adicionar_cliente(self):
         dados = {chave: entrada.get() for chave, entrada in self.entradas.items()}
-        sucesso, msgs = db.adicionar_cliente(dados["cpf"], dados["nome"], dados["telefone"], dados["e_mail"])
+        self.executor.enviar(
+            None, db.adicionar_cliente, dados["cpf"], dados["nome"], dados["telefone"], dados["e_mail"],
+            ao_concluir=self._apos_salvar
+        )
+
+    def _apos_salvar(self, resultado):
+        """Exibe o resultado de uma escrita e recarrega a lista em caso de sucesso."""
+        sucesso, msgs = resultado
         if sucesso:
             messagebox.showinfo("Sucesso", msgs[0])
             self.limpar_campos()
@@ -440,13 +1083,10 @@ class AbaClientes(ttk.Frame):
         dados = {chave: entrada.get() for chave, entrada in self.entradas.items()}
         entrada_cpf.config(state="disabled")
 
-        sucesso, msgs = db.atualizar_cliente(dados["cpf"], dados["nome"], dados["telefone"], dados["e_mail"])
-        if sucesso:
-            messagebox.showinfo("Sucesso", msgs[0])
-            self.limpar_campos()
-            self.popular_lista_clientes()
-        else:
-            messagebox.showerror("Erro", "\n".join(msgs))
+        self.executor.enviar(
+            None, db.atualizar_cliente, dados["cpf"], dados["nome"], dados["telefone"], dados["e_mail"],
+            ao_concluir=self._apos_salvar
+        )
 
     def remover_cliente(self):
         if not self.item_selecionado:
@@ -459,23 +1099,24 @@ class AbaClientes(ttk.Frame):
         entrada_cpf.config(state="disabled")
 
         if messagebox.askyesno("Confirmar Remoção", f"Remover o cliente de CPF {cpf}?"):
-            sucesso, msgs = db.remover_cliente(cpf)
-            if sucesso:
-                messagebox.showinfo("Sucesso", msgs[0])
-                self.limpar_campos()
-                self.popular_lista_clientes()
-            else:
-                messagebox.showerror("Erro", "\n".join(msgs))
+            self.executor.enviar(None, db.remover_cliente, cpf, ao_concluir=self._apos_salvar)
 
 # =============================================================================
 # ABA DE ALUGUÉIS
 # =============================================================================
 
 class AbaAlugueis(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, executor):
         super().__init__(parent)
+        self.executor = executor
         self.item_selecionado = None
         self._criar_widgets()
+        self.modelo = ModeloLinhas(self.tree)
+        self.sugestoes_placa = AutoCompletar(
+            self.entradas['placa_do_carro'], executor, "sugestoes_placa", db.sugerir_placas)
+        self.sugestoes_cpf = AutoCompletar(
+            self.entradas['cpf_do_cliente'], executor, "sugestoes_cpf_alugueis", db.sugerir_clientes,
+            formatar=formatar_sugestao_cliente, extrair=extrair_cpf_sugestao)
         self.popular_alugueis_ativos()
         self.atualizar_sugestoes()
 
@@ -495,19 +1136,26 @@ class AbaAlugueis(ttk.Frame):
         self.entradas['cpf_do_cliente'] = ttk.Combobox(frame_formulario, width=38)
         self.entradas['cpf_do_cliente'].grid(row=1, column=1, padx=(2, 10), pady=5, sticky="ew")
 
+        # Sem devolução prevista o veículo não aceita reservas enquanto estiver alugado
+        ttk.Label(frame_formulario, text="📅\u2009Devolução Prevista:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.entrada_devolucao_prevista = EntryComTextoDeAjuda(frame_formulario, texto_ajuda="Opcional. Ex: 2025-08-05", width=40)
+        self.entrada_devolucao_prevista.grid(row=2, column=1, padx=(2, 10), pady=5, sticky="ew")
+
         frame_botoes = ttk.Frame(self)
         frame_botoes.pack(pady=5)
         
         ttk.Button(frame_botoes, text="➕\u2009Realizar Aluguel", style="Emoji.TButton", command=self.realizar_aluguel).pack(side="left", padx=5)
         ttk.Button(frame_botoes, text="➡️\u2009Realizar Devolução", style="Emoji.TButton", command=self.realizar_devolucao).pack(side="left", padx=5)
+        ttk.Button(frame_botoes, text="📋\u2009Aluguel em Lote", style="Emoji.TButton", command=self.abrir_aluguel_em_lote).pack(side="left", padx=5)
         ttk.Button(frame_botoes, text="🧹\u2009Limpar Campos", style="Emoji.TButton", command=self.limpar_campos).pack(side="left", padx=5)
 
         criar_cabecalho_secao(self, "Aluguéis Ativos")
         frame_lista = ttk.Frame(self)
         frame_lista.pack(expand=True, fill="both", padx=10, pady=(0, 10))
         
-        colunas = ("cpf_cliente", "id", "placa_carro", "data_retirada")
-        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="headings")
+        colunas = ("cpf_cliente", "id", "placa_carro", "data_retirada", "devolucao_prevista")
+        # Ctrl/Shift + clique seleciona vários aluguéis para a devolução em lote
+        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="headings", selectmode="extended")
         
         for col in colunas:
             self.tree.heading(col, text=obter_cabecalho_exibicao(col))
@@ -522,30 +1170,38 @@ class AbaAlugueis(ttk.Frame):
 
     def popular_alugueis_ativos(self):
         """Busca aluguéis ativos no banco de dados e popula a lista."""
-        for linha in self.tree.get_children(): self.tree.delete(linha)
-        
-        try:
-            alugueis = db.listar_alugueis_ativos()
-            for aluguel in alugueis:
-                valores = (formatar_cpf(aluguel['cpf_cliente']), aluguel['id'], aluguel['placa_carro'].upper(), aluguel['data_retirada'])
-                self.tree.insert("", "end", values=valores)
-        except Exception as e:
-            messagebox.showerror("Erro de Banco de Dados", f"Não foi possível buscar os aluguéis:\n{e}")
+        self.executor.enviar(
+            "alugueis_ativos", db.listar_alugueis_ativos,
+            ao_concluir=self._exibir_alugueis_ativos,
+            ao_falhar=lambda e: messagebox.showerror("Erro de Banco de Dados", f"Não foi possível buscar os aluguéis:\n{e}")
+        )
+
+    def _exibir_alugueis_ativos(self, alugueis):
+        self.modelo.sincronizar(
+            (aluguel['id'], (formatar_cpf(aluguel['cpf_cliente']), aluguel['id'], aluguel['placa_carro'].upper(),
+                             aluguel['data_retirada'], aluguel['devolucao_prevista'] or "—"))
+            for aluguel in alugueis
+        )
+        if self.item_selecionado and not self.tree.exists(self.item_selecionado):
+            self.limpar_campos()
     
     def ao_clicar_no_item(self, event):
-        """Preenche o formulário ao clicar em um item da lista."""
+        """Preenche o formulário quando um único item da lista está selecionado."""
         id_item_clicado = self.tree.identify_row(event.y)
         if not id_item_clicado: return
 
-        if self.item_selecionado == id_item_clicado:
+        # O clique simples no item já selecionado desfaz a seleção; com Shift
+        # ou Ctrl (seleção múltipla) a seleção fica como o Treeview a deixou
+        selecao = self.tree.selection()
+        if self.item_selecionado == id_item_clicado and selecao == (id_item_clicado,) and not event.state & 0x0005:
             self.tree.selection_remove(id_item_clicado)
             self.limpar_campos()
-        else:
-            self.limpar_campos(limpar_selecao=False)
-            self.tree.selection_set(id_item_clicado)
-            self.item_selecionado = id_item_clicado
-            
-            valores = self.tree.item(id_item_clicado)['values']
+            return
+
+        self.limpar_campos(limpar_selecao=False)
+        if len(selecao) == 1:
+            self.item_selecionado = selecao[0]
+            valores = self.tree.item(selecao[0])['values']
             
             self.entradas['cpf_do_cliente'].set(valores[0])
             self.entradas['placa_do_carro'].set(valores[2])
@@ -560,6 +1216,9 @@ class AbaAlugueis(ttk.Frame):
         
         self.entradas['placa_do_carro'].set('')
         self.entradas['cpf_do_cliente'].set('')
+        self.entrada_devolucao_prevista._ao_receber_foco()
+        self.entrada_devolucao_prevista.delete(0, "end")
+        self.entrada_devolucao_prevista._ao_perder_foco()
 
         if limpar_selecao and self.tree.selection():
             self.tree.selection_remove(self.tree.selection())
@@ -567,14 +1226,18 @@ class AbaAlugueis(ttk.Frame):
 
     def realizar_aluguel(self):
         """Processa o registro de um novo aluguel."""
-        if self.item_selecionado:
+        if self.tree.selection():
             messagebox.showwarning("Ação Inválida", "Limpe a seleção atual antes de registrar um novo aluguel.")
             return
 
         placa = self.entradas['placa_do_carro'].get()
         cpf = self.entradas['cpf_do_cliente'].get()
+        data_prevista = self.entrada_devolucao_prevista.obter_valor().strip()
         
-        sucesso, msgs = db.realizar_aluguel(placa, cpf)
+        self.executor.enviar(None, db.realizar_aluguel, placa, cpf, data_prevista, ao_concluir=self._apos_aluguel)
+
+    def _apos_aluguel(self, resultado):
+        sucesso, msgs = resultado
         if sucesso:
             messagebox.showinfo("Sucesso", msgs[0])
             self.limpar_campos()
@@ -583,19 +1246,54 @@ class AbaAlugueis(ttk.Frame):
         else:
             messagebox.showerror("Erro no Aluguel", "\n".join(msgs))
             
+    def abrir_aluguel_em_lote(self):
+        """Abre a lista de veículos disponíveis para alugar vários ao cliente do formulário."""
+        if self.tree.selection():
+            messagebox.showwarning("Ação Inválida", "Limpe a seleção atual antes de registrar novos aluguéis.")
+            return
+        cpf = self.entradas['cpf_do_cliente'].get().strip()
+        if not cpf:
+            messagebox.showwarning("Ação Inválida", "Informe o CPF do cliente para o aluguel em lote.")
+            return
+
+        data_prevista = self.entrada_devolucao_prevista.obter_valor().strip()
+        JanelaAluguelLote(self, self.executor, cpf, lambda placas: self.executor.enviar(
+            None, db.realizar_alugueis_em_lote, [(placa, cpf) for placa in placas], data_prevista,
+            ao_concluir=self._apos_aluguel_em_lote))
+
+    def _apos_aluguel_em_lote(self, resposta):
+        sucesso, resultados = resposta
+        if not sucesso:
+            messagebox.showerror("Erro no Aluguel", "\n".join(resultados))
+            return
+        aceitos, recusas = resumir_lote(resultados)
+        if recusas:
+            messagebox.showwarning("Aluguel em Lote", f"{aceitos} aluguel(is) registrado(s).\n\nNão registrados:\n{recusas}")
+        else:
+            messagebox.showinfo("Aluguel em Lote", f"{aceitos} aluguel(is) registrado(s) com sucesso.")
+        self.limpar_campos()
+        self.popular_alugueis_ativos()
+        self.atualizar_sugestoes()
+
     def realizar_devolucao(self):
-        """Processa a devolução de um veículo selecionado na lista."""
+        """Processa a devolução dos veículos selecionados na lista (um ou vários)."""
         selecao = self.tree.selection()
         if not selecao:
             messagebox.showwarning("Ação Inválida", "Selecione um aluguel na lista para realizar a devolução.")
             return
+        if len(selecao) > 1:
+            self._realizar_devolucoes_em_lote([self.tree.item(iid)['values'][2] for iid in selecao])
+            return
         
         placa = self.tree.item(selecao[0])['values'][2]
 
         if not messagebox.askyesno("Confirmar Devolução", f"Registrar a devolução do veículo de placa {placa}?"):
              return
 
-        sucesso, msgs, _ = db.realizar_devolucao(placa)
+        self.executor.enviar(None, db.realizar_devolucao, placa, ao_concluir=self._apos_devolucao)
+
+    def _apos_devolucao(self, resultado):
+        sucesso, msgs, _ = resultado
         if sucesso:
             messagebox.showinfo("Devolução Realizada", msgs[0])
             self.limpar_campos()
@@ -604,22 +1302,187 @@ class AbaAlugueis(ttk.Frame):
         else:
             messagebox.showerror("Erro na Devolução", "\n".join(msgs))
 
+    def _realizar_devolucoes_em_lote(self, placas):
+        if not messagebox.askyesno("Confirmar Devolução",
+                                   f"Registrar a devolução de {len(placas)} veículos?\n\n{', '.join(placas)}"):
+            return
+        self.executor.enviar(None, db.realizar_devolucoes_em_lote, placas, ao_concluir=self._apos_devolucao_em_lote)
+
+    def _apos_devolucao_em_lote(self, resposta):
+        sucesso, resultados = resposta
+        if not sucesso:
+            messagebox.showerror("Erro na Devolução", "\n".join(resultados))
+            return
+        aceitos, recusas = resumir_lote(resultados)
+        total = sum(item['valor_total'] for item in resultados if item['sucesso'])
+        mensagem = f"{aceitos} devolução(ões) registrada(s). Total: {formatar_moeda(total)}."
+        if recusas:
+            messagebox.showwarning("Devolução em Lote", f"{mensagem}\n\nNão registradas:\n{recusas}")
+        else:
+            messagebox.showinfo("Devolução em Lote", mensagem)
+        self.limpar_campos()
+        self.popular_alugueis_ativos()
+        self.atualizar_sugestoes()
+
     def atualizar_sugestoes(self):
-        """Atualiza as listas de sugestões para os campos de Placa e CPF."""
-        carros_disponiveis = [carro['placa'].upper() for carro in db.listar_veiculos(status_filtro='Disponível')]
-        self.entradas['placa_do_carro']['values'] = carros_disponiveis
-        
-        cpfs_formatados = [formatar_cpf(c['cpf']) for c in db.listar_clientes()]
-        self.entradas['cpf_do_cliente']['values'] = cpfs_formatados
+        """Atualiza as sugestões de Placa e CPF para o texto atual dos campos."""
+        self.sugestoes_placa.atualizar()
+        self.sugestoes_cpf.atualizar()
+
+# =============================================================================
+# ABA DE RESERVAS
+# =============================================================================
+
+class AbaReservas(ttk.Frame):
+    def __init__(self, parent, executor):
+        super().__init__(parent)
+        self.executor = executor
+        self._criar_widgets()
+        self.modelo = ModeloLinhas(self.tree)
+        # Reservas podem ser feitas para qualquer veículo, inclusive os alugados agora
+        self.sugestoes_placa = AutoCompletar(
+            self.entradas['placa_do_carro'], executor, "sugestoes_placa_reservas",
+            lambda texto, limite: db.sugerir_placas(texto, limite, status_filtro=None))
+        self.sugestoes_cpf = AutoCompletar(
+            self.entradas['cpf_do_cliente'], executor, "sugestoes_cpf_reservas", db.sugerir_clientes,
+            formatar=formatar_sugestao_cliente, extrair=extrair_cpf_sugestao)
+
+    def _criar_widgets(self):
+        criar_cabecalho_secao(self, "Nova Reserva")
+        frame_formulario = ttk.Frame(self)
+        frame_formulario.pack(pady=(0, 10))
+
+        self.entradas = {}
+        ttk.Label(frame_formulario, text="Placa do Carro:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.entradas['placa_do_carro'] = ttk.Combobox(frame_formulario, width=38)
+        self.entradas['placa_do_carro'].grid(row=0, column=1, padx=(2, 10), pady=5, sticky="ew")
+
+        ttk.Label(frame_formulario, text="CPF do Cliente:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.entradas['cpf_do_cliente'] = ttk.Combobox(frame_formulario, width=38)
+        self.entradas['cpf_do_cliente'].grid(row=1, column=1, padx=(2, 10), pady=5, sticky="ew")
+
+        ttk.Label(frame_formulario, text="📅\u2009Primeiro Dia (AAAA-MM-DD):").grid(row=0, column=2, padx=5, pady=5, sticky="e")
+        self.entrada_data_inicio = EntryComTextoDeAjuda(frame_formulario, texto_ajuda="Ex: 2025-08-01")
+        self.entrada_data_inicio.grid(row=0, column=3, padx=5, pady=5)
+        ttk.Label(frame_formulario, text="📅\u2009Último Dia (AAAA-MM-DD):").grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        self.entrada_data_fim = EntryComTextoDeAjuda(frame_formulario, texto_ajuda="Ex: 2025-08-05")
+        self.entrada_data_fim.grid(row=1, column=3, padx=5, pady=5)
+
+        frame_botoes = ttk.Frame(self)
+        frame_botoes.pack(pady=5)
+        ttk.Button(frame_botoes, text="📌\u2009Reservar", style="Emoji.TButton", command=self.criar_reserva).pack(side="left", padx=5)
+        ttk.Button(frame_botoes, text="🔎\u2009Veículos Livres no Período", style="Emoji.TButton", command=self.ver_veiculos_disponiveis).pack(side="left", padx=5)
+        ttk.Button(frame_botoes, text="❌\u2009Cancelar Reserva", style="Emoji.TButton", command=self.cancelar_reserva).pack(side="left", padx=5)
+        ttk.Button(frame_botoes, text="🧹\u2009Limpar Campos", style="Emoji.TButton", command=self.limpar_campos).pack(side="left", padx=5)
+
+        criar_cabecalho_secao(self, "Reservas Ativas")
+        frame_lista = ttk.Frame(self)
+        frame_lista.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+
+        colunas = ("id", "placa_carro", "cpf_cliente", "nome_cliente", "inicio", "fim")
+        self.tree = ttk.Treeview(frame_lista, columns=colunas, show="headings")
+        for col in colunas:
+            self.tree.heading(col, text=obter_cabecalho_exibicao(col))
+            self.tree.column(col, anchor=tk.CENTER)
+        self.tree.pack(expand=True, fill="both", side="left")
+        scrollbar = ttk.Scrollbar(frame_lista, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+
+    def popular_reservas(self):
+        """Busca as reservas ativas no banco de dados e popula a lista."""
+        self.executor.enviar(
+            "reservas", db.listar_reservas,
+            ao_concluir=self._exibir_reservas,
+            ao_falhar=lambda e: messagebox.showerror("Erro de Banco de Dados", f"Não foi possível buscar as reservas:\n{e}")
+        )
+
+    def _exibir_reservas(self, reservas):
+        self.modelo.sincronizar(
+            (r['id'], (r['id'], r['placa_carro'].upper(), formatar_cpf(r['cpf_cliente']),
+                       formatar_texto_capitalizado(r['nome_cliente'] or "-"), r['inicio'], r['fim']))
+            for r in reservas
+        )
+
+    def limpar_campos(self):
+        """Limpa os campos do formulário e a seleção da lista."""
+        self.entradas['placa_do_carro'].set('')
+        self.entradas['cpf_do_cliente'].set('')
+        for entrada in (self.entrada_data_inicio, self.entrada_data_fim):
+            entrada._ao_receber_foco()
+            entrada.delete(0, "end")
+            entrada._ao_perder_foco()
+        if self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+    def criar_reserva(self):
+        """Registra a reserva do veículo para o cliente no período informado."""
+        self.executor.enviar(
+            None, db.criar_reserva, self.entradas['placa_do_carro'].get(), self.entradas['cpf_do_cliente'].get(),
+            self.entrada_data_inicio.obter_valor(), self.entrada_data_fim.obter_valor(),
+            ao_concluir=self._apos_alterar_reserva
+        )
+
+    def cancelar_reserva(self):
+        """Cancela a reserva selecionada na lista."""
+        selecao = self.tree.selection()
+        if not selecao:
+            messagebox.showwarning("Ação Inválida", "Selecione uma reserva na lista para cancelar.")
+            return
+        _, placa, _, nome, inicio, fim = self.tree.item(selecao[0])['values']
+        if not messagebox.askyesno("Confirmar Cancelamento", f"Cancelar a reserva do veículo {placa} para {nome}, de {inicio} a {fim}?"):
+            return
+        self.executor.enviar(None, db.cancelar_reserva, int(selecao[0]), ao_concluir=self._apos_alterar_reserva)
+
+    def _apos_alterar_reserva(self, resultado):
+        sucesso, msgs = resultado
+        if sucesso:
+            messagebox.showinfo("Sucesso", msgs[0])
+            self.limpar_campos()
+            self.popular_reservas()
+        else:
+            messagebox.showerror("Erro na Reserva", "\n".join(msgs))
+
+    def ver_veiculos_disponiveis(self):
+        """Lista, em uma janela, os veículos livres em todos os dias do período informado."""
+        data_inicio = self.entrada_data_inicio.obter_valor()
+        data_fim = self.entrada_data_fim.obter_valor()
+        self.executor.enviar(
+            "veiculos_disponiveis", db.listar_veiculos_disponiveis, data_inicio, data_fim,
+            ao_concluir=lambda resposta: self._exibir_veiculos_disponiveis(resposta, data_inicio, data_fim)
+        )
+
+    def _exibir_veiculos_disponiveis(self, resposta, data_inicio, data_fim):
+        sucesso, resultado = resposta
+        if not sucesso:
+            messagebox.showerror("Erro de Data", resultado[0])
+            return
+        colunas = ("placa", "marca", "modelo", "ano", "cor", "valor_diaria", "status")
+        linhas = [
+            (v['placa'].upper(), formatar_texto_capitalizado(v['marca']), formatar_texto_capitalizado(v['modelo']),
+             v['ano'], formatar_texto_capitalizado(v['cor']), formatar_moeda(v['valor_diaria']), v['status'])
+            for v in resultado
+        ]
+        chaves = [(v['placa'], v['marca'], v['modelo'], v['ano'], v['cor'], v['valor_diaria'], v['status'])
+                  for v in resultado]
+        JanelaTabela(self, f"Veículos Livres ({data_inicio} a {data_fim})", colunas, linhas, chaves=chaves)
+
+    def atualizar_sugestoes(self):
+        """Atualiza as sugestões de Placa e CPF para o texto atual dos campos."""
+        self.sugestoes_placa.atualizar()
+        self.sugestoes_cpf.atualizar()
 
 # =============================================================================
 # ABA DE RELATÓRIOS
 # =============================================================================
 
 class AbaRelatorios(ttk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, executor):
         super().__init__(parent)
+        self.executor = executor
         self.item_selecionado = None
+        self.filtro_cpf_hist = None
+        self.cursor_hist = None
         self._criar_widgets()
 
     def _criar_widgets(self):
@@ -629,21 +1492,23 @@ class AbaRelatorios(ttk.Frame):
         ttk.Label(frame_acoes, text="CPF do Cliente:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         self.entrada_cpf_hist = ttk.Combobox(frame_acoes, width=23)
         self.entrada_cpf_hist.grid(row=0, column=1, padx=5, pady=5)
+        self.sugestoes_cpf = AutoCompletar(
+            self.entrada_cpf_hist, self.executor, "sugestoes_cpf_relatorios", db.sugerir_clientes,
+            formatar=formatar_sugestao_cliente, extrair=extrair_cpf_sugestao)
         ttk.Button(frame_acoes, text="🔍\u2009Buscar por CPF", style="Emoji.TButton", command=self.buscar_historico_por_cpf).grid(row=0, column=2, padx=5, pady=5)
         ttk.Button(frame_acoes, text="📜\u2009Ver Histórico Geral", style="Emoji.TButton", command=self.ver_historico_geral).grid(row=0, column=3, padx=20, pady=5)
+        ttk.Button(frame_acoes, text="📤\u2009Exportar Histórico", style="Emoji.TButton", command=self.exportar_historico).grid(row=0, column=4, padx=5, pady=5)
         
         criar_cabecalho_secao(self, "Histórico de Aluguéis")
         frame_lista_hist = ttk.Frame(self)
         frame_lista_hist.pack(expand=True, fill="both", padx=10, pady=(0,5))
         colunas = ("cpf_cliente", "placa_carro", "data_retirada", "data_devolucao", "valor_total", "status")
-        self.tree_hist = ttk.Treeview(frame_lista_hist, columns=colunas, show="headings")
-        for col in colunas:
-            self.tree_hist.heading(col, text=obter_cabecalho_exibicao(col))
-            self.tree_hist.column(col, width=130, anchor=tk.CENTER)
-        self.tree_hist.pack(expand=True, fill="both", side="left")
-        scrollbar_hist = ttk.Scrollbar(frame_lista_hist, orient="vertical", command=self.tree_hist.yview)
-        self.tree_hist.configure(yscrollcommand=scrollbar_hist.set)
-        scrollbar_hist.pack(side="right", fill="y")
+        self.lista_hist = ListaVirtual(
+            frame_lista_hist, colunas, self._formatar_linha_historico,
+            carregar_mais=self.carregar_mais_historico
+        )
+        self.lista_hist.pack(expand=True, fill="both")
+        self.tree_hist = self.lista_hist.tree
         
         self.tree_hist.bind("<ButtonRelease-1>", self.ao_clicar_no_item)
         
@@ -663,64 +1528,196 @@ class AbaRelatorios(ttk.Frame):
         frame_botao_calcular = ttk.Frame(frame_faturamento)
         frame_botao_calcular.grid(row=0, column=2, rowspan=2, padx=10)
         ttk.Button(frame_botao_calcular, text="💲\u2009Calcular", style="Emoji.TButton", command=self.calcular_faturamento).pack()
+        ttk.Button(frame_botao_calcular, text="🚙\u2009Utilização da Frota", style="Emoji.TButton", command=self.ver_utilizacao_frota).pack(pady=(5, 0))
 
         self.label_faturamento = ttk.Label(frame_faturamento, text="Faturamento Total: R$ 0,00", font=("Arial", 12, "bold"))
         self.label_faturamento.grid(row=0, column=3, rowspan=2, padx=20)
 
+        # Detalhamento: as dimensões marcadas, na ordem de DIMENSOES_FATURAMENTO
+        ttk.Label(frame_faturamento, text="📊\u2009Detalhar por:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        frame_dimensoes = ttk.Frame(frame_faturamento)
+        frame_dimensoes.grid(row=2, column=1, columnspan=2, padx=5, pady=5, sticky="w")
+        self.vars_dimensoes = {}
+        for dimensao in db.DIMENSOES_FATURAMENTO:
+            self.vars_dimensoes[dimensao] = tk.BooleanVar(value=dimensao == "mes")
+            ttk.Checkbutton(frame_dimensoes, text=obter_cabecalho_exibicao(dimensao),
+                            variable=self.vars_dimensoes[dimensao]).pack(side="left", padx=(0, 8))
+        self.var_subtotais = tk.BooleanVar(value=True)
+        ttk.Checkbutton(frame_dimensoes, text="Subtotais", variable=self.var_subtotais).pack(side="left", padx=(8, 0))
+        ttk.Button(frame_faturamento, text="📊\u2009Detalhar Faturamento", style="Emoji.TButton",
+                   command=self.detalhar_faturamento).grid(row=2, column=3, padx=20, pady=5)
+
     def atualizar_sugestoes_cpf(self):
-        clientes = db.listar_clientes()
-        cpfs_formatados = [formatar_cpf(c['cpf']) for c in clientes]
-        self.entrada_cpf_hist['values'] = cpfs_formatados
+        self.sugestoes_cpf.atualizar()
 
     def ao_clicar_no_item(self, event):
-        id_item_clicado = self.tree_hist.identify_row(event.y)
-        if not id_item_clicado: return
+        indice_clicado = self.lista_hist.indice_do_item(self.tree_hist.identify_row(event.y))
+        if indice_clicado is None: return
         
-        if self.item_selecionado == id_item_clicado:
-            self.tree_hist.selection_remove(id_item_clicado)
+        if self.item_selecionado == indice_clicado:
             self.item_selecionado = None
         else:
-            self.tree_hist.selection_set(id_item_clicado)
-            self.item_selecionado = id_item_clicado
+            self.item_selecionado = indice_clicado
+        self.lista_hist.selecionar(self.item_selecionado)
             
-    def _popular_historico(self, historico_completo):
+    def _carregar_historico(self, filtro_cpf=None):
+        """Reinicia o histórico exibido a partir da primeira página."""
+        self.filtro_cpf_hist = filtro_cpf
+        self.executor.enviar(
+            "historico", db.buscar_historico_paginado, filtro_cpf, TAMANHO_PAGINA,
+            ao_concluir=lambda pagina: self._exibir_pagina_historico(pagina, limpar=True)
+        )
+
+    def carregar_mais_historico(self):
+        """Acrescenta a próxima página do histórico à lista, se houver."""
+        if not self.cursor_hist or self.executor.pendente("historico"):
+            return
+        self.executor.enviar(
+            "historico", db.buscar_historico_paginado, self.filtro_cpf_hist, TAMANHO_PAGINA, self.cursor_hist,
+            ao_concluir=lambda pagina: self._exibir_pagina_historico(pagina, limpar=False)
+        )
+
+    def _exibir_pagina_historico(self, pagina, limpar):
+        historico, self.cursor_hist = pagina
+        self._popular_historico(historico, limpar=limpar)
+
+    def _popular_historico(self, historico, limpar=True):
+        if not limpar:
+            self.lista_hist.acrescentar(historico)
+            return
+
         self.item_selecionado = None
-        for linha in self.tree_hist.get_children(): self.tree_hist.delete(linha)
-        
-        if not historico_completo:
+        self.lista_hist.definir_dados(historico)
+        if not historico:
             messagebox.showinfo("Histórico", "Nenhum registro encontrado.")
-            return
-            
-        for item in historico_completo:
-            data_devolucao_val = item.get('data_devolucao')
-            data_devolucao_display = data_devolucao_val if data_devolucao_val else "Pendente"
-            valor = formatar_moeda(item.get('valor_total')) if data_devolucao_val else "N/A"
-            valores_tupla = (
-                formatar_cpf(item.get('cpf_cliente', 'N/A')),
-                item.get('placa_carro', 'N/A').upper(),
-                item.get('data_retirada', 'N/A'),
-                data_devolucao_display, valor,
-                item.get('status', 'N/A')
-            )
-            self.tree_hist.insert("", "end", values=valores_tupla)
+
+    @staticmethod
+    def _formatar_linha_historico(item):
+        """Formata um registro do histórico; chamada apenas quando a linha fica visível."""
+        data_devolucao_val = item.get('data_devolucao')
+        data_devolucao_display = data_devolucao_val if data_devolucao_val else "Pendente"
+        valor = formatar_moeda(item.get('valor_total')) if data_devolucao_val else "N/A"
+        return (
+            formatar_cpf(item.get('cpf_cliente', 'N/A')),
+            item.get('placa_carro', 'N/A').upper(),
+            item.get('data_retirada', 'N/A'),
+            data_devolucao_display, valor,
+            item.get('status', 'N/A')
+        )
             
     def buscar_historico_por_cpf(self):
         cpf = self.entrada_cpf_hist.get()
         if not cpf:
             messagebox.showwarning("Aviso", "Por favor, insira um CPF.")
             return
-        historico = db.buscar_historico(filtro_cpf=cpf)
-        self._popular_historico(historico)
+        self._carregar_historico(filtro_cpf=cpf)
             
     def ver_historico_geral(self):
-        historico = db.buscar_historico()
-        self._popular_historico(historico)
+        self._carregar_historico()
+
+    def exportar_historico(self):
+        """Exporta o histórico, com os filtros de CPF e período preenchidos, para um arquivo."""
+        destino = filedialog.asksaveasfilename(
+            parent=self, title="Exportar Histórico", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("CSV compactado", "*.csv.gz"),
+                       ("JSON Lines", "*.jsonl"), ("JSON Lines compactado", "*.jsonl.gz")])
+        if not destino:
+            return
+        self.executor.enviar(
+            None, exportar_historico, destino,
+            filtro_cpf=self.entrada_cpf_hist.get() or None,
+            data_inicio=self.entrada_data_inicio.obter_valor() or None,
+            data_fim=self.entrada_data_fim.obter_valor() or None,
+            ao_concluir=self._apos_exportar
+        )
+
+    def _apos_exportar(self, resposta):
+        sucesso, mensagens = resposta
+        if sucesso:
+            messagebox.showinfo("Exportação", "\n".join(mensagens))
+        else:
+            messagebox.showerror("Erro na Exportação", "\n".join(mensagens))
 
     def calcular_faturamento(self):
         data_inicio = self.entrada_data_inicio.get()
         data_fim = self.entrada_data_fim.get()
-        sucesso, resultado = db.calcular_faturamento_periodo(data_inicio, data_fim)
+        self.executor.enviar(
+            "faturamento", db.calcular_faturamento_periodo, data_inicio, data_fim,
+            ao_concluir=self._exibir_faturamento
+        )
+
+    def _exibir_faturamento(self, resposta):
+        sucesso, resultado = resposta
         if sucesso:
             self.label_faturamento.config(text=f"Faturamento Total: {formatar_moeda(resultado)}")
         else:
-            messagebox.showerror("Erro de Data", resultado[0])
\ No newline at end of file
+            messagebox.showerror("Erro de Data", resultado[0])
+
+    def detalhar_faturamento(self):
+        """Detalha o faturamento do período pelas dimensões marcadas e exibe em uma janela."""
+        dimensoes = [d for d, var in self.vars_dimensoes.items() if var.get()]
+        if not dimensoes:
+            messagebox.showwarning("Aviso", "Marque ao menos uma dimensão para detalhar o faturamento.")
+            return
+        data_inicio = self.entrada_data_inicio.get()
+        data_fim = self.entrada_data_fim.get()
+        subtotais = self.var_subtotais.get()
+        self.executor.enviar(
+            "faturamento_detalhado", db.faturamento_detalhado, data_inicio, data_fim, dimensoes, subtotais,
+            ao_concluir=lambda resposta: self._exibir_faturamento_detalhado(resposta, dimensoes, subtotais,
+                                                                            data_inicio, data_fim)
+        )
+
+    def _exibir_faturamento_detalhado(self, resposta, dimensoes, subtotais, data_inicio, data_fim):
+        sucesso, resultado = resposta
+        if not sucesso:
+            messagebox.showerror("Erro", resultado[0])
+            return
+        formatos = {"marca": formatar_texto_capitalizado, "modelo": formatar_texto_capitalizado,
+                    "placa": str.upper, "cliente": formatar_cpf}
+        colunas = tuple(dimensoes) + (("nome_cliente",) if "cliente" in dimensoes else ()) + ("alugueis", "faturamento")
+        linhas, chaves, pais, rotulos = [], [], [], []
+        # Linha de subtotal mais recente de cada nível: o pai das linhas seguintes
+        ultimo_por_nivel = {}
+        for i, item in enumerate(resultado):
+            valores = [formatos.get(d, str)(item[d]) if item[d] is not None else "" for d in dimensoes]
+            if "cliente" in dimensoes:
+                valores.append(item.get("nome_cliente") or "")
+            linhas.append(tuple(valores) + (item["alugueis"], formatar_moeda(item["faturamento"])))
+            chaves.append(tuple(item.get(col) for col in colunas))
+            nivel = item["nivel"]
+            pais.append(ultimo_por_nivel.get(nivel - 1) if nivel > 0 else None)
+            ultimo_por_nivel[nivel] = i
+            rotulos.append("Total" if nivel == 0 else ("Subtotal" if nivel < len(dimensoes) else ""))
+        titulo = f"Faturamento por {', '.join(obter_cabecalho_exibicao(d) for d in dimensoes)} ({data_inicio} a {data_fim})"
+        JanelaTabela(self, titulo, colunas, linhas, chaves=chaves,
+                     pais=pais if subtotais else None, rotulos=rotulos)
+
+    def ver_utilizacao_frota(self):
+        """Calcula a utilização de cada veículo no período informado e exibe em uma janela."""
+        data_inicio = self.entrada_data_inicio.get()
+        data_fim = self.entrada_data_fim.get()
+        self.executor.enviar(
+            "utilizacao_frota", db.relatorio_utilizacao_frota, data_inicio, data_fim,
+            ao_concluir=lambda resposta: self._exibir_utilizacao_frota(resposta, data_inicio, data_fim)
+        )
+
+    def _exibir_utilizacao_frota(self, resposta, data_inicio, data_fim):
+        sucesso, resultado = resposta
+        if not sucesso:
+            messagebox.showerror("Erro de Data", resultado[0])
+            return
+        colunas = ("placa", "marca", "modelo", "alugueis", "dias_alugados", "utilizacao",
+                   "dias_ociosos", "maior_ociosidade", "receita")
+        linhas = [
+            (
+                item['placa'].upper(), formatar_texto_capitalizado(item['marca']),
+                formatar_texto_capitalizado(item['modelo']), item['alugueis'],
+                f"{item['dias_alugados']:.1f}", f"{item['utilizacao']:.1f}%",
+                f"{item['dias_ociosos']:.1f}", f"{item['maior_ociosidade']:.1f}",
+                formatar_moeda(item['receita'])
+            )
+            for item in resultado
+        ]
+        chaves = [tuple(item[col] for col in colunas) for item in resultado]
+        JanelaTabela(self, f"Utilização da Frota ({data_inicio} a {data_fim})", colunas, linhas, chaves=chaves)
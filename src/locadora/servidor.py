@@ -0,0 +1,377 @@
+"""
+Módulo do servidor HTTP do Sistema de Locadora
+
+Expõe as operações do módulo database como uma API JSON, para que balcões,
+quiosques e scripts internos compartilhem o mesmo banco ao mesmo tempo. Usa
+apenas a biblioteca padrão: cada conexão HTTP é atendida por uma thread, as
+conexões são mantidas abertas entre requisições (HTTP/1.1 keep-alive) e cada
+requisição usa uma conexão SQLite emprestada do pool do módulo database.
+
+Rotas:
+    GET    /saude
+    GET    /veiculos?status=&tamanho=&cursor=      POST   /veiculos
+    PUT    /veiculos/<placa>                       DELETE /veiculos/<placa>
+    GET    /clientes?busca=&tamanho=&cursor=       POST   /clientes
+    PUT    /clientes/<cpf>                         DELETE /clientes/<cpf>
+    GET    /alugueis/ativos                        POST   /alugueis {"placa", "cpf", "devolucao_prevista"}
+    POST   /devolucoes
+    POST   /alugueis/lote {"itens": [{"placa", "cpf"}], "devolucao_prevista"}
+    POST   /devolucoes/lote {"placas": [...]}
+    GET    /reservas?placa=&cpf=                   POST   /reservas
+    DELETE /reservas/<id>
+    GET    /disponibilidade?inicio=&fim=
+    GET    /historico?cpf=&tamanho=&cursor=
+    GET    /faturamento?inicio=&fim=&por=&subtotais=
+    GET    /utilizacao?inicio=&fim=
+    GET    /diagnostico                            POST   /diagnostico {"ativa": bool, "zerar": bool}
+
+Uso:
+    python -m locadora.servidor --porta 8080
+"""
+
+import argparse
+import json
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import __version__, database as db, instrumentacao
+from .backup import iniciar_backup_automatico
+from .utils import obter_configuracao
+
+# Tamanho máximo aceito para o corpo de uma requisição (em bytes)
+TAMANHO_MAXIMO_CORPO = 64 * 1024
+
+# Quantidade máxima de registros por página nas listagens
+TAMANHO_PAGINA_MAXIMO = 1000
+
+
+class ErroRequisicao(Exception):
+    """Erro causado pelos dados da requisição; vira uma resposta 4xx."""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+# =============================================================================
+# FUNÇÕES AUXILIARES
+# =============================================================================
+
+def _texto(valor):
+    return "" if valor is None else str(valor)
+
+def _campos(corpo, *nomes):
+    """Extrai campos do corpo JSON como texto, como chegariam de um formulário."""
+    return [_texto(corpo.get(nome)) for nome in nomes]
+
+def _parametro(consulta, nome, obrigatorio=False):
+    valor = consulta.get(nome, [None])[0]
+    if obrigatorio and not valor:
+        raise ErroRequisicao(400, f"Parâmetro '{nome}' é obrigatório.")
+    return valor
+
+def _tamanho_pagina(consulta):
+    valor = _parametro(consulta, "tamanho")
+    if valor is None:
+        return db.TAMANHO_PAGINA_PADRAO
+    try:
+        return max(1, min(int(valor), TAMANHO_PAGINA_MAXIMO))
+    except ValueError:
+        raise ErroRequisicao(400, "Parâmetro 'tamanho' deve ser um número inteiro.")
+
+def _resultado(resposta, status_sucesso=200):
+    """Converte o retorno (sucesso, mensagens[, valor]) do módulo database em (status, corpo)."""
+    sucesso, mensagens = resposta[0], resposta[1]
+    corpo = {"sucesso": sucesso, "mensagens": mensagens}
+    if len(resposta) > 2:
+        corpo["valor"] = resposta[2]
+    return (status_sucesso if sucesso else 400), corpo
+
+def _lista(corpo, nome):
+    """Extrai do corpo JSON a lista 'nome', obrigatória nas operações em lote."""
+    valor = corpo.get(nome)
+    if not isinstance(valor, list):
+        raise ErroRequisicao(400, f"Campo '{nome}' deve ser uma lista.")
+    return valor
+
+def _resultado_lote(resposta):
+    """Converte o retorno de uma operação em lote: os resultados por item, ou as mensagens de erro."""
+    sucesso, resultados = resposta
+    if not sucesso:
+        return 400, {"sucesso": False, "mensagens": resultados}
+    return 200, {"sucesso": True, "resultados": resultados,
+                 "aceitos": sum(1 for item in resultados if item["sucesso"]),
+                 "recusados": sum(1 for item in resultados if not item["sucesso"])}
+
+def _pagina(resposta):
+    itens, proximo_cursor = resposta
+    return 200, {"itens": itens, "proximo_cursor": proximo_cursor}
+
+# =============================================================================
+# ROTAS
+# =============================================================================
+
+def saude(consulta, corpo):
+    return 200, {"status": "ok", "versao": __version__}
+
+def listar_veiculos(consulta, corpo):
+    return _pagina(db.listar_veiculos_paginado(
+        _tamanho_pagina(consulta), _parametro(consulta, "cursor"), _parametro(consulta, "status")))
+
+def adicionar_veiculo(consulta, corpo):
+    return _resultado(db.adicionar_veiculo(*_campos(corpo, "placa", "marca", "modelo", "ano", "cor", "valor_diaria")), 201)
+
+def atualizar_veiculo(consulta, corpo, placa):
+    return _resultado(db.atualizar_veiculo(placa, *_campos(corpo, "marca", "modelo", "ano", "cor", "valor_diaria")))
+
+def remover_veiculo(consulta, corpo, placa):
+    return _resultado(db.remover_veiculo(placa))
+
+def listar_clientes(consulta, corpo):
+    busca = _parametro(consulta, "busca")
+    if busca:
+        return 200, {"itens": db.buscar_clientes(busca, _tamanho_pagina(consulta)), "proximo_cursor": None}
+    return _pagina(db.listar_clientes_paginado(_tamanho_pagina(consulta), _parametro(consulta, "cursor")))
+
+def adicionar_cliente(consulta, corpo):
+    return _resultado(db.adicionar_cliente(*_campos(corpo, "cpf", "nome", "telefone", "email")), 201)
+
+def atualizar_cliente(consulta, corpo, cpf):
+    return _resultado(db.atualizar_cliente(cpf, *_campos(corpo, "nome", "telefone", "email")))
+
+def remover_cliente(consulta, corpo, cpf):
+    return _resultado(db.remover_cliente(cpf))
+
+def listar_alugueis_ativos(consulta, corpo):
+    return 200, {"itens": db.listar_alugueis_ativos()}
+
+def realizar_aluguel(consulta, corpo):
+    return _resultado(db.realizar_aluguel(*_campos(corpo, "placa", "cpf", "devolucao_prevista")), 201)
+
+def realizar_devolucao(consulta, corpo):
+    return _resultado(db.realizar_devolucao(*_campos(corpo, "placa")))
+
+def realizar_alugueis_em_lote(consulta, corpo):
+    itens = _lista(corpo, "itens")
+    if not all(isinstance(item, dict) for item in itens):
+        raise ErroRequisicao(400, "Cada item deve ser um objeto com 'placa' e 'cpf'.")
+    return _resultado_lote(db.realizar_alugueis_em_lote([_campos(item, "placa", "cpf") for item in itens],
+                                                         *_campos(corpo, "devolucao_prevista")))
+
+def realizar_devolucoes_em_lote(consulta, corpo):
+    return _resultado_lote(db.realizar_devolucoes_em_lote([_texto(placa) for placa in _lista(corpo, "placas")]))
+
+def listar_reservas(consulta, corpo):
+    return 200, {"itens": db.listar_reservas(_parametro(consulta, "placa"), _parametro(consulta, "cpf"))}
+
+def criar_reserva(consulta, corpo):
+    return _resultado(db.criar_reserva(*_campos(corpo, "placa", "cpf", "inicio", "fim")), 201)
+
+def cancelar_reserva(consulta, corpo, id_reserva):
+    if not id_reserva.isdigit():
+        raise ErroRequisicao(404, f"Reserva não encontrada: {id_reserva}")
+    return _resultado(db.cancelar_reserva(int(id_reserva)))
+
+def veiculos_disponiveis(consulta, corpo):
+    sucesso, resultado = db.listar_veiculos_disponiveis(
+        _parametro(consulta, "inicio", True), _parametro(consulta, "fim", True))
+    if not sucesso:
+        return 400, {"sucesso": False, "mensagens": resultado}
+    return 200, {"itens": resultado}
+
+def buscar_historico(consulta, corpo):
+    return _pagina(db.buscar_historico_paginado(
+        _parametro(consulta, "cpf"), _tamanho_pagina(consulta), _parametro(consulta, "cursor")))
+
+def calcular_faturamento(consulta, corpo):
+    inicio, fim = _parametro(consulta, "inicio", True), _parametro(consulta, "fim", True)
+    por = _parametro(consulta, "por")
+    if por:
+        sucesso, resultado = db.faturamento_detalhado(
+            inicio, fim, por.split(","), _parametro(consulta, "subtotais") in ("1", "true", "sim"))
+        if not sucesso:
+            return 400, {"sucesso": False, "mensagens": resultado}
+        return 200, {"inicio": inicio, "fim": fim, "itens": resultado}
+    sucesso, resultado = db.calcular_faturamento_periodo(inicio, fim)
+    if not sucesso:
+        return 400, {"sucesso": False, "mensagens": resultado}
+    return 200, {"inicio": inicio, "fim": fim, "faturamento": resultado}
+
+def utilizacao_frota(consulta, corpo):
+    sucesso, resultado = db.relatorio_utilizacao_frota(
+        _parametro(consulta, "inicio", True), _parametro(consulta, "fim", True))
+    if not sucesso:
+        return 400, {"sucesso": False, "mensagens": resultado}
+    return 200, {"itens": resultado}
+
+def diagnostico(consulta, corpo):
+    return 200, db.diagnostico()
+
+def configurar_diagnostico(consulta, corpo):
+    if corpo.get("zerar"):
+        instrumentacao.zerar()
+    if "ativa" in corpo:
+        db.ativar_instrumentacao(bool(corpo["ativa"]))
+    return diagnostico(consulta, corpo)
+
+# Tabela de rotas: (padrão do caminho, {método: função}). Os grupos do padrão
+# são repassados à função depois da consulta e do corpo.
+ROTAS = [
+    (re.compile(r"/saude"), {"GET": saude}),
+    (re.compile(r"/veiculos"), {"GET": listar_veiculos, "POST": adicionar_veiculo}),
+    (re.compile(r"/veiculos/([^/]+)"), {"PUT": atualizar_veiculo, "DELETE": remover_veiculo}),
+    (re.compile(r"/clientes"), {"GET": listar_clientes, "POST": adicionar_cliente}),
+    (re.compile(r"/clientes/([^/]+)"), {"PUT": atualizar_cliente, "DELETE": remover_cliente}),
+    (re.compile(r"/alugueis/ativos"), {"GET": listar_alugueis_ativos}),
+    (re.compile(r"/alugueis"), {"POST": realizar_aluguel}),
+    (re.compile(r"/alugueis/lote"), {"POST": realizar_alugueis_em_lote}),
+    (re.compile(r"/devolucoes"), {"POST": realizar_devolucao}),
+    (re.compile(r"/devolucoes/lote"), {"POST": realizar_devolucoes_em_lote}),
+    (re.compile(r"/reservas"), {"GET": listar_reservas, "POST": criar_reserva}),
+    (re.compile(r"/reservas/([^/]+)"), {"DELETE": cancelar_reserva}),
+    (re.compile(r"/disponibilidade"), {"GET": veiculos_disponiveis}),
+    (re.compile(r"/historico"), {"GET": buscar_historico}),
+    (re.compile(r"/faturamento"), {"GET": calcular_faturamento}),
+    (re.compile(r"/utilizacao"), {"GET": utilizacao_frota}),
+    (re.compile(r"/diagnostico"), {"GET": diagnostico, "POST": configurar_diagnostico}),
+]
+
+def resolver_rota(metodo, caminho):
+    """Retorna (função, argumentos do caminho) ou lança ErroRequisicao 404/405."""
+    for padrao, metodos in ROTAS:
+        casamento = padrao.fullmatch(caminho)
+        if casamento:
+            if metodo not in metodos:
+                raise ErroRequisicao(405, f"Método {metodo} não permitido em {caminho}.")
+            return metodos[metodo], [unquote(grupo) for grupo in casamento.groups()]
+    raise ErroRequisicao(404, f"Rota não encontrada: {caminho}")
+
+# =============================================================================
+# SERVIDOR
+# =============================================================================
+
+class ManipuladorLocadora(BaseHTTPRequestHandler):
+    """Atende as requisições de uma conexão HTTP, mantendo-a aberta entre elas."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = f"Locadora/{__version__}"
+
+    # Cabeçalhos e corpo saem em escritas separadas; sem TCP_NODELAY, o
+    # algoritmo de Nagle somado ao ACK atrasado segura cada resposta ~40 ms.
+    disable_nagle_algorithm = True
+
+    # Encerra conexões keep-alive ociosas por mais tempo que isto (em segundos)
+    timeout = obter_configuracao('API_TIMEOUT_OCIOSO', 30)
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def do_PUT(self):
+        self._atender("PUT")
+
+    def do_DELETE(self):
+        self._atender("DELETE")
+
+    def _ler_corpo(self):
+        cabecalho = (self.headers.get("Content-Length") or "0").strip()
+        if not cabecalho.isascii() or not cabecalho.isdigit():
+            # Sem um tamanho válido não há como saber onde o corpo termina: a
+            # conexão não pode ser reaproveitada para a próxima requisição
+            self.close_connection = True
+            raise ErroRequisicao(400, "Cabeçalho Content-Length inválido.")
+        tamanho = int(cabecalho)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            self.close_connection = True
+            raise ErroRequisicao(413, "Corpo da requisição muito grande.")
+        if not tamanho:
+            return {}
+        try:
+            corpo = json.loads(self.rfile.read(tamanho))
+        except ValueError:
+            raise ErroRequisicao(400, "Corpo da requisição não é um JSON válido.")
+        if not isinstance(corpo, dict):
+            raise ErroRequisicao(400, "O corpo da requisição deve ser um objeto JSON.")
+        return corpo
+
+    def _atender(self, metodo):
+        partes = urlsplit(self.path)
+        try:
+            # O corpo é sempre consumido para não corromper a próxima requisição da conexão
+            corpo = self._ler_corpo()
+            funcao, argumentos = resolver_rota(metodo, partes.path.rstrip("/") or "/")
+            status, resposta = funcao(parse_qs(partes.query), corpo, *argumentos)
+        except ErroRequisicao as e:
+            status, resposta = e.status, {"sucesso": False, "mensagens": [str(e)]}
+        except ValueError as e:
+            # Ex.: cursor de paginação inválido
+            status, resposta = 400, {"sucesso": False, "mensagens": [str(e)]}
+        except Exception as e:
+            status, resposta = 500, {"sucesso": False, "mensagens": [f"Erro interno: {e}"]}
+        self._responder(status, resposta)
+
+    def _responder(self, status, resposta):
+        dados = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, formato, *args):
+        if obter_configuracao('DEBUG', False):
+            super().log_message(formato, *args)
+
+
+class ServidorLocadora(ThreadingHTTPServer):
+    """Servidor HTTP com uma thread por conexão e conexões SQLite do pool."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def criar_servidor(host=None, porta=None):
+    """Cria o servidor (sem iniciá-lo) já com as tabelas do banco criadas."""
+    db.criar_tabelas()
+    host = host or obter_configuracao('API_HOST', '127.0.0.1')
+    porta = obter_configuracao('API_PORTA', 8080) if porta is None else porta
+    return ServidorLocadora((host, porta), ManipuladorLocadora)
+
+# =============================================================================
+# LINHA DE COMANDO
+# =============================================================================
+
+def _registrar_backup(resultado):
+    sucesso, mensagens = resultado
+    for mensagem in mensagens:
+        print(f"{'💾' if sucesso else '❌'} {mensagem}", file=sys.stdout if sucesso else sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON da locadora.")
+    parser.add_argument("--host", help="endereço de escuta (padrão: API_HOST ou 127.0.0.1)")
+    parser.add_argument("--porta", type=int, help="porta de escuta (padrão: API_PORTA ou 8080)")
+    parser.add_argument("--banco", help="arquivo de banco de dados (padrão: dados/locadora.db)")
+    args = parser.parse_args(argv)
+
+    if args.banco:
+        db.configurar_banco(args.banco)
+    servidor = criar_servidor(args.host, args.porta)
+    agendador_backup = iniciar_backup_automatico(ao_concluir=_registrar_backup)
+    host, porta = servidor.server_address[:2]
+    print(f"🚀 Servidor da locadora em http://{host}:{porta} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando servidor...")
+    finally:
+        if agendador_backup:
+            agendador_backup.parar()
+        servidor.server_close()
+        db.fechar_conexoes()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
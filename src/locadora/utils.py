@@ -4,11 +4,37 @@ Módulo de utilitários para o Sistema de Locadora
 Contém funções auxiliares reutilizáveis em todo o projeto.
 """
 
-import re
 import os
-import shutil
+import importlib.util
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
+
+from . import validacao
+
+
+# Caminho do arquivo de configurações do projeto (config/settings.py)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ARQUIVO_CONFIGURACOES = os.path.join(PROJECT_ROOT, 'config', 'settings.py')
+
+
+@lru_cache(maxsize=None)
+def carregar_configuracoes():
+    """Carrega o módulo config/settings.py do projeto, ou None se ausente."""
+    if not os.path.exists(ARQUIVO_CONFIGURACOES):
+        return None
+    spec = importlib.util.spec_from_file_location("locadora_settings", ARQUIVO_CONFIGURACOES)
+    modulo = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(modulo)
+    except Exception:
+        return None
+    return modulo
+
+
+def obter_configuracao(nome: str, padrao: Any = None) -> Any:
+    """Retorna o valor de uma configuração de settings.py ou o padrão informado."""
+    return getattr(carregar_configuracoes(), nome, padrao)
 
 
 def formatar_cpf(cpf: str) -> str:
@@ -52,59 +78,28 @@ def formatar_texto_capitalizado(texto: str) -> str:
 
 def validar_cpf(cpf: str) -> bool:
     """Valida um CPF brasileiro."""
-    if not cpf:
-        return False
-    
-    cpf_numerico = ''.join(filter(str.isdigit, str(cpf)))
-    if len(cpf_numerico) != 11 or len(set(cpf_numerico)) == 1:
-        return False
-    
-    # Validação do primeiro dígito verificador
-    soma = sum(int(cpf_numerico[i]) * (10 - i) for i in range(9))
-    d1 = (soma * 10) % 11
-    if d1 == 10:
-        d1 = 0
-    if d1 != int(cpf_numerico[9]):
-        return False
-
-    # Validação do segundo dígito verificador
-    soma = sum(int(cpf_numerico[i]) * (11 - i) for i in range(10))
-    d2 = (soma * 10) % 11
-    if d2 == 10:
-        d2 = 0
-    if d2 != int(cpf_numerico[10]):
-        return False
-
-    return True
+    return validacao.cpf_valido(cpf)
 
 
 def validar_email(email: str) -> bool:
     """Valida um endereço de email."""
     if not email:
         return False
-    
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return validacao.PADRAO_EMAIL.match(email) is not None
 
 
 def validar_placa(placa: str) -> bool:
     """Valida placas no formato antigo (ABC-1234) e Mercosul (ABC1D23)."""
-    if not isinstance(placa, str) or not placa.strip():
-        return False
-    
-    placa = placa.upper().strip()
-    padrao_mercosul = re.compile(r'^[A-Z]{3}\d[A-Z]\d{2}$')
-    padrao_antigo = re.compile(r'^[A-Z]{3}-\d{4}$')
-    
-    return bool(padrao_mercosul.match(placa) or padrao_antigo.match(placa.replace("-", "")))
+    return validacao.placa_valida(placa)
 
 
 def criar_backup(origem: str, destino: str) -> bool:
-    """Cria um backup de um arquivo."""
+    """Cria um backup consistente de um banco SQLite, mesmo com o banco em uso."""
+    from .backup import copiar_banco, verificar_integridade
     try:
         if os.path.exists(origem):
-            shutil.copy2(origem, destino)
-            return True
+            copiar_banco(origem, destino)
+            return not verificar_integridade(destino)
         return False
     except Exception:
         return False
@@ -0,0 +1,128 @@
+"""
+Módulo de validação do Sistema de Locadora
+
+Reúne as regras de placa e CPF usadas por database.py e utils.py. Os padrões
+são compilados uma única vez e o cálculo dos dígitos verificadores do CPF usa
+tabelas de pesos pré-calculadas. As funções validar_placas/validar_cpfs
+verificam colunas inteiras de valores de uma vez; quando o NumPy está
+instalado, os dígitos verificadores de CPF são calculados de forma vetorizada.
+"""
+
+import re
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele o lote usa o caminho em Python puro
+    np = None
+
+# =============================================================================
+# PADRÕES PRÉ-COMPILADOS
+# =============================================================================
+
+# Placa Mercosul (ABC1D23) ou no formato antigo, com ou sem hífen (ABC-1234)
+PADRAO_PLACA = re.compile(r'[A-Z]{3}(?:\d[A-Z]\d{2}|-?\d{4})')
+# Placa antiga digitada sem hífen, reescrita na forma canônica ABC-1234
+_PLACA_ANTIGA_SEM_HIFEN = re.compile(r'([A-Z]{3})(\d{4})')
+# Início de placa com as três letras e ao menos o primeiro dígito
+_INICIO_PLACA_COM_DIGITO = re.compile(r'[A-Z]{3}\d')
+_NAO_DIGITOS = re.compile(r'[^0-9]')
+PADRAO_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# =============================================================================
+# TABELAS DO CPF
+# =============================================================================
+
+# Pesos dos dígitos verificadores: 10..2 para o primeiro e 11..2 para o segundo
+PESOS_D1 = tuple(range(10, 1, -1))
+PESOS_D2 = tuple(range(11, 1, -1))
+
+# Os dígitos são lidos como bytes ASCII ('0' == 48); o deslocamento de 48 em
+# cada posição é descontado de uma vez pela constante correspondente.
+_DESLOCAMENTO_D1 = 48 * sum(PESOS_D1)
+_DESLOCAMENTO_D2 = 48 * sum(PESOS_D2)
+
+# Sequências de dígitos repetidos passam no cálculo mas não são CPFs válidos
+CPFS_REPETIDOS = frozenset(str(d) * 11 for d in range(10))
+
+# Dígito verificador para cada resto possível de (soma * 10) % 11
+_DIGITO_POR_RESTO = tuple(ord(str(r % 10)) for r in range(11))
+
+# =============================================================================
+# VALIDAÇÃO INDIVIDUAL
+# =============================================================================
+
+def normalizar_placa(placa):
+    """Retorna a placa na forma canônica: maiúsculas, sem espaços nas pontas e,
+    no formato antigo, sempre com hífen (ABC1234 vira ABC-1234)."""
+    placa = placa.upper().strip()
+    antiga = _PLACA_ANTIGA_SEM_HIFEN.fullmatch(placa)
+    return f"{antiga[1]}-{antiga[2]}" if antiga else placa
+
+def prefixos_placa(prefixo):
+    """Retorna as formas canônicas que uma placa começando com o prefixo pode ter.
+
+    O hífen é opcional ao digitar: depois das três letras e de um dígito, o
+    prefixo pode ser o de uma placa antiga (ABC12 -> ABC-12) ou o de uma
+    Mercosul (ABC1 -> ABC1D23), e as duas formas são devolvidas.
+    """
+    chave = prefixo.upper().strip().replace('-', '')
+    if not chave:
+        return ()
+    if _INICIO_PLACA_COM_DIGITO.match(chave):
+        return (f"{chave[:3]}-{chave[3:]}", chave)
+    return (chave,)
+
+def placa_valida(placa):
+    """Indica se a placa está no formato antigo (ABC-1234) ou Mercosul (ABC1D23)."""
+    if not isinstance(placa, str):
+        return False
+    return PADRAO_PLACA.fullmatch(normalizar_placa(placa)) is not None
+
+def somente_digitos(valor):
+    """Remove de um valor tudo o que não for dígito."""
+    texto = str(valor)
+    return texto if texto.isascii() and texto.isdigit() else _NAO_DIGITOS.sub('', texto)
+
+def cpf_valido(cpf):
+    """Indica se o CPF (formatado ou não) tem dígitos verificadores corretos."""
+    if not cpf:
+        return False
+    numeros = somente_digitos(cpf)
+    if len(numeros) != 11 or numeros in CPFS_REPETIDOS:
+        return False
+    codigos = numeros.encode('ascii')
+    soma = sum(map(mul, codigos, PESOS_D1)) - _DESLOCAMENTO_D1
+    if _DIGITO_POR_RESTO[soma * 10 % 11] != codigos[9]:
+        return False
+    soma = sum(map(mul, codigos, PESOS_D2)) - _DESLOCAMENTO_D2
+    return _DIGITO_POR_RESTO[soma * 10 % 11] == codigos[10]
+
+# =============================================================================
+# VALIDAÇÃO EM LOTE
+# =============================================================================
+
+def validar_placas(placas):
+    """Valida uma coluna de placas e retorna uma lista de booleanos."""
+    casar = PADRAO_PLACA.fullmatch
+    return [isinstance(p, str) and casar(p.upper().strip()) is not None for p in placas]
+
+def validar_cpfs(cpfs):
+    """Valida uma coluna de CPFs e retorna uma lista de booleanos.
+
+    Com NumPy disponível, os dígitos verificadores de todos os CPFs de 11
+    dígitos são calculados em uma única operação matricial.
+    """
+    if np is None:
+        return [cpf_valido(cpf) for cpf in cpfs]
+
+    numeros = [somente_digitos(cpf) if cpf else '' for cpf in cpfs]
+    resultado = np.zeros(len(numeros), dtype=bool)
+    candidatos = [i for i, n in enumerate(numeros) if len(n) == 11 and n not in CPFS_REPETIDOS]
+    if candidatos:
+        bruto = ''.join(numeros[i] for i in candidatos).encode('ascii')
+        digitos = np.frombuffer(bruto, dtype=np.uint8).reshape(-1, 11).astype(np.int64) - 48
+        d1 = (digitos[:, :9] @ np.array(PESOS_D1)) * 10 % 11 % 10
+        d2 = (digitos[:, :10] @ np.array(PESOS_D2)) * 10 % 11 % 10
+        resultado[candidatos] = (d1 == digitos[:, 9]) & (d2 == digitos[:, 10])
+    return resultado.tolist()
@@ -0,0 +1,43 @@
+"""
+Configuração comum dos testes do Sistema de Locadora.
+
+Os testes importam o pacote de src/ (como main.py) e cada um recebe um banco
+próprio, em um diretório temporário, já com todas as migrações aplicadas.
+
+Uso:
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from locadora import database as db  # noqa: E402
+
+# CPFs válidos usados como clientes da frota de teste
+CPFS = ("52998224725", "11144477735", "12345678909", "98765432100")
+PLACAS = ("ABC-1234", "XYZ1D23", "DEF-5678")
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Aponta o módulo database para um banco novo e retorna o caminho do arquivo."""
+    caminho = str(tmp_path / "locadora.db")
+    db.configurar_banco(caminho)
+    db.criar_tabelas()
+    yield caminho
+    db.fechar_conexoes()
+    db.configurar_banco()
+
+
+@pytest.fixture
+def frota(banco):
+    """Banco com os veículos de PLACAS e os clientes de CPFS cadastrados."""
+    for placa in PLACAS:
+        assert db.adicionar_veiculo(placa, "Fiat", "Uno", "2020", "Branco", "100")[0]
+    for i, cpf in enumerate(CPFS):
+        assert db.adicionar_cliente(cpf, f"Cliente {i}", "11999990000", f"cliente{i}@exemplo.com")[0]
+    return banco
@@ -0,0 +1,70 @@
+"""Aluguéis e devoluções concorrentes: entre threads e entre processos."""
+
+import multiprocessing
+import threading
+
+from locadora import database as db
+from conftest import CPFS, PLACAS
+
+
+def _em_paralelo(funcao, argumentos):
+    """Executa funcao(*args) para cada item em uma thread, todas liberadas ao mesmo tempo."""
+    barreira = threading.Barrier(len(argumentos))
+    resultados = [None] * len(argumentos)
+
+    def executar(indice, args):
+        barreira.wait()
+        resultados[indice] = funcao(*args)
+
+    threads = [threading.Thread(target=executar, args=(i, args)) for i, args in enumerate(argumentos)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+
+def _alugar_em_outro_processo(caminho, placa, cpf):
+    db.configurar_banco(caminho)
+    try:
+        return db.realizar_aluguel(placa, cpf)[0]
+    finally:
+        db.fechar_conexoes()
+
+
+def _alugueis_ativos(placa):
+    with db.conexao() as conn:
+        return conn.execute("SELECT COUNT(*) FROM alugueis WHERE placa_carro = ? AND status = 'Ativo'",
+                            (placa,)).fetchone()[0]
+
+
+# =============================================================================
+# CONCORRÊNCIA
+# =============================================================================
+
+def test_aluguel_concorrente_entre_threads_registra_um_unico_aluguel(frota):
+    resultados = _em_paralelo(db.realizar_aluguel, [(PLACAS[0], cpf) for cpf in CPFS * 2])
+
+    assert sum(sucesso for sucesso, _ in resultados) == 1
+    assert _alugueis_ativos(PLACAS[0]) == 1
+    recusas = [mensagens[0] for sucesso, mensagens in resultados if not sucesso]
+    assert all(m == "Veículo não está disponível (Status: Alugado)." for m in recusas)
+
+
+def test_aluguel_concorrente_entre_processos_registra_um_unico_aluguel(frota):
+    with multiprocessing.get_context("fork").Pool(len(CPFS)) as pool:
+        sucessos = pool.starmap(_alugar_em_outro_processo, [(frota, PLACAS[0], cpf) for cpf in CPFS])
+
+    assert sum(sucessos) == 1
+    assert _alugueis_ativos(PLACAS[0]) == 1
+
+
+def test_devolucao_concorrente_finaliza_o_aluguel_uma_unica_vez(frota):
+    assert db.realizar_aluguel(PLACAS[0], CPFS[0])[0]
+
+    resultados = _em_paralelo(db.realizar_devolucao, [(PLACAS[0],)] * 6)
+
+    assert sum(sucesso for sucesso, _, _ in resultados) == 1
+    with db.conexao() as conn:
+        assert conn.execute("SELECT SUM(quantidade) FROM faturamento_diario").fetchone()[0] == 1
+        assert conn.execute("SELECT status FROM veiculos WHERE placa = ?", (PLACAS[0],)).fetchone()[0] == 'Disponível'
@@ -0,0 +1,86 @@
+"""Arquivamento de aluguéis antigos e a visão historico_alugueis."""
+
+import multiprocessing
+import os
+import threading
+from datetime import datetime, timedelta
+
+from locadora import database as db
+from conftest import CPFS, PLACAS
+
+
+def _registrar_aluguel_finalizado(placa, cpf, dias_atras):
+    """Grava um aluguel de um dia, devolvido há 'dias_atras' dias."""
+    devolucao = datetime.now().replace(microsecond=0) - timedelta(days=dias_atras)
+    retirada = devolucao - timedelta(days=1)
+    with db.transacao() as cursor:
+        cursor.execute("""
+            INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, data_devolucao, valor_total, status,
+                                  retirada_ts, devolucao_ts)
+            VALUES (?, ?, ?, ?, 100, 'Finalizado', ?, ?)
+        """, (placa, cpf, retirada.strftime('%Y-%m-%d %H:%M:%S'), devolucao.strftime('%Y-%m-%d %H:%M:%S'),
+              db.em_segundos(retirada), db.em_segundos(devolucao)))
+
+
+def _em_outra_thread(funcao, *args):
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao(*args)))
+    thread.start()
+    thread.join()
+    return resultado[0]
+
+
+def _arquivar_em_outro_processo(caminho, dias):
+    db.configurar_banco(caminho)
+    try:
+        return db.arquivar_alugueis(dias=dias)[0]
+    finally:
+        db.fechar_conexoes()
+
+
+def test_alugueis_arquivados_aparecem_no_historico(frota):
+    _registrar_aluguel_finalizado(PLACAS[0], CPFS[0], 800)
+    _registrar_aluguel_finalizado(PLACAS[1], CPFS[0], 500)
+    _registrar_aluguel_finalizado(PLACAS[2], CPFS[1], 10)
+    assert db.realizar_aluguel(PLACAS[0], CPFS[1])[0]
+    # O banco de arquivo já existe desde a inicialização, ainda vazio
+    assert db.contar_alugueis_arquivados() == {"principal": 4, "arquivo": 0}
+    antes = db.buscar_historico()
+
+    sucesso, mensagens = db.arquivar_alugueis(dias=365)
+
+    assert sucesso, mensagens
+    assert db.contar_alugueis_arquivados() == {"principal": 2, "arquivo": 2}
+    # Conexões abertas antes e depois do arquivamento enxergam o arquivo
+    for historico in (db.buscar_historico(), _em_outra_thread(db.buscar_historico)):
+        assert sorted(a["id"] for a in historico) == sorted(a["id"] for a in antes)
+    assert [a["placa_carro"] for a in db.buscar_historico(CPFS[0])] == [PLACAS[1], PLACAS[0]]
+    itens, _ = db.buscar_historico_paginado(CPFS[0], tamanho_pagina=10)
+    assert [a["placa_carro"] for a in itens] == [PLACAS[1], PLACAS[0]]
+
+
+def test_arquivamento_repetido_nao_duplica_alugueis(frota):
+    _registrar_aluguel_finalizado(PLACAS[0], CPFS[0], 800)
+    assert db.arquivar_alugueis(dias=365)[0]
+    _registrar_aluguel_finalizado(PLACAS[1], CPFS[0], 700)
+
+    assert db.arquivar_alugueis(dias=365)[0]
+
+    assert db.contar_alugueis_arquivados() == {"principal": 0, "arquivo": 2}
+    assert len(db.buscar_historico()) == 2
+
+
+def test_arquivamento_em_outro_processo_e_visto_sem_reiniciar(frota):
+    _registrar_aluguel_finalizado(PLACAS[0], CPFS[0], 800)
+    _registrar_aluguel_finalizado(PLACAS[1], CPFS[1], 10)
+    # Conexões já abertas e consultas já em cache, como na interface em uso
+    antes = sorted(a["id"] for a in db.buscar_historico())
+    assert os.path.exists(db.caminho_arquivo(frota))
+
+    # Como em 'locadora arquivar' executado por um agendador
+    with multiprocessing.get_context("fork").Pool(1) as pool:
+        assert pool.apply(_arquivar_em_outro_processo, (frota, 365))
+
+    assert db.contar_alugueis_arquivados() == {"principal": 1, "arquivo": 1}
+    for historico in (db.buscar_historico(), _em_outra_thread(db.buscar_historico)):
+        assert sorted(a["id"] for a in historico) == antes
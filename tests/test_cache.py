@@ -0,0 +1,22 @@
+"""Cache das listagens: quem altera um resultado não afeta as próximas leituras."""
+
+from locadora import database as db
+from conftest import PLACAS
+
+
+def test_alterar_resultado_nao_altera_o_cache(frota):
+    veiculos = db.listar_veiculos()
+    veiculos[0]["status"] = "Alugado"
+    veiculos.append({"placa": "ZZZ-9999"})
+    pagina, proximo = db.listar_veiculos_paginado(tamanho_pagina=2)
+    pagina.clear()
+    db.sugerir_placas(status_filtro=None).reverse()
+
+    acertos = db.estatisticas_cache()["acertos"]
+    assert [v["placa"] for v in db.listar_veiculos()] == list(PLACAS)
+    assert all(v["status"] == "Disponível" for v in db.listar_veiculos())
+    pagina, cursor = db.listar_veiculos_paginado(tamanho_pagina=2)
+    assert ([v["placa"] for v in pagina], cursor) == (sorted(PLACAS)[:2], proximo)
+    assert db.sugerir_placas(status_filtro=None) == sorted(PLACAS)
+    # As leituras acima vieram do cache
+    assert db.estatisticas_cache()["acertos"] > acertos
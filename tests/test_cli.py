@@ -0,0 +1,31 @@
+"""Linha de comando: saída interrompida por quem lê o pipe."""
+
+import os
+import subprocess
+import sys
+
+from locadora import database as db
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pipe_fechado_encerra_sem_erro_e_mantem_o_diagnostico(banco):
+    with db.transacao() as cursor:
+        cursor.executemany(
+            "INSERT INTO veiculos (placa, marca, modelo, ano, cor, valor_diaria) VALUES (?, 'Fiat', 'Uno', 2020, 'Branco', 100)",
+            [(f"AAA{i:04d}",) for i in range(5000)])
+    db.fechar_conexoes()
+
+    # Como em 'locadora ... | head -1': lê uma linha e fecha o pipe
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "locadora.cli", "--banco", banco, "--diagnostico", "veiculos"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=RAIZ,
+        env={**os.environ, "PYTHONPATH": os.path.join(RAIZ, "src")})
+    processo.stdout.readline()
+    processo.stdout.close()
+    erros = processo.stderr.read().decode("utf-8")
+    processo.wait(timeout=60)
+
+    assert processo.returncode == 0, erros
+    assert "Traceback" not in erros
+    assert "listar_veiculos_paginado" in erros
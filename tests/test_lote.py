@@ -0,0 +1,57 @@
+"""Aluguel e devolução em lote: um resultado por item."""
+
+from locadora import database as db
+from conftest import CPFS, PLACAS
+
+
+def _alugueis_ativos(placa):
+    with db.conexao() as conn:
+        return conn.execute("SELECT COUNT(*) FROM alugueis WHERE placa_carro = ? AND status = 'Ativo'",
+                            (placa,)).fetchone()[0]
+
+
+def test_aluguel_em_lote_retorna_um_resultado_por_item(frota):
+    assert db.realizar_aluguel(PLACAS[2], CPFS[0])[0]
+
+    sucesso, resultados = db.realizar_alugueis_em_lote([
+        ("abc1234", CPFS[0]),          # placa antiga sem hífen: mesma forma canônica
+        ("ABC-1234", CPFS[1]),
+        ("ZZZ-9999", CPFS[1]),
+        (PLACAS[1], "00000000000"),
+        (PLACAS[2], CPFS[1]),
+    ])
+
+    assert sucesso
+    assert [(r["placa"], r["sucesso"], r["mensagem"]) for r in resultados] == [
+        ("ABC-1234", True, "Aluguel registrado com sucesso."),
+        ("ABC-1234", False, "Veículo repetido no lote."),
+        ("ZZZ-9999", False, "Veículo não encontrado."),
+        (PLACAS[1], False, "Cliente não encontrado."),
+        (PLACAS[2], False, "Veículo não está disponível (Status: Alugado)."),
+    ]
+    assert _alugueis_ativos("ABC-1234") == 1
+    assert _alugueis_ativos(PLACAS[1]) == 0
+
+
+def test_devolucao_em_lote_retorna_um_resultado_por_item(frota):
+    assert db.realizar_aluguel(PLACAS[0], CPFS[0])[0]
+    assert db.realizar_aluguel(PLACAS[1], CPFS[1])[0]
+
+    sucesso, resultados = db.realizar_devolucoes_em_lote([PLACAS[0], PLACAS[2], PLACAS[1], PLACAS[0]])
+
+    assert sucesso
+    assert [(r["placa"], r["sucesso"]) for r in resultados] == [
+        (PLACAS[0], True), (PLACAS[2], False), (PLACAS[1], True), (PLACAS[0], False)]
+    assert resultados[0]["valor_total"] == 100.0 and resultados[0]["dias"] == 1
+    assert resultados[1]["mensagem"] == "Nenhum aluguel ativo encontrado para este veículo."
+    assert resultados[3]["mensagem"] == "Veículo repetido no lote."
+    with db.conexao() as conn:
+        assert tuple(conn.execute("SELECT total, quantidade FROM faturamento_diario").fetchone()) == (200.0, 2)
+
+
+def test_lote_vazio_ou_acima_do_limite_e_recusado(frota, monkeypatch):
+    monkeypatch.setattr(db, "TAMANHO_MAXIMO_LOTE", 2)
+
+    assert db.realizar_alugueis_em_lote([]) == (False, ["Nenhum item informado para o lote."])
+    sucesso, mensagens = db.realizar_devolucoes_em_lote(PLACAS)
+    assert not sucesso and "no máximo 2" in mensagens[0]
@@ -0,0 +1,91 @@
+"""Migrações de esquema aplicadas sobre um banco criado pela versão inicial."""
+
+import sqlite3
+from datetime import datetime
+
+from locadora import database as db
+
+
+def _criar_banco_inicial(caminho):
+    """Cria o banco como a versão inicial do sistema o criava (sem migrações), com alguns dados."""
+    conn = sqlite3.connect(caminho)
+    conn.executescript("""
+        CREATE TABLE veiculos (
+            placa TEXT PRIMARY KEY,
+            marca TEXT NOT NULL,
+            modelo TEXT NOT NULL,
+            ano INTEGER NOT NULL,
+            cor TEXT NOT NULL,
+            valor_diaria REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Disponível'
+        );
+        CREATE TABLE clientes (
+            cpf TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            telefone TEXT,
+            email TEXT UNIQUE
+        );
+        CREATE TABLE alugueis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            placa_carro TEXT NOT NULL,
+            cpf_cliente TEXT NOT NULL,
+            data_retirada TEXT NOT NULL,
+            data_devolucao TEXT,
+            valor_total REAL,
+            status TEXT NOT NULL,
+            FOREIGN KEY (placa_carro) REFERENCES veiculos (placa) ON DELETE RESTRICT,
+            FOREIGN KEY (cpf_cliente) REFERENCES clientes (cpf) ON DELETE RESTRICT
+        );
+        INSERT INTO veiculos VALUES ('ABC-1234', 'fiat', 'uno', 2020, 'branco', 100, 'Alugado');
+        INSERT INTO veiculos VALUES ('XYZ1D23', 'vw', 'gol', 2021, 'prata', 150, 'Disponível');
+        INSERT INTO clientes VALUES ('52998224725', 'Ana Souza', '11999990000', 'ana@exemplo.com');
+        INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, data_devolucao, valor_total, status)
+        VALUES ('XYZ1D23', '52998224725', '2025-03-01 09:00:00', '2025-03-03 10:00:00', 450, 'Finalizado');
+        INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, status)
+        VALUES ('ABC-1234', '52998224725', '2025-03-10 08:30:00', 'Ativo');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def test_migracoes_atualizam_banco_da_versao_inicial(tmp_path):
+    caminho = str(tmp_path / "inicial.db")
+    _criar_banco_inicial(caminho)
+    db.configurar_banco(caminho)
+    try:
+        db.criar_tabelas()
+
+        with db.conexao() as conn:
+            assert db.versao_esquema(conn) == db.MIGRACOES[-1][0]
+            indices = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert {"idx_alugueis_ativos_placa", "idx_alugueis_retirada_ts", "idx_alugueis_devolucao_ts",
+                    "idx_alugueis_faturamento", "idx_veiculos_status", "idx_reservas_ativas_placa"} <= indices
+            alugueis = [dict(row) for row in conn.execute("SELECT * FROM alugueis ORDER BY id")]
+            faturamento = [tuple(row) for row in conn.execute("SELECT dia, total, quantidade FROM faturamento_diario")]
+            assert conn.execute("SELECT COUNT(*) FROM reservas").fetchone()[0] == 0
+
+        # Datas em segundos preenchidas a partir do texto (migração 6)
+        assert alugueis[0]["retirada_ts"] == db.em_segundos(datetime(2025, 3, 1, 9))
+        assert alugueis[0]["devolucao_ts"] == db.em_segundos(datetime(2025, 3, 3, 10))
+        assert alugueis[1]["devolucao_ts"] is None
+        assert alugueis[1]["devolucao_prevista"] is None
+        # Carga inicial do agregado diário (migração 3)
+        assert faturamento == [("2025-03-03", 450.0, 1)]
+
+        # O aluguel anterior às migrações segue utilizável
+        sucesso, mensagens, valor = db.realizar_devolucao("ABC-1234")
+        assert sucesso and valor > 0
+        assert db.buscar_clientes("ana")[0]["cpf"] == "52998224725"
+    finally:
+        db.fechar_conexoes()
+        db.configurar_banco()
+
+
+def test_migracoes_nao_sao_reaplicadas(banco):
+    assert db.adicionar_veiculo("ABC-1234", "Fiat", "Uno", "2020", "Branco", "100")[0]
+
+    db.criar_tabelas()
+
+    with db.conexao() as conn:
+        assert db.versao_esquema(conn) == db.MIGRACOES[-1][0]
+        assert conn.execute("SELECT COUNT(*) FROM veiculos").fetchone()[0] == 1
@@ -0,0 +1,87 @@
+"""Reservas futuras: conflitos entre reservas e com os aluguéis em andamento."""
+
+from datetime import date, timedelta
+
+from locadora import database as db
+from conftest import CPFS, PLACAS
+
+
+def dia(deslocamento):
+    """Data 'AAAA-MM-DD' a 'deslocamento' dias de hoje."""
+    return (date.today() + timedelta(days=deslocamento)).isoformat()
+
+
+def test_reserva_sobreposta_e_recusada(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(3), dia(5))[0]
+
+    for inicio, fim in ((dia(3), dia(5)), (dia(1), dia(3)), (dia(5), dia(8)), (dia(4), dia(4))):
+        sucesso, mensagens = db.criar_reserva(PLACAS[0], CPFS[1], inicio, fim)
+        assert not sucesso
+        assert mensagens == [f"Veículo já reservado de {dia(3)} a {dia(5)}."]
+
+    # O último dia é inclusive: a reserva seguinte pode começar no dia depois dele
+    assert db.criar_reserva(PLACAS[0], CPFS[1], dia(6), dia(7))[0]
+    assert db.criar_reserva(PLACAS[1], CPFS[1], dia(3), dia(5))[0]
+
+
+def test_reserva_cancelada_libera_o_periodo(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(3), dia(5))[0]
+    id_reserva = db.listar_reservas(placa_filtro=PLACAS[0])[0]["id"]
+
+    assert db.cancelar_reserva(id_reserva)[0]
+
+    assert db.criar_reserva(PLACAS[0], CPFS[1], dia(4), dia(4))[0]
+
+
+def test_periodo_invalido_e_recusado(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(-1), dia(2)) == (
+        False, ["A reserva não pode começar antes de hoje."])
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(5), dia(3)) == (
+        False, ["A data de fim deve ser igual ou posterior à data de início."])
+
+
+def test_aluguel_e_recusado_quando_outro_cliente_tem_reserva_no_periodo(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(3), dia(5))[0]
+
+    # Sem devolução prevista, o aluguel ocupa os próximos RESERVA_MARGEM_DIAS dias
+    sucesso, mensagens = db.realizar_aluguel(PLACAS[0], CPFS[1])
+    assert not sucesso and mensagens[0].startswith(f"Veículo reservado para outro cliente de {dia(3)} a {dia(5)}.")
+    assert not db.realizar_aluguel(PLACAS[0], CPFS[1], dia(3))[0]
+
+    # Devolvido antes do início da reserva, o aluguel é aceito
+    assert db.realizar_aluguel(PLACAS[0], CPFS[1], dia(2))[0]
+
+
+def test_aluguel_do_cliente_da_reserva_a_utiliza(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(0), dia(2))[0]
+
+    assert db.realizar_aluguel(PLACAS[0], CPFS[0])[0]
+
+    assert db.listar_reservas(placa_filtro=PLACAS[0]) == []
+
+
+def test_reserva_sobreposta_a_aluguel_em_andamento_e_recusada(frota):
+    assert db.realizar_aluguel(PLACAS[0], CPFS[0])[0]
+    assert db.realizar_aluguel(PLACAS[1], CPFS[0], dia(4))[0]
+
+    # Sem devolução prevista, o veículo não aceita reservas até ser devolvido
+    assert db.criar_reserva(PLACAS[0], CPFS[1], dia(30), dia(31)) == (
+        False, ["Veículo está alugado sem devolução prevista."])
+    # Com ela, só depois do dia previsto
+    assert db.criar_reserva(PLACAS[1], CPFS[1], dia(4), dia(6)) == (
+        False, [f"Veículo está alugado com devolução prevista para {dia(4)}."])
+    assert db.criar_reserva(PLACAS[1], CPFS[1], dia(5), dia(6))[0]
+
+
+def test_veiculos_disponiveis_excluem_reservados_e_alugados(frota):
+    assert db.criar_reserva(PLACAS[0], CPFS[0], dia(3), dia(5))[0]
+    assert db.realizar_aluguel(PLACAS[1], CPFS[1], dia(3))[0]
+
+    def livres(inicio, fim):
+        sucesso, veiculos = db.listar_veiculos_disponiveis(inicio, fim)
+        assert sucesso
+        return [v["placa"] for v in veiculos]
+
+    assert livres(dia(1), dia(2)) == [PLACAS[0], PLACAS[2]]
+    assert livres(dia(2), dia(3)) == [PLACAS[2]]
+    assert livres(dia(6), dia(7)) == sorted(PLACAS)
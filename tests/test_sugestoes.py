@@ -0,0 +1,22 @@
+"""Sugestões de placas enquanto o usuário digita."""
+
+from locadora import database as db
+
+
+def test_prefixo_sugere_placas_antigas_com_ou_sem_hifen(frota):
+    assert db.adicionar_veiculo("ABC1D23", "Fiat", "Uno", "2020", "Branco", "100")[0]
+
+    for prefixo in ("ABC-1", "abc1", "ABC1 "):
+        assert db.sugerir_placas(prefixo, status_filtro=None) == ["ABC-1234", "ABC1D23"]
+    for prefixo in ("ABC12", "abc-12", "ABC1234", "ABC-1234"):
+        assert db.sugerir_placas(prefixo, status_filtro=None) == ["ABC-1234"]
+    assert db.sugerir_placas("ABC", status_filtro=None) == ["ABC-1234", "ABC1D23"]
+    assert db.sugerir_placas("ABC1D", status_filtro=None) == ["ABC1D23"]
+    assert db.sugerir_placas("ABC13", status_filtro=None) == []
+
+
+def test_limite_vale_para_as_duas_formas_juntas(frota):
+    assert db.adicionar_veiculo("ABC1D23", "Fiat", "Uno", "2020", "Branco", "100")[0]
+    assert db.adicionar_veiculo("ABC-1000", "Fiat", "Uno", "2020", "Branco", "100")[0]
+
+    assert db.sugerir_placas("ABC1", limite=2, status_filtro=None) == ["ABC-1000", "ABC-1234"]
@@ -0,0 +1,46 @@
+"""Relatório de utilização da frota: aluguéis nos limites do período."""
+
+from datetime import datetime
+
+from locadora import database as db
+from conftest import CPFS, PLACAS
+
+
+def _registrar_aluguel(placa, retirada, devolucao):
+    with db.transacao() as cursor:
+        cursor.execute("""
+            INSERT INTO alugueis (placa_carro, cpf_cliente, data_retirada, data_devolucao, valor_total, status,
+                                  retirada_ts, devolucao_ts)
+            VALUES (?, ?, ?, ?, 100, 'Finalizado', ?, ?)
+        """, (placa, CPFS[0], retirada.strftime('%Y-%m-%d %H:%M:%S'), devolucao.strftime('%Y-%m-%d %H:%M:%S'),
+              db.em_segundos(retirada), db.em_segundos(devolucao)))
+
+
+def _por_placa():
+    sucesso, linhas = db.relatorio_utilizacao_frota("2025-03-10", "2025-03-10")
+    assert sucesso, linhas
+    return {linha["placa"]: linha for linha in linhas}
+
+
+def test_aluguel_devolvido_no_inicio_do_periodo_nao_conta(frota):
+    _registrar_aluguel(PLACAS[0], datetime(2025, 3, 8, 9), datetime(2025, 3, 10))
+    # Retirado no primeiro segundo depois do período
+    _registrar_aluguel(PLACAS[1], datetime(2025, 3, 11), datetime(2025, 3, 12))
+
+    linhas = _por_placa()
+
+    assert linhas[PLACAS[0]]["alugueis"] == 0
+    assert linhas[PLACAS[1]]["alugueis"] == 0
+
+
+def test_aluguel_de_duracao_zero_dentro_do_periodo_conta(frota):
+    _registrar_aluguel(PLACAS[0], datetime(2025, 3, 10), datetime(2025, 3, 10))
+    _registrar_aluguel(PLACAS[1], datetime(2025, 3, 10, 15), datetime(2025, 3, 10, 15))
+    _registrar_aluguel(PLACAS[2], datetime(2025, 3, 9, 12), datetime(2025, 3, 10, 12))
+
+    linhas = _por_placa()
+
+    for placa in PLACAS[:2]:
+        assert (linhas[placa]["alugueis"], linhas[placa]["dias_alugados"]) == (1, 0)
+        assert linhas[placa]["receita"] == 100
+    assert (linhas[PLACAS[2]]["alugueis"], linhas[PLACAS[2]]["dias_alugados"]) == (1, 0.5)